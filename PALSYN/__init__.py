@@ -1,3 +1,9 @@
-from .synthesizer import DPEventLogSynthesizer
+__all__ = ["DPEventLogSynthesizer"]
 
-__all__ = ["DPEventLogSynthesizer"]
\ No newline at end of file
+
+def __getattr__(name):
+    # The synthesizer imports TensorFlow, so it is only loaded when it is used, not when a submodule is imported
+    if name == "DPEventLogSynthesizer":
+        from .synthesizer import DPEventLogSynthesizer
+        return DPEventLogSynthesizer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,369 @@
+import json
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def max_rss_mb() -> float:
+    """
+    Return the peak resident memory of the process so far.
+
+    Parameters:
+    None
+
+    Returns:
+    float: Peak resident memory in MB, or None on platforms without the resource module.
+    """
+    if resource is None:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB elsewhere
+    return max_rss / 1024 ** 2 if sys.platform == "darwin" else max_rss / 1024
+
+
+class Span:
+    """
+    A timed stage of the pipeline. A span is started by `Instrumentation.span` and ends when its `with` block exits
+    or `end` is called. Its record holds the name, the name of the enclosing span, the start time, the wall time, the
+    peak resident memory of the process at the end and how much the span raised it, the attributes of the span, and
+    every count added to the span together with its throughput per second.
+
+    Parameters:
+    instrumentation (Instrumentation): Instrumentation the record is emitted to.
+    name (str): Name of the stage.
+    parent (str): Name of the enclosing span, or None.
+    attributes (dict): Values describing the span that are not counted, e.g. the epoch number.
+    counts (dict): Initial counts, e.g. the number of events processed.
+
+    Returns:
+    None
+    """
+
+    __slots__ = (
+        "instrumentation", "name", "parent", "attributes", "counts", "start_time", "_start_counter", "_start_rss"
+    )
+
+    def __init__(self, instrumentation: "Instrumentation", name: str, parent: str, attributes: dict,
+                 counts: dict) -> None:
+        self.instrumentation = instrumentation
+        self.name = name
+        self.parent = parent
+        self.attributes = attributes
+        self.counts = counts
+        self.start_time = time.time()
+        self._start_rss = max_rss_mb()
+        self._start_counter = time.perf_counter()
+
+    def add(self, **counts) -> None:
+        """
+        Add to the counts of the span, e.g. `span.add(events=len(df))`.
+
+        Parameters:
+        **counts: Increments of the counts by name.
+
+        Returns:
+        None
+        """
+        for name, value in counts.items():
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def end(self) -> None:
+        """
+        End the span and emit its record to the sinks of the instrumentation.
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        wall_time = time.perf_counter() - self._start_counter
+        rss = max_rss_mb()
+
+        record = {
+            "name": self.name,
+            "parent": self.parent,
+            "start_time": self.start_time,
+            "wall_time": wall_time,
+            "max_rss_mb": rss,
+            "max_rss_increase_mb": rss - self._start_rss if rss is not None else None,
+        }
+        record.update(self.attributes)
+        record.update(self.counts)
+        for name, value in self.counts.items():
+            record[f"{name}_per_second"] = value / wall_time if wall_time > 0 else None
+
+        self.instrumentation._end_span(self, record)
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.end()
+
+
+class _NullSpan:
+    """
+    Span of the disabled instrumentation, which neither measures nor records anything.
+    """
+
+    __slots__ = ()
+
+    def add(self, **counts) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Instrumentation:
+    """
+    Emits the records of timed pipeline stages to sinks. A sink is any callable taking the record dictionary, e.g. a
+    `MemorySink`, a `JSONLinesSink` or a user function. Spans opened within another span of the same thread record
+    its name as parent, so sub-steps can be attributed to their stage.
+
+    Parameters:
+    *sinks (callable): Callables receiving every record.
+
+    Returns:
+    None
+    """
+
+    enabled = True
+
+    def __init__(self, *sinks) -> None:
+        self.sinks = list(sinks)
+        self._local = threading.local()
+
+    def __getstate__(self) -> dict:
+        # The open spans are local to the threads of this process and are not pickled
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def span(self, name: str, attributes: dict = None, **counts) -> Span:
+        """
+        Start a span, to be used as context manager: `with instrumentation.span("decode", traces=n) as span: ...`.
+
+        Parameters:
+        name (str): Name of the stage.
+        attributes (dict, optional): Values describing the span that are not counted. Default is None.
+        **counts: Initial counts of the span.
+
+        Returns:
+        Span: The started span.
+        """
+        stack = self._stack()
+        span = Span(self, name, stack[-1].name if stack else None, attributes or {}, counts)
+        stack.append(span)
+
+        return span
+
+    def emit(self, record: dict) -> None:
+        """
+        Pass a record to every sink.
+
+        Parameters:
+        record (dict): The record.
+
+        Returns:
+        None
+        """
+        for sink in self.sinks:
+            sink(record)
+
+    def _stack(self) -> list:
+        """
+        Return the spans that are open in the current thread, innermost last.
+
+        Parameters:
+        None
+
+        Returns:
+        list: Open spans.
+        """
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        return stack
+
+    def _end_span(self, span: Span, record: dict) -> None:
+        """
+        Close a span and emit its record. Spans that are ended out of order are removed from wherever they are.
+
+        Parameters:
+        span (Span): The ended span.
+        record (dict): Record of the span.
+
+        Returns:
+        None
+        """
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        elif span in stack:
+            stack.remove(span)
+        self.emit(record)
+
+
+class NullInstrumentation(Instrumentation):
+    """
+    Disabled instrumentation. Its spans are a shared object that does nothing, so instrumented code costs one method
+    call per span when no sink is attached.
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+
+    enabled = False
+
+    def __init__(self) -> None:
+        super().__init__()
+
+    def __reduce__(self) -> str:
+        # Pickled and copied synthesizers share the module-level disabled instrumentation
+        return "NULL_INSTRUMENTATION"
+
+    def span(self, name: str, attributes: dict = None, **counts) -> _NullSpan:
+        return NULL_SPAN
+
+    def emit(self, record: dict) -> None:
+        pass
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
+
+
+class MemorySink:
+    """
+    Sink keeping all records in memory, e.g. for tests or notebooks.
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+
+    def __init__(self) -> None:
+        self.records = []
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        with self._lock:
+            return {"records": list(self.records)}
+
+    def __setstate__(self, state: dict) -> None:
+        self.records = state["records"]
+        self._lock = threading.Lock()
+
+    def __call__(self, record: dict) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def clear(self) -> None:
+        """
+        Remove all records.
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        with self._lock:
+            self.records = []
+
+    def to_dataframe(self):
+        """
+        Convert the records to a DataFrame with one row per span, in the order the spans ended.
+
+        Parameters:
+        None
+
+        Returns:
+        pd.DataFrame: The records.
+        """
+        import pandas as pd
+
+        with self._lock:
+            return pd.DataFrame(self.records)
+
+
+class JSONLinesSink:
+    """
+    Sink appending every record as one JSON line to a file, so runs can be compared later. The file is flushed after
+    every record and stays open until `close` is called.
+
+    Parameters:
+    path (str): Path of the JSON lines file.
+
+    Returns:
+    None
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def __call__(self, record: dict) -> None:
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        """
+        Close the file.
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "JSONLinesSink":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def get_instrumentation(instrumentation: Instrumentation = None) -> Instrumentation:
+    """
+    Return the given instrumentation, or the disabled instrumentation if it is None.
+
+    Parameters:
+    instrumentation (Instrumentation, optional): Instrumentation passed to a pipeline function. Default is None.
+
+    Returns:
+    Instrumentation: The instrumentation to use.
+    """
+    return instrumentation if instrumentation is not None else NULL_INSTRUMENTATION
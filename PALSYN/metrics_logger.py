@@ -156,3 +156,82 @@ class CustomProgressBar(tf.keras.callbacks.Callback):
             time_str = f"{int(total_time / 3600)}h {int((total_time % 3600) / 60)}m"
 
         print(f'\r{self.target}/{self.target} [==============================] - {time_str}')
+
+
+class InstrumentationCallback(Callback):
+    """
+    Callback emitting a span for every training epoch and every training step to an instrumentation. Step spans
+    count the examples of the batch, epoch spans the examples and steps of the epoch.
+
+    Parameters:
+    instrumentation (Instrumentation): Instrumentation receiving the spans.
+    num_examples (int): Number of training examples per epoch.
+    batch_size (int): Size of the training batches.
+
+    Returns:
+    None
+    """
+
+    def __init__(self, instrumentation, num_examples: int, batch_size: int) -> None:
+        super().__init__()
+        self.instrumentation = instrumentation
+        self.num_examples = num_examples
+        self.batch_size = batch_size
+        self.epoch_span = None
+        self.step_span = None
+        self._supports_tf_logs = True
+
+    def on_epoch_begin(self, epoch: int, logs: dict = None) -> None:
+        """
+        Start the span of the epoch.
+
+        Parameters:
+        epoch (int): Current epoch number (0-based).
+        logs (dict, optional): Dictionary of metrics.
+
+        Returns:
+        None
+        """
+        self.epoch_span = self.instrumentation.span("train_epoch", attributes={"epoch": epoch + 1})
+
+    def on_train_batch_begin(self, batch: int, logs: dict = None) -> None:
+        """
+        Start the span of the training step.
+
+        Parameters:
+        batch (int): Index of the batch within the epoch.
+        logs (dict, optional): Dictionary of metrics.
+
+        Returns:
+        None
+        """
+        self.step_span = self.instrumentation.span("train_step", attributes={"step": batch + 1})
+
+    def on_train_batch_end(self, batch: int, logs: dict = None) -> None:
+        """
+        End the span of the training step. The last batch of an epoch may be smaller than the batch size.
+
+        Parameters:
+        batch (int): Index of the batch within the epoch.
+        logs (dict, optional): Dictionary of metrics.
+
+        Returns:
+        None
+        """
+        self.step_span.add(examples=min(self.batch_size, self.num_examples - batch * self.batch_size))
+        self.step_span.end()
+        self.epoch_span.add(steps=1)
+
+    def on_epoch_end(self, epoch: int, logs: dict = None) -> None:
+        """
+        End the span of the epoch.
+
+        Parameters:
+        epoch (int): Current epoch number (0-based).
+        logs (dict, optional): Dictionary of metrics.
+
+        Returns:
+        None
+        """
+        self.epoch_span.add(examples=self.num_examples)
+        self.epoch_span.end()
@@ -0,0 +1,132 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+BUNDLE_MAGIC = b"PBLESMB\n"
+BUNDLE_VERSION = 1
+# Arrays start at multiples of the alignment, so they can be viewed in place from the memory-mapped file
+BUNDLE_ALIGNMENT = 64
+
+
+def align(offset: int) -> int:
+    """
+    Round an offset up to the next multiple of the bundle alignment.
+
+    Parameters:
+    offset (int): Offset in bytes.
+
+    Returns:
+    int: Aligned offset in bytes.
+    """
+    return -(-offset // BUNDLE_ALIGNMENT) * BUNDLE_ALIGNMENT
+
+
+def encode_strings(strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Encode a list of strings as one UTF-8 byte array and the offsets of the strings in it.
+
+    Parameters:
+    strings (list[str]): Strings to encode.
+
+    Returns:
+    tuple: Byte array of the concatenated strings and int64 array of the len(strings) + 1 string boundaries.
+    """
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(string) for string in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def decode_strings(data: np.ndarray, offsets: np.ndarray) -> list[str]:
+    """
+    Decode strings encoded by `encode_strings`.
+
+    Parameters:
+    data (np.ndarray): Byte array of the concatenated strings.
+    offsets (np.ndarray): String boundaries.
+
+    Returns:
+    list[str]: Decoded strings.
+    """
+    raw = data.tobytes()
+    bounds = offsets.tolist()
+    return [raw[start:end].decode("utf-8") for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def write_bundle(path: str, header: dict, arrays: dict) -> None:
+    """
+    Write a versioned single-file bundle. The file starts with a magic number and the length of a JSON header that
+    describes the dtype, shape and offset of every array, followed by the header and the raw arrays. The file is
+    written to a temporary path first and moved into place, so readers never see a partial bundle.
+
+    Parameters:
+    path (str): Path of the bundle file.
+    header (dict): JSON-serializable metadata.
+    arrays (dict): Mapping from array name to NumPy array.
+
+    Returns:
+    None
+    """
+    layout = {}
+    offset = 0
+    contiguous_arrays = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        contiguous_arrays[name] = array
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = align(offset + array.nbytes)
+
+    header_bytes = json.dumps({**header, "format_version": BUNDLE_VERSION, "arrays": layout}).encode("utf-8")
+    data_start = align(len(BUNDLE_MAGIC) + 8 + len(header_bytes))
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as handle:
+        handle.write(BUNDLE_MAGIC)
+        handle.write(struct.pack("<Q", len(header_bytes)))
+        handle.write(header_bytes)
+        for name, array in contiguous_arrays.items():
+            handle.write(b"\0" * (data_start + layout[name]["offset"] - handle.tell()))
+            handle.write(array.tobytes())
+    os.replace(temp_path, path)
+
+
+def read_bundle(path: str) -> tuple[dict, dict]:
+    """
+    Read a bundle written by `write_bundle`. The file is memory-mapped once and the arrays are read-only views into
+    it, so only the pages that are accessed are read from disk.
+
+    Parameters:
+    path (str): Path of the bundle file.
+
+    Returns:
+    tuple: The header and the mapping from array name to read-only NumPy array.
+
+    Raises:
+    ValueError: If the file is not a bundle or was written by a newer format version.
+    """
+    with open(path, "rb") as handle:
+        if handle.read(len(BUNDLE_MAGIC)) != BUNDLE_MAGIC:
+            raise ValueError(f"{path} is not a PBLES model bundle")
+        (header_length,) = struct.unpack("<Q", handle.read(8))
+        header = json.loads(handle.read(header_length).decode("utf-8"))
+
+    if header["format_version"] > BUNDLE_VERSION:
+        raise ValueError(
+            f"{path} has bundle format version {header['format_version']}, this version of PBLES reads up to "
+            f"version {BUNDLE_VERSION}"
+        )
+
+    data_start = align(len(BUNDLE_MAGIC) + 8 + header_length)
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        shape = tuple(spec["shape"])
+        start = data_start + spec["offset"]
+        end = start + dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+        arrays[name] = buffer[start:end].view(dtype).reshape(shape)
+
+    return header, arrays
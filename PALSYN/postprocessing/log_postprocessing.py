@@ -1,9 +1,7 @@
 import datetime
-import sys
 
 import numpy as np
 import pandas as pd
-from scipy.stats import norm
 import xml.etree.ElementTree as ET
 
 XES_NAMESPACE = 'http://www.xes-standard.org/'
@@ -13,6 +11,8 @@ NA_VALUES = {
     '&lt;NA&gt;', '&lt;nan&gt;', '&lt;NaN&gt;', '&lt;null&gt;',
     '&lt;NULL&gt;', '&lt;NA&gt;', '&lt;NaT&gt;'
 }
+NA_VALUES_UPPER = {value.upper() for value in NA_VALUES}
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f+00:00"
 
 
 def clean_xes_file(xml_file, output_file):
@@ -31,7 +31,7 @@ def clean_xes_file(xml_file, output_file):
         to_remove = []
         for elem in event:
             value = elem.get('value', '').strip()
-            if value.upper() in {x.upper() for x in NA_VALUES}:
+            if value.upper() in NA_VALUES_UPPER:
                 to_remove.append(elem)
 
         for elem in to_remove:
@@ -40,23 +40,63 @@ def clean_xes_file(xml_file, output_file):
     tree.write(output_file, encoding='utf-8', xml_declaration=True)
 
 
-def generate_df(synthetic_event_log_sentences, cluster_dict, dict_dtypes, start_epoch) -> pd.DataFrame:
+def normalize_na_values(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Generate a DataFrame from synthetic event log sentences.
+    Replace empty strings and the string representations of NA values in the string columns of an event log with
+    missing values. This is the in-memory counterpart of writing the event log to XES, cleaning it with
+    `clean_xes_file` and reading it back. Every distinct value is checked once.
+
+    Parameters:
+    df (pd.DataFrame): Event log.
+
+    Returns:
+    pd.DataFrame: Event log with missing values instead of NA strings.
+    """
+    df = df.copy()
+    for column in df.columns:
+        if not pd.api.types.is_object_dtype(df[column]):
+            continue
+
+        codes, uniques = pd.factorize(df[column])
+        # Code -1 marks values that are already missing and selects the trailing True
+        is_na = np.array([str(value).strip().upper() in NA_VALUES_UPPER for value in uniques] + [True])
+        df[column] = df[column].where(~is_na[codes])
+
+    return df
+
+
+def generate_df(
+        synthetic_event_log_sentences,
+        cluster_dict,
+        dict_dtypes,
+        start_epoch,
+        rng: np.random.Generator = None,
+        case_id_offset: int = 0
+) -> pd.DataFrame:
+    """
+    Generate a DataFrame from synthetic event log sentences. The sentences are parsed into columns, cluster labels are
+    replaced with sampled values and the timestamps are computed from the sampled time between events.
 
     Parameters:
     synthetic_event_log_sentences: List of synthetic event log sentences.
     cluster_dict: Dictionary of cluster information.
     dict_dtypes: Dictionary of data types.
     start_epoch: List containing start epoch information.
-    event_attribute_dict: Dictionary containing event attribute mappings.
+    rng (np.random.Generator, optional): Random generator for the attribute values. Default is a fresh generator.
+    case_id_offset (int): Case ID of the first trace, case IDs are numbered consecutively. Default is 0.
 
     Returns:
     pd.DataFrame: Generated DataFrame.
     """
     print("Creating DF-Event Log from synthetic Data")
-    transformed_sentences = transform_sentences(synthetic_event_log_sentences, cluster_dict, dict_dtypes, start_epoch)
-    df = create_dataframe_from_sentences(transformed_sentences, dict_dtypes)
+    rng = rng if rng is not None else np.random.default_rng()
+    columns, case_lengths = parse_sentences(synthetic_event_log_sentences)
+    columns = sample_columns(columns, case_lengths, cluster_dict, dict_dtypes, start_epoch, rng)
+
+    case_ids = np.arange(case_id_offset, case_id_offset + len(case_lengths)).astype(str)
+    columns = {"case:concept:name": np.repeat(case_ids, case_lengths), **columns}
+
+    df = create_dataframe_from_columns(columns, dict_dtypes)
     df = reorder_and_sort_df(df)
 
     return df
@@ -90,70 +130,135 @@ def reorder_and_sort_df(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def create_start_epoch(start_epoch: list[float]) -> datetime.datetime:
+def sample_start_epochs(start_epoch: list[float], num_cases: int, rng: np.random.Generator = None) -> np.ndarray:
     """
-    Create a start epoch for the synthetic event log generation. The start epoch is generated using a normal
-    distribution with the mean and standard deviation specified in the start_epoch list. The generated epoch is
-    then checked against the min and max bounds. If the value is out of bounds, it is regenerated.
+    Sample the start epochs of the synthetic cases from a normal distribution with the mean and standard deviation
+    specified in the start_epoch list, truncated to the min and max bounds. All epochs are drawn in one vectorized
+    call.
 
     Parameters:
     start_epoch (list[float]): List containing: [mean, standard deviation, min bound, max bound]
+    num_cases (int): Number of start epochs to sample.
+    rng (np.random.Generator, optional): Random generator to draw from. Default is a fresh generator.
 
     Returns:
-    datetime.datetime: Start epoch as a datetime object.
+    np.ndarray: Start epochs in seconds as Unix time.
     """
+    from scipy.stats import truncnorm
+
+    rng = rng if rng is not None else np.random.default_rng()
     mean, std, min_bound, max_bound = start_epoch
-    epoch_dist = norm(loc=mean, scale=std)
 
-    while True:
-        epoch_value = epoch_dist.rvs(1)[0]
+    if std <= 0:
+        return np.full(num_cases, min(max(mean, min_bound), max_bound), dtype=float)
+
+    return truncnorm.rvs(
+        (min_bound - mean) / std,
+        (max_bound - mean) / std,
+        loc=mean,
+        scale=std,
+        size=num_cases,
+        random_state=rng
+    )
+
+
+def create_start_epoch(start_epoch: list[float], rng: np.random.Generator = None) -> datetime.datetime:
+    """
+    Create a start epoch for the synthetic event log generation, drawn like the start epochs of `sample_start_epochs`.
+
+    Parameters:
+    start_epoch (list[float]): List containing: [mean, standard deviation, min bound, max bound]
+    rng (np.random.Generator, optional): Random generator to draw from. Default is a fresh generator.
+
+    Returns:
+    datetime.datetime: Start epoch as a datetime object.
+    """
+    return datetime.datetime.fromtimestamp(sample_start_epochs(start_epoch, 1, rng)[0])
+
+
+def sample_cluster_values(cluster_labels: list[str], cluster_dict: dict, rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Sample a value for every cluster label from the normal distribution of its cluster. The labels are grouped by
+    cluster and all values are drawn in a single vectorized call.
+
+    Parameters:
+    cluster_labels (list[str]): Cluster label of every value to sample.
+    cluster_dict (dict): Dictionary mapping cluster labels to [min, max, mean, standard deviation].
+    rng (np.random.Generator, optional): Random generator to draw from. Default is a fresh generator.
+
+    Returns:
+    np.ndarray: Sampled values in the order of the cluster labels.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    if len(cluster_labels) == 0:
+        return np.zeros(0, dtype=float)
+
+    unique_labels, label_codes = np.unique(np.asarray(cluster_labels, dtype=object), return_inverse=True)
+    cluster_means = np.array([cluster_dict[label][2] for label in unique_labels], dtype=float)
+    cluster_stds = np.array([cluster_dict[label][3] for label in unique_labels], dtype=float)
 
-        if min_bound <= epoch_value <= max_bound:
-            break
+    return rng.normal(loc=cluster_means[label_codes], scale=cluster_stds[label_codes])
 
-    epoch = datetime.datetime.fromtimestamp(epoch_value)
-    return epoch
 
+def round_values(values: np.ndarray, dtype: str) -> list:
+    """
+    Round sampled values according to the data type of their attribute: floats are rounded to five decimals, all
+    other types to integers.
+
+    Parameters:
+    values (np.ndarray): Sampled values.
+    dtype (str): Data type of the attribute from the dict_dtypes mapping.
 
-def transform_sentences(synthetic_event_log_sentences, cluster_dict, dict_dtypes, start_epoch) -> list[list[str]]:
+    Returns:
+    list: Rounded values as Python floats or integers.
+    """
+    if dtype in ["float", "float64"]:
+        return np.round(values, 5).tolist()
+    return np.rint(values).astype(np.int64).tolist()
+
+
+def transform_sentences(
+        synthetic_event_log_sentences,
+        cluster_dict,
+        dict_dtypes,
+        start_epoch,
+        rng: np.random.Generator = None,
+        case_id_offset: int = 0
+) -> list[list[str]]:
     """
     Transform synthetic event log sentences by processing each word in the sentence and updating the temporary sentence.
+    The transformed sentences hold the sampled values as 'key==value' words and can be turned into a DataFrame with
+    `create_dataframe_from_sentences`. `generate_df` skips this representation and samples column-wise.
 
     Parameters:
     synthetic_event_log_sentences: List of synthetic event log sentences.
     cluster_dict: Dictionary of cluster information.
     dict_dtypes: Dictionary of data types.
     start_epoch: List containing start epoch information.
+    rng (np.random.Generator, optional): Random generator to draw from. Default is a fresh generator.
+    case_id_offset (int): Case ID of the first trace. Default is 0.
 
     Returns:
     list: List of transformed synthetic event log sentences.
     """
-    transformed_sentences = []
-    for sentence, case_id in zip(synthetic_event_log_sentences, range(len(synthetic_event_log_sentences))):
-        print(
-            "\r"
-            + "Converting into Event Log "
-            + str(round((case_id + 1) / len(synthetic_event_log_sentences) * 100, 1))
-            + "% Complete",
-            end="",
-        )
-        sys.stdout.flush()
+    rng = rng if rng is not None else np.random.default_rng()
 
-        temp_sentence = ["case:concept:name==" + str(datetime.datetime.now().timestamp()).replace(".", "")]
-        epoch = create_start_epoch(start_epoch)
+    transformed_sentences = []
+    for case_id, sentence in enumerate(synthetic_event_log_sentences):
+        temp_sentence = ["case:concept:name==" + str(case_id_offset + case_id)]
+        epoch = create_start_epoch(start_epoch, rng)
         for word in sentence:
-            temp_sentence, epoch = process_word(word, temp_sentence, dict_dtypes, cluster_dict, epoch)
+            temp_sentence, epoch = process_word(word, temp_sentence, dict_dtypes, cluster_dict, epoch, rng)
 
         transformed_sentences.append(temp_sentence)
 
-    print("\n")
-
     return transformed_sentences
 
 
-def process_word(word, temp_sentence, dict_dtypes, cluster_dict, epoch):
+def process_word(word, temp_sentence, dict_dtypes, cluster_dict, epoch, rng=None):
     """
-    Process a word in the sentence and update the temporary sentence list.
+    Process a word in the sentence and update the temporary sentence list. Kept for callers that transform sentences
+    word by word, `generate_df` samples all words of a batch at once.
 
     Parameters:
     word: The word to process
@@ -161,6 +266,7 @@ def process_word(word, temp_sentence, dict_dtypes, cluster_dict, epoch):
     dict_dtypes: Dictionary of data types from YAML
     cluster_dict: Dictionary of cluster information
     epoch: Current epoch time
+    rng: Random generator to draw from. Default is a fresh generator.
 
     Returns:
     tuple: (Updated temporary sentence list, Updated epoch)
@@ -173,38 +279,224 @@ def process_word(word, temp_sentence, dict_dtypes, cluster_dict, epoch):
         value = "0"
 
     dtype_mapping = dict_dtypes['attribute_datatypes']
-    if key in dtype_mapping and key != "time:timestamp":
+    if key == "time:timestamp":
+        seconds = round_values(np.abs(sample_cluster_values([value], cluster_dict, rng)), "int64")[0]
+        epoch = epoch + datetime.timedelta(seconds=seconds)
+        temp_sentence.append(f"time:timestamp=={epoch.strftime(TIMESTAMP_FORMAT)}")
+    elif key in dtype_mapping:
         if value in cluster_dict:
-            generation_input = cluster_dict[value]
-            dist = norm(loc=generation_input[2], scale=generation_input[3])
-            value = dist.rvs(1)[0]
-            value = round(value, 5) if dtype_mapping[key] in ["float", "float64"] else round(value)
+            value = round_values(sample_cluster_values([value], cluster_dict, rng), dtype_mapping[key])[0]
             temp_sentence.append(f"{key}=={value}")
         else:
             temp_sentence.append(word)
-    elif key == "time:timestamp":
-        generation_input = cluster_dict[value]
-        dist = norm(loc=generation_input[2], scale=generation_input[3])
-        value = abs(dist.rvs(1)[0])
-        value = round(value)
-        epoch = epoch + datetime.timedelta(seconds=value)
-        timestamp_string = epoch.strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
-        if timestamp_string == "NaT":
-            print("NaT was generated using previous Timestamp")
-            timestamp_string = temp_sentence[-1].split("==")[1]
-            timestamp_string = datetime.datetime.strptime(timestamp_string, "%Y-%m-%dT%H:%M:%S.%f+00:00")
-            timestamp_string = timestamp_string + datetime.timedelta(seconds=1)
-        temp_sentence.append(f"time:timestamp=={timestamp_string}")
 
     return temp_sentence, epoch
 
 
+def parse_sentences(synthetic_event_log_sentences) -> tuple[dict, np.ndarray]:
+    """
+    Parse synthetic event log sentences into per-column arrays of raw values, i.e. literal values and cluster labels.
+    A new event starts at every 'concept:name' word. Case attributes take the last value sampled for the case and are
+    repeated over all events of the case. Sentences without any event are dropped.
+
+    Parameters:
+    synthetic_event_log_sentences: List of synthetic event log sentences.
+
+    Returns:
+    tuple: Dictionary mapping every column to its raw values, with NaN for events that lack the column, and the
+           number of events of every parsed case.
+    """
+    column_order = {}
+    event_rows = []
+    case_attribute_rows = []
+    case_lengths = []
+
+    for sentence in synthetic_event_log_sentences:
+        case_attributes = {}
+        events = [{}]
+        has_event = False
+
+        for word in sentence:
+            parts = word.split("==")
+            if len(parts) == 2:
+                key, value = parts
+            else:
+                key = parts[0]
+                value = "0"
+            column_order.setdefault(key, None)
+
+            if key.startswith("case:"):
+                case_attributes[key] = value
+            else:
+                if key == "concept:name":
+                    if has_event:
+                        events.append({})
+                    has_event = True
+                events[-1][key] = value
+
+        if not has_event:
+            continue
+
+        event_rows.extend(events)
+        case_attribute_rows.append(case_attributes)
+        case_lengths.append(len(events))
+
+    case_lengths = np.asarray(case_lengths, dtype=np.int64)
+
+    # Case attributes are set once per case and repeated for all of its events
+    columns = {}
+    for key in column_order:
+        if key.startswith("case:"):
+            case_values = np.array([case.get(key, np.nan) for case in case_attribute_rows], dtype=object)
+            columns[key] = np.repeat(case_values, case_lengths)
+        else:
+            columns[key] = np.array([event.get(key, np.nan) for event in event_rows], dtype=object)
+
+    return columns, case_lengths
+
+
+def sample_timestamps(
+        cluster_labels: np.ndarray,
+        case_lengths: np.ndarray,
+        cluster_dict: dict,
+        start_epoch: list[float],
+        rng: np.random.Generator = None
+) -> pd.Series:
+    """
+    Sample the timestamps of the synthetic events. The time between events is sampled from the clusters of the labels
+    and accumulated per case by `compute_timestamps`.
+
+    Parameters:
+    cluster_labels (np.ndarray): Cluster label of the time since the previous event for every event, NaN for events
+                                 without a timestamp.
+    case_lengths (np.ndarray): Number of events of every case.
+    cluster_dict (dict): Dictionary of cluster information.
+    start_epoch (list[float]): List containing: [mean, standard deviation, min bound, max bound]
+    rng (np.random.Generator, optional): Random generator to draw from. Default is a fresh generator.
+
+    Returns:
+    pd.Series: Timestamps of the events, NaT for events without a timestamp.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    has_timestamp = np.array([isinstance(label, str) for label in cluster_labels], dtype=bool)
+
+    deltas = np.zeros(len(cluster_labels), dtype=float)
+    deltas[has_timestamp] = sample_cluster_values(cluster_labels[has_timestamp].tolist(), cluster_dict, rng)
+
+    return compute_timestamps(deltas, has_timestamp, case_lengths, start_epoch, rng)
+
+
+def compute_timestamps(
+        deltas: np.ndarray,
+        has_timestamp: np.ndarray,
+        case_lengths: np.ndarray,
+        start_epoch: list[float],
+        rng: np.random.Generator = None
+) -> pd.Series:
+    """
+    Compute the timestamps of the synthetic events from the sampled time between events. The absolute deltas are
+    rounded to seconds and the timestamps are the start epoch of the case plus the cumulative sum of the deltas within
+    the case. The computation stays on int64 nanoseconds since the epoch and is converted to datetime64[ns, UTC] once.
+
+    Parameters:
+    deltas (np.ndarray): Sampled time since the previous event in seconds for every event.
+    has_timestamp (np.ndarray): Boolean mask of the events that have a timestamp.
+    case_lengths (np.ndarray): Number of events of every case.
+    start_epoch (list[float]): List containing: [mean, standard deviation, min bound, max bound]
+    rng (np.random.Generator, optional): Random generator to draw the start epochs from. Default is a fresh generator.
+
+    Returns:
+    pd.Series: Timestamps of the events, NaT for events without a timestamp.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    deltas = np.where(has_timestamp, np.rint(np.abs(deltas)), 0).astype(np.int64)
+
+    start_epochs = sample_start_epochs(start_epoch, len(case_lengths), rng)
+    start_epochs_ns = np.rint(start_epochs * 1e6).astype(np.int64) * 1000
+
+    case_first_event = np.repeat(np.cumsum(case_lengths) - case_lengths, case_lengths)
+    elapsed = np.cumsum(deltas)
+    elapsed = elapsed - elapsed[case_first_event] + deltas[case_first_event]
+
+    timestamps = pd.Series(pd.to_datetime(np.repeat(start_epochs_ns, case_lengths) + elapsed * 10 ** 9, utc=True))
+    timestamps[~has_timestamp] = pd.NaT
+
+    return timestamps
+
+
+def sample_columns(
+        columns: dict,
+        case_lengths: np.ndarray,
+        cluster_dict: dict,
+        dict_dtypes: dict,
+        start_epoch: list[float],
+        rng: np.random.Generator = None
+) -> dict:
+    """
+    Replace the cluster labels of numeric attributes with sampled values and the cluster labels of the time between
+    events with timestamps. Columns that are not part of the dict_dtypes mapping are dropped.
+
+    Parameters:
+    columns (dict): Dictionary mapping every column to its raw values, as returned by `parse_sentences`.
+    case_lengths (np.ndarray): Number of events of every case.
+    cluster_dict (dict): Dictionary of cluster information.
+    dict_dtypes (dict): Dictionary of data types.
+    start_epoch (list[float]): List containing: [mean, standard deviation, min bound, max bound]
+    rng (np.random.Generator, optional): Random generator to draw from. Default is a fresh generator.
+
+    Returns:
+    dict: Dictionary mapping every column to its values.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    dtype_mapping = dict_dtypes['attribute_datatypes']
+
+    sampled_columns = {}
+    for key, values in columns.items():
+        if key == "time:timestamp":
+            sampled_columns[key] = sample_timestamps(values, case_lengths, cluster_dict, start_epoch, rng)
+        elif key in dtype_mapping:
+            is_cluster_label = np.array([isinstance(value, str) and value in cluster_dict for value in values],
+                                        dtype=bool)
+            if is_cluster_label.any():
+                values = values.copy()
+                sampled_values = sample_cluster_values(values[is_cluster_label].tolist(), cluster_dict, rng)
+                values[is_cluster_label] = round_values(sampled_values, dtype_mapping[key])
+            sampled_columns[key] = values
+
+    return sampled_columns
+
+
+def create_dataframe_from_columns(columns: dict, dict_dtypes: dict) -> pd.DataFrame:
+    """
+    Create a DataFrame from the sampled columns of the synthetic event log. The data types of the columns are
+    converted based on the dict_dtypes dictionary and the DataFrame is sorted by `sort_and_fill_timestamps`.
+
+    Parameters:
+    columns (dict): Dictionary mapping every column to its values.
+    dict_dtypes (dict): Dictionary of data types from YAML (nested under 'attribute_datatypes').
+
+    Returns:
+    pd.DataFrame: DataFrame created from the sampled columns.
+    """
+    df = pd.DataFrame(columns)
+
+    dtype_mapping = dict_dtypes['attribute_datatypes']
+
+    for key, value in dtype_mapping.items():
+        if key in df.columns and key != "time:timestamp":
+            df[key] = convert_column_dtype(df[key], value)
+
+    df = sort_and_fill_timestamps(df)
+    df = df.replace("nan", "")
+
+    return df
+
+
 def create_dataframe_from_sentences(transformed_sentences, dict_dtypes) -> pd.DataFrame:
     """
-    Create a DataFrame from the transformed synthetic event log sentences. The DataFrame is created by parsing the
-    transformed sentences and converting the data types of the columns based on the dict_dtypes dictionary. The
-    DataFrame is then sorted by 'case:concept:name' and 'time:timestamp' and the timestamps are interpolated and
-    forward-filled.
+    Create a DataFrame from the transformed synthetic event log sentences of `transform_sentences`. The sentences are
+    parsed by `parse_sentences`, the timestamp strings are converted to datetimes and the DataFrame is built by
+    `create_dataframe_from_columns`.
 
     Parameters:
     transformed_sentences: List of transformed synthetic event log sentences.
@@ -213,50 +505,31 @@ def create_dataframe_from_sentences(transformed_sentences, dict_dtypes) -> pd.Da
     Returns:
     pd.DataFrame: DataFrame created from the transformed synthetic event log sentences.
     """
-    parsed_data = []
-    removed_traces = 0
-
-    for sentence in transformed_sentences:
-        try:
-            case_dict = {
-                word.split("==")[0]: word.split("==")[1] for word in sentence if word.split("==")[0].startswith("case:")
-            }
-            event_indices = [i for i, s in enumerate(sentence) if s.startswith("concept:name")]
-            event_indices.pop(0)
-            events = np.split(sentence, event_indices)
-            event_dict_list = []
-            for event in events:
-                event_dict = {word.split("==")[0]: word.split("==")[1] for word in event}
-                event_dict.update(case_dict)
-                event_dict_list.append(event_dict)
-            parsed_data.append(event_dict_list)
-        except Exception:
-            removed_traces += 1
-
-    df = pd.DataFrame()
-    for case in parsed_data:
-        df = pd.concat([df, pd.DataFrame(case)], ignore_index=True)
+    columns, _ = parse_sentences(transformed_sentences)
+    if "time:timestamp" in columns:
+        columns["time:timestamp"] = pd.to_datetime(
+            pd.Series(columns["time:timestamp"]), format=TIMESTAMP_FORMAT, errors="coerce", utc=True
+        )
 
-    dtype_mapping = dict_dtypes['attribute_datatypes']
+    return create_dataframe_from_columns(columns, dict_dtypes)
 
-    for key, value in dtype_mapping.items():
-        if key in df.columns:
-            df[key] = convert_column_dtype(df[key], value)
 
+def sort_and_fill_timestamps(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sort the DataFrame by 'case:concept:name' and 'time:timestamp' and forward-fill missing timestamps within each
+    case. Logs without timestamps get a constant placeholder timestamp.
+
+    Parameters:
+    df (pd.DataFrame): DataFrame of the synthetic event log.
+
+    Returns:
+    pd.DataFrame: Sorted DataFrame.
+    """
     if "time:timestamp" not in df.columns:
-        df["time:timestamp"] = [pd.Timestamp("2000-01-01").strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")] * len(df)
-    else:
-        df["time:timestamp"] = pd.to_datetime(df["time:timestamp"], errors="coerce")
+        df["time:timestamp"] = pd.Timestamp("2000-01-01", tz="UTC")
 
     df.sort_values(by=["case:concept:name", "time:timestamp"], inplace=True)
-    df["time:timestamp"] = df.groupby("case:concept:name")["time:timestamp"].transform(
-        lambda x: x.interpolate(method="ffill")
-    )
-    df["time:timestamp"] = df.groupby("case:concept:name")["time:timestamp"].transform(
-        lambda x: x.ffill() if pd.isna(x.iloc[0]) else x
-    )
-
-    df = df.replace("nan", "")
+    df["time:timestamp"] = df.groupby("case:concept:name")["time:timestamp"].ffill()
 
     return df
 
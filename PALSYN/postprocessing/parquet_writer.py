@@ -0,0 +1,199 @@
+import os
+
+import pandas as pd
+
+from PALSYN.postprocessing.log_postprocessing import NA_VALUES_UPPER
+
+
+def import_pyarrow():
+    """
+    Import pyarrow, which is only needed for Parquet and Arrow output.
+
+    Parameters:
+    None
+
+    Returns:
+    tuple: The pyarrow and pyarrow.parquet modules.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError(
+            "Parquet output requires pyarrow. Install it with 'pip install pyarrow' or 'pip install PBLES[parquet]'."
+        ) from error
+
+    return pyarrow, pyarrow.parquet
+
+
+def to_columnar_frame(df: pd.DataFrame, categorical_columns: list[str] = None) -> pd.DataFrame:
+    """
+    Prepare a synthetic event log for columnar output. String columns are converted to categoricals, so they are
+    dictionary-encoded, and empty strings as well as the strings in NA_VALUES become proper nulls. Numeric and
+    timestamp columns keep their types.
+
+    Parameters:
+    df (pd.DataFrame): Synthetic event log.
+    categorical_columns (list[str], optional): Columns to convert to categoricals. Default is None, which converts
+                                               all string columns.
+
+    Returns:
+    pd.DataFrame: Event log with categorical string columns.
+    """
+    df = df.copy()
+    if categorical_columns is None:
+        categorical_columns = [column for column in df.columns if pd.api.types.is_object_dtype(df[column])]
+
+    for column in categorical_columns:
+        if column not in df.columns:
+            continue
+        values = df[column].astype("category")
+        if not pd.api.types.is_object_dtype(values.cat.categories):
+            # Columns without any value, e.g. missing from a chunk, get float categories
+            values = values.cat.rename_categories(values.cat.categories.astype(str))
+        na_categories = [
+            category for category in values.cat.categories if str(category).strip().upper() in NA_VALUES_UPPER
+        ]
+        df[column] = values.cat.remove_categories(na_categories) if na_categories else values
+
+    return df
+
+
+def arrow_type(pa, dtype: str):
+    """
+    Map a data type of the dict_dtypes mapping to the Arrow type of its column. Strings and all unknown types are
+    dictionary-encoded with int32 indices.
+
+    Parameters:
+    pa (module): The pyarrow module.
+    dtype (str): Data type of the attribute from the dict_dtypes mapping.
+
+    Returns:
+    pyarrow.DataType: Arrow type of the column.
+    """
+    if dtype in ["int64", "Int64", "int32", "Int32"]:
+        return pa.int64()
+    if dtype in ["float", "float64", "float32"]:
+        return pa.float64()
+    if dtype in ["bool", "boolean"]:
+        return pa.bool_()
+    if dtype.startswith("datetime64"):
+        return pa.timestamp("ns", tz="UTC")
+
+    return pa.dictionary(pa.int32(), pa.string())
+
+
+def arrow_schema(dict_dtypes: dict, columns: list[str] = None):
+    """
+    Build the Arrow schema of a synthetic event log from the data types of the synthesizer, so every chunk is written
+    with the same schema, whichever values the chunk happens to contain. 'time:timestamp' is always a UTC timestamp.
+
+    Parameters:
+    dict_dtypes (dict): Dictionary of data types (nested under 'attribute_datatypes').
+    columns (list[str], optional): Columns to put first, e.g. the columns of the first chunk. Default is None.
+
+    Returns:
+    pyarrow.Schema: Schema with a field for every column and every attribute of the dict_dtypes mapping.
+    """
+    pa, _ = import_pyarrow()
+    dtype_mapping = dict_dtypes['attribute_datatypes']
+
+    names = list(columns) if columns is not None else []
+    names += [name for name in dtype_mapping if name not in names]
+
+    fields = []
+    for name in names:
+        if name == "time:timestamp":
+            fields.append(pa.field(name, pa.timestamp("ns", tz="UTC")))
+        else:
+            fields.append(pa.field(name, arrow_type(pa, dtype_mapping.get(name, "string"))))
+
+    return pa.schema(fields)
+
+
+def to_arrow_table(df: pd.DataFrame, schema=None):
+    """
+    Convert a synthetic event log into an Arrow table with dictionary-encoded string columns, typed timestamps and
+    proper nulls.
+
+    Parameters:
+    df (pd.DataFrame): Synthetic event log.
+    schema (pyarrow.Schema, optional): Schema of the table. Columns of the schema that the event log lacks are
+                                       written as nulls. Default is None, which infers the schema from the event log
+                                       and uses int32 dictionary indices.
+
+    Returns:
+    pyarrow.Table: Event log as Arrow table.
+    """
+    pa, _ = import_pyarrow()
+
+    categorical_columns = None
+    if schema is not None:
+        extra_columns = [column for column in df.columns if column not in schema.names]
+        if extra_columns:
+            raise ValueError(f"Columns {extra_columns} are not part of the schema")
+        df = df.reindex(columns=schema.names)
+        categorical_columns = [field.name for field in schema if pa.types.is_dictionary(field.type)]
+
+    df = to_columnar_frame(df, categorical_columns)
+
+    if schema is None:
+        fields = []
+        for field in pa.Schema.from_pandas(df, preserve_index=False):
+            if pa.types.is_dictionary(field.type):
+                field = field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+            fields.append(field)
+        schema = pa.schema(fields)
+
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+def write_parquet(
+        event_log,
+        path: str,
+        partition_cols: list[str] = None,
+        compression: str = "snappy",
+        dict_dtypes: dict = None
+) -> int:
+    """
+    Write an event log, given as a DataFrame or as an iterable of DataFrame chunks, to a Parquet dataset. Every chunk
+    is written to its own file in the directory `path`, so the chunks are never held in memory together. All chunks
+    share the schema built from `dict_dtypes`, or without it the schema inferred from the first chunk.
+
+    Parameters:
+    event_log (pd.DataFrame or iterable): Event log or chunks of the event log.
+    path (str): Directory of the Parquet dataset.
+    partition_cols (list[str], optional): Columns to partition the dataset by. Default is None.
+    compression (str): Parquet compression codec. Default is "snappy".
+    dict_dtypes (dict, optional): Data types of the synthesizer, which determine the schema. Default is None.
+
+    Returns:
+    int: Number of written rows.
+    """
+    _, pq = import_pyarrow()
+    chunks = [event_log] if isinstance(event_log, pd.DataFrame) else event_log
+    os.makedirs(path, exist_ok=True)
+
+    schema = None
+    num_rows = 0
+    for chunk_index, chunk in enumerate(chunks):
+        if len(chunk) == 0:
+            continue
+        if schema is None and dict_dtypes is not None:
+            schema = arrow_schema(dict_dtypes, chunk.columns)
+        table = to_arrow_table(chunk, schema)
+        schema = table.schema
+
+        if partition_cols:
+            pq.write_to_dataset(
+                table,
+                path,
+                partition_cols=partition_cols,
+                basename_template=f"part-{chunk_index:05d}-{{i}}.parquet",
+                compression=compression
+            )
+        else:
+            pq.write_table(table, os.path.join(path, f"part-{chunk_index:05d}.parquet"), compression=compression)
+        num_rows += table.num_rows
+
+    return num_rows
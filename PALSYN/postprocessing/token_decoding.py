@@ -0,0 +1,228 @@
+import numpy as np
+import pandas as pd
+
+from PALSYN.instrumentation import Instrumentation, get_instrumentation
+from PALSYN.preprocessing.special_tokens import START_TOKEN, END_TOKEN
+from PALSYN.postprocessing.log_postprocessing import (
+    compute_timestamps,
+    convert_column_dtype,
+    reorder_and_sort_df,
+    sort_and_fill_timestamps,
+)
+
+NUMERIC_DTYPES = ["int64", "float", "float64"]
+STRING_DTYPES = ["date", "string", "object"]
+
+
+def split_token(word: str) -> tuple[str, str]:
+    """
+    Split a token into the column it belongs to and its value, the same way the sentence path does after the
+    activity prefix has been removed by `clean_sequence`.
+
+    Parameters:
+    word (str): Token of the tokenizer vocabulary.
+
+    Returns:
+    tuple: Column and value of the token.
+    """
+    if not word.startswith("case:"):
+        word = "==".join(word.split("==")[1:])
+    parts = word.split("==")
+    if len(parts) == 2:
+        return parts[0], parts[1]
+    return parts[0], "0"
+
+
+class TokenVocabulary:
+    """
+    Decoding tables of the tokenizer vocabulary. Every token index is mapped once to the column it belongs to, its
+    literal value, its numeric value and the cluster it stands for, so sampled token sequences can be decoded into
+    typed columns without parsing strings. Tokens of columns that are not part of the dict_dtypes mapping, as well as
+    the start and end tokens, are mapped to column -1 and ignored.
+
+    Parameters:
+    word_index (dict): Mapping from token to token index of the fitted tokenizer.
+    cluster_dict (dict): Dictionary mapping cluster labels to [min, max, mean, standard deviation].
+    dict_dtypes (dict): Dictionary of data types from YAML (nested under 'attribute_datatypes').
+
+    Returns:
+    None
+    """
+
+    def __init__(self, word_index: dict, cluster_dict: dict, dict_dtypes: dict) -> None:
+        dtype_mapping = dict_dtypes['attribute_datatypes']
+        vocabulary_size = max(word_index.values(), default=0) + 1
+
+        self.cluster_labels = list(cluster_dict)
+        self.cluster_means = np.array([cluster_dict[label][2] for label in self.cluster_labels], dtype=float)
+        self.cluster_stds = np.array([cluster_dict[label][3] for label in self.cluster_labels], dtype=float)
+        cluster_codes = {label: code for code, label in enumerate(self.cluster_labels)}
+
+        self.columns = []
+        self.column_dtypes = []
+        column_codes = {}
+
+        self.token_columns = np.full(vocabulary_size, -1, dtype=np.int32)
+        self.token_clusters = np.full(vocabulary_size, -1, dtype=np.int32)
+        self.token_values = np.full(vocabulary_size, np.nan, dtype=object)
+        self.token_numeric_values = np.full(vocabulary_size, np.nan, dtype=float)
+
+        for word, index in word_index.items():
+            if word in [START_TOKEN, END_TOKEN]:
+                continue
+            column, value = split_token(word)
+            if column not in dtype_mapping and column != "time:timestamp":
+                continue
+
+            if column not in column_codes:
+                column_codes[column] = len(self.columns)
+                self.columns.append(column)
+                self.column_dtypes.append(dtype_mapping.get(column))
+
+            self.token_columns[index] = column_codes[column]
+            self.token_values[index] = value
+            if value in cluster_codes:
+                self.token_clusters[index] = cluster_codes[value]
+            else:
+                try:
+                    self.token_numeric_values[index] = float(value)
+                except ValueError:
+                    pass
+
+        self.column_is_case = np.array([column.startswith("case:") for column in self.columns], dtype=bool)
+        self.activity_column = column_codes.get("concept:name", -1)
+
+
+def keep_last_per_row(rows: np.ndarray, columns: np.ndarray, num_columns: int) -> np.ndarray:
+    """
+    Find the last token written to every (row, column) cell, as later tokens overwrite earlier ones.
+
+    Parameters:
+    rows (np.ndarray): Row of every token.
+    columns (np.ndarray): Column of every token.
+    num_columns (int): Number of columns.
+
+    Returns:
+    np.ndarray: Sorted indices of the tokens that are kept.
+    """
+    cells = rows.astype(np.int64) * num_columns + columns
+    _, last_reversed = np.unique(cells[::-1], return_index=True)
+    return np.sort(len(cells) - 1 - last_reversed)
+
+
+def decode_token_sequences(
+        token_sequences: list,
+        vocabulary: TokenVocabulary,
+        start_epoch: list[float],
+        rng: np.random.Generator = None,
+        case_id_offset: int = 0,
+        instrumentation: Instrumentation = None
+) -> pd.DataFrame:
+    """
+    Decode sampled token sequences into a DataFrame with typed columns. A new event starts at every activity token and
+    case attributes take the last value sampled for the case. The values of all cluster tokens are drawn in a single
+    vectorized call and written directly into numeric column buffers, timestamps are computed by
+    `compute_timestamps`. Sequences without any event are dropped.
+
+    Parameters:
+    token_sequences (list): Token indices of every sampled trace.
+    vocabulary (TokenVocabulary): Decoding tables of the tokenizer vocabulary.
+    start_epoch (list[float]): List containing: [mean, standard deviation, min bound, max bound]
+    rng (np.random.Generator, optional): Random generator to draw from. Default is a fresh generator.
+    case_id_offset (int, optional): Number of the first case ID. Default is 0.
+    instrumentation (Instrumentation, optional): Instrumentation receiving a 'build_dataframe' span for the
+                                                 construction and sorting of the DataFrame. Default is None, which
+                                                 records nothing.
+
+    Returns:
+    pd.DataFrame: DataFrame containing the synthetic event log.
+    """
+    print("Creating DF-Event Log from synthetic Data")
+    rng = rng if rng is not None else np.random.default_rng()
+    instrumentation = get_instrumentation(instrumentation)
+
+    sequence_lengths = np.array([len(sequence) for sequence in token_sequences], dtype=np.int64)
+    tokens = np.concatenate(
+        [np.asarray(sequence, dtype=np.int64) for sequence in token_sequences] + [np.zeros(0, dtype=np.int64)]
+    )
+    token_sequence = np.repeat(np.arange(len(token_sequences)), sequence_lengths)
+
+    token_columns = vocabulary.token_columns[tokens]
+    is_attribute = token_columns >= 0
+    tokens, token_columns = tokens[is_attribute], token_columns[is_attribute]
+    token_sequence = token_sequence[is_attribute]
+
+    # Drop sequences without any event and number the remaining cases consecutively
+    is_activity = token_columns == vocabulary.activity_column
+    sequence_events = np.bincount(token_sequence[is_activity], minlength=len(token_sequences))
+    has_events = sequence_events > 0
+    in_case = has_events[token_sequence]
+    tokens, token_columns, is_activity = tokens[in_case], token_columns[in_case], is_activity[in_case]
+    token_cases = (np.cumsum(has_events) - 1)[token_sequence[in_case]]
+
+    case_lengths = sequence_events[has_events]
+    num_cases = len(case_lengths)
+
+    # Tokens before the first activity of a case belong to its first event
+    first_event = np.cumsum(case_lengths) - case_lengths
+    token_events = np.maximum(np.cumsum(is_activity) - 1, first_event[token_cases])
+
+    token_is_case = vocabulary.column_is_case[token_columns]
+    token_rows = np.where(token_is_case, token_cases, token_events)
+    kept = keep_last_per_row(token_rows, token_columns, len(vocabulary.columns))
+    tokens, token_columns, token_rows = tokens[kept], token_columns[kept], token_rows[kept]
+
+    token_clusters = vocabulary.token_clusters[tokens]
+    is_cluster = token_clusters >= 0
+    token_values = vocabulary.token_numeric_values[tokens]
+    token_values[is_cluster] = rng.normal(
+        loc=vocabulary.cluster_means[token_clusters[is_cluster]],
+        scale=vocabulary.cluster_stds[token_clusters[is_cluster]]
+    )
+
+    case_ids = np.arange(case_id_offset, case_id_offset + num_cases).astype(str)
+    columns = {"case:concept:name": np.repeat(case_ids, case_lengths)}
+
+    num_events = int(case_lengths.sum())
+    # Event attributes come before case attributes, as in the sampled sentences
+    for code in np.argsort(vocabulary.column_is_case, kind="stable"):
+        column, dtype = vocabulary.columns[code], vocabulary.column_dtypes[code]
+        in_column = token_columns == code
+        rows = token_rows[in_column]
+        num_rows = num_cases if vocabulary.column_is_case[code] else num_events
+        values = token_values[in_column]
+        sampled = is_cluster[in_column]
+
+        if column == "time:timestamp":
+            deltas = np.zeros(num_rows, dtype=float)
+            has_timestamp = np.zeros(num_rows, dtype=bool)
+            deltas[rows] = values
+            has_timestamp[rows] = True
+            columns[column] = compute_timestamps(deltas, has_timestamp, case_lengths, start_epoch, rng).to_numpy()
+            continue
+
+        if dtype in NUMERIC_DTYPES:
+            values[sampled] = np.rint(values[sampled]) if dtype == "int64" else np.round(values[sampled], 5)
+            column_values = np.full(num_rows, np.nan, dtype=float)
+            column_values[rows] = values
+        else:
+            literals = vocabulary.token_values[tokens[in_column]].copy()
+            literals[sampled] = np.rint(values[sampled]).astype(np.int64).astype(str)
+            column_values = np.full(num_rows, "" if dtype in STRING_DTYPES else np.nan, dtype=object)
+            column_values[rows] = literals
+
+        if vocabulary.column_is_case[code]:
+            column_values = np.repeat(column_values, case_lengths)
+
+        if dtype == "int64":
+            column_values = pd.array(column_values, dtype="Int64")
+        elif dtype not in NUMERIC_DTYPES and dtype not in STRING_DTYPES:
+            column_values = convert_column_dtype(pd.Series(column_values, name=column), dtype).to_numpy()
+        columns[column] = column_values
+
+    with instrumentation.span("build_dataframe", events=num_events):
+        df = pd.DataFrame(columns)
+        df = sort_and_fill_timestamps(df)
+        df = reorder_and_sort_df(df)
+
+    return df
@@ -0,0 +1,215 @@
+import gzip
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+import pandas as pd
+
+from PALSYN.postprocessing.log_postprocessing import NA_VALUES_UPPER, XES_NAMESPACE
+
+XES_HEADER = (
+    "<?xml version='1.0' encoding='UTF-8'?>\n"
+    f'<log xes.version="1849-2016" xes.features="nested-attributes" xmlns="{XES_NAMESPACE}">\n'
+    '\t<extension name="Concept" prefix="concept" uri="http://www.xes-standard.org/concept.xesext"/>\n'
+    '\t<extension name="Time" prefix="time" uri="http://www.xes-standard.org/time.xesext"/>\n'
+    '\t<extension name="Organizational" prefix="org" uri="http://www.xes-standard.org/org.xesext"/>\n'
+)
+XES_FOOTER = "</log>\n"
+
+
+def xes_attribute_type(column: pd.Series) -> str:
+    """
+    Map the dtype of a DataFrame column to the XES attribute type it is written as.
+
+    Parameters:
+    column (pd.Series): Column of the event log.
+
+    Returns:
+    str: One of 'date', 'boolean', 'int', 'float' or 'string'.
+    """
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return "date"
+    if pd.api.types.is_bool_dtype(column):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(column):
+        return "int"
+    if pd.api.types.is_float_dtype(column):
+        return "float"
+    return "string"
+
+
+def format_xes_values(column: pd.Series) -> np.ndarray:
+    """
+    Format the values of a column as XES attribute values. Every distinct value is formatted once, values are escaped
+    for XML and NA values, including the string representations in NA_VALUES, are mapped to None.
+
+    Parameters:
+    column (pd.Series): Column of the event log.
+
+    Returns:
+    np.ndarray: Quoted attribute value of every row, None for NA values.
+    """
+    attribute_type = xes_attribute_type(column)
+    if attribute_type == "date":
+        timestamps = column.dt.tz_convert("UTC").dt.tz_localize(None) if column.dt.tz is not None else column
+        timestamps = timestamps.to_numpy().astype("datetime64[us]")
+        column = pd.Series(np.datetime_as_string(timestamps, unit="us")).where(~np.isnat(timestamps)) + "+00:00"
+
+    codes, uniques = pd.factorize(column, sort=False)
+    if attribute_type == "boolean":
+        formatted = ["true" if value else "false" for value in uniques]
+    else:
+        formatted = [str(value) for value in uniques]
+
+    quoted = np.array(
+        [None if value.strip().upper() in NA_VALUES_UPPER else quoteattr(value) for value in formatted] + [None],
+        dtype=object
+    )
+    # Code -1 marks missing values and selects the trailing None
+    return quoted[codes]
+
+
+def format_xes_attributes(df: pd.DataFrame, columns: list[str], keys: list[str], indent: str) -> list[str]:
+    """
+    Render the attribute elements of every row of the DataFrame for the given columns, skipping NA values.
+
+    Parameters:
+    df (pd.DataFrame): Rows of the event log.
+    columns (list[str]): Columns to render.
+    keys (list[str]): XES attribute key of every column.
+    indent (str): Indentation of the attribute elements.
+
+    Returns:
+    list[str]: Concatenated attribute elements of every row.
+    """
+    rendered_columns = []
+    for column, key in zip(columns, keys):
+        attribute_type = xes_attribute_type(df[column])
+        prefix = f"{indent}<{attribute_type} key={quoteattr(key)} value="
+        values = format_xes_values(df[column])
+        rendered_columns.append([f"{prefix}{value}/>\n" if value is not None else "" for value in values])
+
+    return ["".join(row) for row in zip(*rendered_columns)] if rendered_columns else [""] * len(df)
+
+
+class XESWriter:
+    """
+    Streaming writer for XES files. Event logs are written chunk by chunk, so only the chunk being written is held in
+    memory. Attributes are written with the XES type of their column, NA values are skipped instead of being removed
+    from the file afterwards, and columns prefixed with 'case:' are written as trace attributes. Paths ending in '.gz'
+    are gzip-compressed.
+
+    Parameters:
+    path (str): Path of the XES file.
+    compress (bool, optional): Gzip-compress the file. Default is None, which compresses paths ending in '.gz'.
+
+    Returns:
+    None
+    """
+
+    def __init__(self, path: str, compress: bool = None) -> None:
+        self.path = path
+        self.compress = path.endswith(".gz") if compress is None else compress
+        self.num_traces = 0
+        self.num_events = 0
+        self._file = None
+
+    def open(self) -> "XESWriter":
+        """
+        Open the file and write the XES header.
+
+        Parameters:
+        None
+
+        Returns:
+        XESWriter: The writer itself.
+        """
+        if self.compress:
+            self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        else:
+            self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(XES_HEADER)
+        return self
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        Write the traces of a chunk of the event log. The rows of a case must be contiguous and every case must be
+        contained in a single chunk.
+
+        Parameters:
+        df (pd.DataFrame): Chunk of the event log with a 'case:concept:name' column.
+
+        Returns:
+        None
+        """
+        if len(df) == 0:
+            return
+
+        trace_columns = [column for column in df.columns if column.startswith("case:")]
+        event_columns = [column for column in df.columns if not column.startswith("case:")]
+
+        case_ids = df["case:concept:name"].to_numpy()
+        trace_starts = np.flatnonzero(np.r_[True, case_ids[1:] != case_ids[:-1]])
+        trace_ends = np.r_[trace_starts[1:], len(df)]
+
+        trace_attributes = format_xes_attributes(
+            df.iloc[trace_starts],
+            trace_columns,
+            [column[len("case:"):] for column in trace_columns],
+            "\t\t"
+        )
+        event_attributes = format_xes_attributes(df, event_columns, event_columns, "\t\t\t")
+
+        lines = []
+        for trace_start, trace_end, attributes in zip(trace_starts, trace_ends, trace_attributes):
+            lines.append("\t<trace>\n")
+            lines.append(attributes)
+            for event in event_attributes[trace_start:trace_end]:
+                lines.append("\t\t<event>\n")
+                lines.append(event)
+                lines.append("\t\t</event>\n")
+            lines.append("\t</trace>\n")
+
+        self._file.write("".join(lines))
+        self.num_traces += len(trace_starts)
+        self.num_events += len(df)
+
+    def close(self) -> None:
+        """
+        Write the closing tag and close the file.
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        if self._file is not None:
+            self._file.write(XES_FOOTER)
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "XESWriter":
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def write_xes(event_log, path: str, compress: bool = None) -> int:
+    """
+    Write an event log, given as a DataFrame or as an iterable of DataFrame chunks, to an XES file.
+
+    Parameters:
+    event_log (pd.DataFrame or iterable): Event log or chunks of the event log with a 'case:concept:name' column.
+    path (str): Path of the XES file.
+    compress (bool, optional): Gzip-compress the file. Default is None, which compresses paths ending in '.gz'.
+
+    Returns:
+    int: Number of written traces.
+    """
+    chunks = [event_log] if isinstance(event_log, pd.DataFrame) else event_log
+    with XESWriter(path, compress) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+
+    return writer.num_traces
@@ -4,16 +4,9 @@ from datetime import datetime
 
 import numpy as np
 import pandas as pd
-import pm4py
-from sklearn.cluster import KMeans
-from diffprivlib.models import KMeans as DP_KMeans
-from diffprivlib.mechanisms import Laplace
-from tensorflow_privacy import compute_dp_sgd_privacy_statement
 
-os.environ["LOKY_MAX_CPU_COUNT"] = str(max(os.cpu_count() - 1, 1))
-
-START_TOKEN = 'START==START'
-END_TOKEN = 'END==concept:name==END'
+from PALSYN.instrumentation import Instrumentation, get_instrumentation
+from PALSYN.preprocessing.special_tokens import START_TOKEN, END_TOKEN
 
 
 def extract_epsilon_from_string(text: str) -> float:
@@ -36,6 +29,38 @@ def extract_epsilon_from_string(text: str) -> float:
     return float(epsilon_poisson)
 
 
+def compute_dp_sgd_epsilon(noise_multiplier: float, num_examples: int, batch_size: int, epochs: int) -> float:
+    """
+    Computes the epsilon spent by DP-SGD training with a given noise multiplier, assuming Poisson sampling and the
+    delta used by find_noise_multiplier. Training for fewer epochs than the noise multiplier was calibrated for
+    spends less than the target epsilon.
+
+    Parameters:
+    noise_multiplier (float): Noise multiplier of the DP optimizer
+    num_examples (int): Number of training examples
+    batch_size (int): Size of training batches
+    epochs (int): Number of training epochs
+
+    Returns:
+    float: Epsilon spent by the DP-SGD training
+    """
+    from tensorflow_privacy import compute_dp_sgd_privacy_statement
+
+    if epochs == 0:
+        return 0.0
+
+    privacy_statement = compute_dp_sgd_privacy_statement(
+        number_of_examples=num_examples,
+        batch_size=batch_size,
+        num_epochs=epochs,
+        noise_multiplier=noise_multiplier,
+        used_microbatching=False,
+        delta=1 / (num_examples ** 1.1)
+    )
+
+    return extract_epsilon_from_string(privacy_statement)
+
+
 def find_noise_multiplier(
         target_epsilon: float,
         num_examples: int,
@@ -66,23 +91,13 @@ def find_noise_multiplier(
     - DP-KMeans: 25% of target epsilon
     - DP-SGD: 50% of target epsilon
     """
-    delta = 1 / (num_examples ** 1.1)
     search_range = {"low": 1e-6, "high": 100}
     noise_multiplier = None
 
     for _ in range(max_iter):
         current_noise = (search_range["low"] + search_range["high"]) / 2
 
-        privacy_statement = compute_dp_sgd_privacy_statement(
-            number_of_examples=num_examples,
-            batch_size=batch_size,
-            num_epochs=epochs,
-            noise_multiplier=current_noise,
-            used_microbatching=False,
-            delta=delta
-        )
-
-        current_epsilon = extract_epsilon_from_string(privacy_statement)
+        current_epsilon = compute_dp_sgd_epsilon(current_noise, num_examples, batch_size, epochs)
         epsilon_difference = abs(current_epsilon - target_epsilon)
 
         if epsilon_difference <= tol:
@@ -129,6 +144,8 @@ def calculate_dp_bounds(df: pd.DataFrame, epsilon: float, std_multiplier: float
     - Privacy budget (epsilon) is split equally between mean and standard deviation calculations
     - Timestamp columns are bounded by [0, noisy_max] to ensure validity
     """
+    from diffprivlib.mechanisms import Laplace
+
     dp_bounds = {}
     numeric_cols = df.select_dtypes(include=[np.number]).columns
 
@@ -188,6 +205,11 @@ def calculate_clusters(df, max_clusters, epsilon=None):
     if not isinstance(max_clusters, int) or max_clusters <= 0:
         raise ValueError("max_clusters must be a positive integer")
 
+    # Limit the joblib workers of KMeans before sklearn is imported
+    os.environ["LOKY_MAX_CPU_COUNT"] = str(max(os.cpu_count() - 1, 1))
+    from sklearn.cluster import KMeans
+    from diffprivlib.models import KMeans as DP_KMeans
+
     numeric_cols = df.select_dtypes(include=[np.number]).columns
     df_org = df.copy()
     df_cluster_list = []
@@ -281,6 +303,8 @@ def calculate_starting_epoch(
         if epsilon is None:
             return [starting_epoch_mean, starting_epoch_std, starting_epoch_min, max_timestamp]
 
+        from diffprivlib.mechanisms import Laplace
+
         n_traces = len(starting_epoch_list)
         range_epochs = max_timestamp - starting_epoch_min
 
@@ -367,7 +391,15 @@ def get_attribute_dtype_mapping(df: pd.DataFrame) -> dict:
     return {'attribute_datatypes': dtype_dict}
 
 
-def preprocess_event_log(log, max_clusters: int, trace_quantile: float, epsilon: float, batch_size: int, epochs: int):
+def preprocess_event_log(
+        log,
+        max_clusters: int,
+        trace_quantile: float,
+        epsilon: float,
+        batch_size: int,
+        epochs: int,
+        instrumentation: Instrumentation = None
+):
     """
     Preprocesses event log data with optional differential privacy.
 
@@ -378,20 +410,30 @@ def preprocess_event_log(log, max_clusters: int, trace_quantile: float, epsilon:
     epsilon (float): Privacy budget (None for no DP)
     batch_size (int): Batch size for DP-SGD
     epochs (int): Number of training epochs
+    instrumentation (Instrumentation, optional): Instrumentation receiving a span for every preprocessing step.
+                                                 Default is None, which records nothing.
 
     Returns:
     tuple: Processed event log data and metadata
     """
-    try:
-        df = pm4py.convert_to_dataframe(log)
-    except Exception as e:
-        raise ValueError(f"Error converting log to DataFrame: {e}")
+    import pm4py
+
+    instrumentation = get_instrumentation(instrumentation)
+
+    with instrumentation.span("convert_to_dataframe") as span:
+        try:
+            df = pm4py.convert_to_dataframe(log)
+        except Exception as e:
+            raise ValueError(f"Error converting log to DataFrame: {e}")
+        span.add(events=len(df))
 
     print("Number of traces: " + str(df["case:concept:name"].unique().size))
 
-    trace_length = df.groupby("case:concept:name").size()
-    trace_length_q = trace_length.quantile(trace_quantile)
-    df = df.groupby("case:concept:name").filter(lambda x: len(x) <= trace_length_q)
+    with instrumentation.span("truncate_traces", events=len(df)) as span:
+        trace_length = df.groupby("case:concept:name").size()
+        trace_length_q = trace_length.quantile(trace_quantile)
+        df = df.groupby("case:concept:name").filter(lambda x: len(x) <= trace_length_q)
+        span.add(traces=len(trace_length))
 
     print("Number of traces after truncation: " + str(df["case:concept:name"].unique().size))
     df = df.sort_values(by=["case:concept:name", "time:timestamp"])
@@ -400,21 +442,23 @@ def preprocess_event_log(log, max_clusters: int, trace_quantile: float, epsilon:
     if epsilon is None:
         print("No Epsilon is specified setting noise multiplier to 0")
         noise_multiplier = 0
-        starting_epoch_dist = calculate_starting_epoch(df)
-        time_between_events = calculate_time_between_events(df)
-        df["time:timestamp"] = time_between_events
-        attribute_dtype_mapping = get_attribute_dtype_mapping(df)
-        df, cluster_dict = calculate_clusters(df, max_clusters)
+        epsilon_k_means = None
     else:
         print("Finding Optimal Noise Multiplier")
         epsilon_noise_multiplier = epsilon / 2
         epsilon_k_means = epsilon / 2
-        noise_multiplier = find_noise_multiplier(epsilon_noise_multiplier, num_examples, batch_size, epochs)
+        with instrumentation.span("find_noise_multiplier"):
+            noise_multiplier = find_noise_multiplier(epsilon_noise_multiplier, num_examples, batch_size, epochs)
+
+    with instrumentation.span("calculate_starting_epoch", events=num_examples):
         # Epsilon does not need to be shared here since the first timestamp defines a distinct dataset.
         starting_epoch_dist = calculate_starting_epoch(df, epsilon)
+    with instrumentation.span("calculate_time_between_events", events=num_examples):
         time_between_events = calculate_time_between_events(df)
         df["time:timestamp"] = time_between_events
+    with instrumentation.span("get_attribute_dtype_mapping", events=num_examples):
         attribute_dtype_mapping = get_attribute_dtype_mapping(df)
+    with instrumentation.span("calculate_clusters", events=num_examples):
         df, cluster_dict = calculate_clusters(df, max_clusters, epsilon_k_means)
 
     cols = ["concept:name", "time:timestamp"] + [
@@ -441,6 +485,8 @@ def preprocess_event_log(log, max_clusters: int, trace_quantile: float, epsilon:
     total_traces = df['case:concept:name'].nunique()
     event_log_sentence_list = []
 
+    sentences_span = instrumentation.span("build_sentences", traces=total_traces, events=len(df))
+
     # Use groupby instead of filtering for each trace
     for i, (_, trace_group) in enumerate(df.groupby("case:concept:name"), 1):
         progress = min(99.9, (i / total_traces) * 100)
@@ -474,6 +520,7 @@ def preprocess_event_log(log, max_clusters: int, trace_quantile: float, epsilon:
     # Print 100% at completion with carriage return
     print("\rProcessing traces: 100.0%", end="", flush=True)
     print()  # New line after completion
+    sentences_span.end()
 
     return (
         event_log_sentence_list,
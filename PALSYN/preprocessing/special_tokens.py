@@ -0,0 +1,2 @@
+START_TOKEN = 'START==START'
+END_TOKEN = 'END==concept:name==END'
@@ -0,0 +1,288 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def model_fingerprint(path: str, use_content_hash: bool = False) -> str:
+    """
+    Fingerprint a saved model, i.e. a bundle file or a model directory, so that a changed model is detected. By
+    default the fingerprint covers the relative path, size and modification time of every file in the directory
+    tree, including nested directories, optionally it hashes the file contents instead.
+
+    Parameters:
+    path (str): Path of the bundle file or model directory.
+    use_content_hash (bool): Hash the file contents instead of using sizes and modification times. Default is False.
+
+    Returns:
+    str: Fingerprint of the saved model.
+    """
+    if os.path.isfile(path):
+        root_path = os.path.dirname(path)
+        file_paths = [path]
+    else:
+        root_path = path
+        file_paths = sorted(
+            os.path.join(directory, name) for directory, _, names in os.walk(path) for name in names
+        )
+
+    fingerprint = hashlib.sha256()
+    for file_path in file_paths:
+        fingerprint.update(os.path.relpath(file_path, root_path).replace(os.sep, "/").encode("utf-8"))
+        if use_content_hash:
+            with open(file_path, "rb") as handle:
+                for block in iter(lambda: handle.read(1 << 20), b""):
+                    fingerprint.update(block)
+        else:
+            file_stat = os.stat(file_path)
+            fingerprint.update(f"{file_stat.st_size}:{file_stat.st_mtime_ns}".encode("utf-8"))
+
+    return fingerprint.hexdigest()
+
+
+def model_nbytes(synthesizer) -> int:
+    """
+    Estimate the memory held by a loaded synthesizer from the size of its model weights.
+
+    Parameters:
+    synthesizer (DPEventLogSynthesizer): Loaded synthesizer.
+
+    Returns:
+    int: Size of the model weights in bytes.
+    """
+    return int(sum(np.prod(weight.shape) * weight.dtype.size for weight in synthesizer.model.weights))
+
+
+class ModelRegistry:
+    """
+    In-process cache of loaded synthesizers for serving several models. Synthesizers are keyed by the absolute path of
+    the saved model and reloaded when the fingerprint of the files changes. When the registry holds more than
+    `max_models` synthesizers or their weights exceed `max_bytes` bytes, the least recently used synthesizers are
+    evicted. Loaded synthesizers are warmed up, i.e. their inference function is traced and called once, so the first
+    sampling call does not pay for it.
+
+    Parameters:
+    max_models (int): Maximum number of loaded synthesizers. Default is 8.
+    max_bytes (int): Maximum size of the model weights of all loaded synthesizers in bytes. Default is None, which
+                     only bounds the number of synthesizers.
+    use_content_hash (bool): Detect changed models by hashing the file contents instead of using sizes and
+                             modification times. Default is False.
+
+    Returns:
+    None
+    """
+
+    def __init__(self, max_models: int = 8, max_bytes: int = None, use_content_hash: bool = False) -> None:
+        if max_models <= 0:
+            raise ValueError("max_models must be a positive integer")
+
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.use_content_hash = use_content_hash
+
+        self._entries = OrderedDict()
+        # Load lock and number of waiting or loading threads per model, dropped once no thread uses it
+        self._load_locks = {}
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+        self._evictions = 0
+        self._loads = 0
+        self._load_seconds = 0.0
+        self._last_load_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, path: str):
+        """
+        Return the synthesizer of a saved model, loading it if it is not cached or has changed on disk. Concurrent
+        calls for the same model load it only once.
+
+        Parameters:
+        path (str): Path of the bundle file or model directory.
+
+        Returns:
+        DPEventLogSynthesizer: Loaded and warmed-up synthesizer.
+        """
+        key = os.path.abspath(path)
+        fingerprint = model_fingerprint(key, self.use_content_hash)
+
+        with self._lock:
+            synthesizer = self._lookup(key, fingerprint)
+            if synthesizer is not None:
+                return synthesizer
+            load_lock = self._load_locks.setdefault(key, [threading.Lock(), 0])
+            load_lock[1] += 1
+
+        try:
+            return self._load_once(key, fingerprint, load_lock[0])
+        finally:
+            with self._lock:
+                load_lock[1] -= 1
+                if load_lock[1] == 0:
+                    del self._load_locks[key]
+
+    def _load_once(self, key: str, fingerprint: str, load_lock: threading.Lock):
+        """
+        Load a saved model while holding its load lock, unless another thread has loaded it in the meantime, and add
+        it to the registry.
+
+        Parameters:
+        key (str): Absolute path of the saved model.
+        fingerprint (str): Current fingerprint of the saved model.
+        load_lock (threading.Lock): Load lock of the saved model.
+
+        Returns:
+        DPEventLogSynthesizer: Loaded and warmed-up synthesizer.
+        """
+        with load_lock:
+            # Another thread may have loaded the model while this one was waiting
+            with self._lock:
+                synthesizer = self._lookup(key, fingerprint, record=False)
+                if synthesizer is not None:
+                    return synthesizer
+
+            start_time = time.perf_counter()
+            synthesizer = self._load(key)
+            load_seconds = time.perf_counter() - start_time
+
+            with self._lock:
+                if key in self._entries:
+                    self._remove(key)
+                    self._reloads += 1
+                nbytes = model_nbytes(synthesizer)
+                self._entries[key] = (fingerprint, synthesizer, nbytes)
+                self._nbytes += nbytes
+                self._loads += 1
+                self._load_seconds += load_seconds
+                self._last_load_seconds = load_seconds
+
+                while len(self._entries) > self.max_models or (
+                        self.max_bytes is not None and self._nbytes > self.max_bytes and len(self._entries) > 1
+                ):
+                    self._remove(next(iter(self._entries)))
+                    self._evictions += 1
+
+        return synthesizer
+
+    def _lookup(self, key: str, fingerprint: str, record: bool = True):
+        """
+        Look up a cached synthesizer with a matching fingerprint and mark it as recently used. Must be called with the
+        registry lock held.
+
+        Parameters:
+        key (str): Absolute path of the saved model.
+        fingerprint (str): Current fingerprint of the saved model.
+        record (bool): Count the lookup as hit or miss. Default is True.
+
+        Returns:
+        DPEventLogSynthesizer: Cached synthesizer, or None if it is not cached or outdated.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == fingerprint:
+            if record:
+                self._hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        if record:
+            self._misses += 1
+        return None
+
+    @staticmethod
+    def _load(path: str):
+        """
+        Load a synthesizer and warm up its inference function and decoding tables.
+
+        Parameters:
+        path (str): Path of the bundle file or model directory.
+
+        Returns:
+        DPEventLogSynthesizer: Loaded synthesizer.
+        """
+        from PALSYN.synthesizer import DPEventLogSynthesizer
+
+        synthesizer = DPEventLogSynthesizer()
+        synthesizer.load(path)
+        synthesizer.warm_up()
+
+        return synthesizer
+
+    def _remove(self, key: str) -> None:
+        """
+        Drop a synthesizer from the registry. Must be called with the registry lock held.
+
+        Parameters:
+        key (str): Absolute path of the saved model.
+
+        Returns:
+        None
+        """
+        _, _, nbytes = self._entries.pop(key)
+        self._nbytes -= nbytes
+
+    def invalidate(self, path: str) -> None:
+        """
+        Drop the synthesizer of a saved model, so it is reloaded on the next access.
+
+        Parameters:
+        path (str): Path of the bundle file or model directory.
+
+        Returns:
+        None
+        """
+        with self._lock:
+            key = os.path.abspath(path)
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """
+        Drop all synthesizers and reset the statistics.
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._reloads = 0
+            self._evictions = 0
+            self._loads = 0
+            self._load_seconds = 0.0
+            self._last_load_seconds = 0.0
+
+    def stats(self) -> dict:
+        """
+        Return hit-rate, load-latency and memory statistics of the registry.
+
+        Parameters:
+        None
+
+        Returns:
+        dict: Dictionary with the number of 'hits', 'misses', 'reloads' of changed models and 'evictions', the
+              'hit_rate', the number of 'loads' with their 'mean_load_seconds' and 'last_load_seconds', the number of
+              loaded 'models' and the size of their weights in 'bytes'.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "reloads": self._reloads,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "loads": self._loads,
+                "mean_load_seconds": self._load_seconds / self._loads if self._loads else 0.0,
+                "last_load_seconds": self._last_load_seconds,
+                "models": len(self._entries),
+                "bytes": self._nbytes,
+            }
@@ -1,10 +1,20 @@
+import math
 import time
-import random
 
 import numpy as np
-from tensorflow.keras import backend as K
-from keras.utils import pad_sequences
-from PALSYN.preprocessing.log_preprocessing import START_TOKEN, END_TOKEN
+from PALSYN.instrumentation import Instrumentation, get_instrumentation
+from PALSYN.preprocessing.special_tokens import START_TOKEN, END_TOKEN
+from PALSYN.sampling.prefix_cache import PrefixCache
+
+TRACE_RUNNING = 0
+TRACE_KEPT = 1
+TRACE_DISCARDED = 2
+
+# Weight of the prior survival rate in the online estimate, counted in finished traces
+PRIOR_WEIGHT = 10
+# Lower bound on the survival rate used for over-provisioning and cap on started traces per requested trace
+MIN_SURVIVAL_RATE = 0.1
+MAX_OVERSAMPLING = 10
 
 
 def clean_sequence(sequence: list[str], max_length: int) -> list[str]:
@@ -21,6 +31,52 @@ def clean_sequence(sequence: list[str], max_length: int) -> list[str]:
     return trace
 
 
+def build_valid_token_table(index_word: dict, column_list: list[str]) -> dict:
+    """
+    Group the vocabulary by the (activity, column) pair each token belongs to. This replaces the scan over the full
+    vocabulary that was done for every trace and column in every sampling step.
+
+    Parameters:
+    index_word (dict): Mapping from token index to token.
+    column_list (list[str]): List of event columns predicted by the model.
+
+    Returns:
+    dict: Mapping from (activity, column) to the list of token indices that may be drawn for that column. The key
+          (None, column) holds the tokens that are valid when no activity has been sampled yet for the event.
+    """
+    valid_token_table = {}
+    for index, word in index_word.items():
+        parts = word.split("==")
+        if len(parts) < 3 or parts[1] not in column_list:
+            continue
+        valid_token_table.setdefault((parts[0], parts[1]), []).append(index)
+        valid_token_table.setdefault((None, parts[1]), []).append(index)
+
+    return valid_token_table
+
+
+def predict_outputs(token_sequences: np.ndarray, model, predict_fn=None) -> list[np.ndarray]:
+    """
+    Predict the next-event distributions of a batch of padded token sequences.
+
+    Parameters:
+    token_sequences (np.ndarray): Pre-padded token sequences of shape (batch, max_sequence_len).
+    model: Trained sequence model, used if no `predict_fn` is given.
+    predict_fn (callable, optional): Function mapping the token sequences to the model outputs. Default is None.
+
+    Returns:
+    list[np.ndarray]: One array of shape (batch, total_words) per predicted column.
+    """
+    if predict_fn is not None:
+        predictions = predict_fn(token_sequences)
+    else:
+        predictions = model.predict(token_sequences, verbose=0)
+    if not isinstance(predictions, (list, tuple)):
+        predictions = [predictions]
+
+    return [np.asarray(prediction_output) for prediction_output in predictions]
+
+
 def sample_batch(
         sample_size: int,
         tokenizer,
@@ -28,102 +84,241 @@ def sample_batch(
         model,
         batch_size: int,
         num_cols: int,
-        column_list: list[str]
-) -> list[list[str]]:
+        column_list: list[str],
+        stats: dict = None,
+        survival_rate: float = None,
+        rng: np.random.Generator = None,
+        predict_fn=None,
+        prefix_cache: PrefixCache = None,
+        return_token_ids: bool = False,
+        valid_token_table: dict = None,
+        instrumentation: Instrumentation = None,
+        verbose: bool = False
+) -> list:
     """
     Generate synthetic event log sentences using a trained DP-BiLSTM model with conditional sampling.
+
+    Traces are kept as token indices in a pre-padded window of the last `max_sequence_len` tokens. Finished traces
+    are dropped from the window after every step, so each model call only predicts traces that are still being
+    extended. A trace is discarded as soon as it reaches the retention length of 1.5 times `max_sequence_len`, and
+    traces without a single event are discarded when they end.
+
+    The number of traces started is derived from an online estimate of the share of traces that survive, and free
+    batch slots are refilled with new traces while the expected number of survivors is below `sample_size`. The
+    first `sample_size` survivors in start order are returned, which keeps the result an unbiased sample although
+    short traces finish first.
+
+    All state is local to the call and no global Keras or NumPy state is touched, so several calls may run
+    concurrently as long as each one gets its own generator.
+
+    Parameters:
+    sample_size (int): Number of traces to sample.
+    tokenizer: Tokenizer fitted on the training event log.
+    max_sequence_len (int): Input length of the model.
+    model: Trained sequence model.
+    batch_size (int): Minimum number of traces sampled in parallel.
+    num_cols (int): Number of event columns predicted per step.
+    column_list (list[str]): List of event columns predicted by the model.
+    stats (dict, optional): Dictionary that is updated in place with the sampling counters 'model_calls',
+                            'rows_predicted', 'batch_slots', 'traces_started', 'traces_kept' and 'traces_discarded',
+                            the resulting 'utilization', i.e. the share of batch slots that held a live trace, and
+                            the observed 'survival_rate'. With a prefix cache, 'prefix_cache_hits' counts the
+                            traces that were served from the cache. Counters accumulate over repeated calls.
+    survival_rate (float, optional): Prior estimate of the share of finished traces that survive. Default is 1.0.
+    rng (np.random.Generator, optional): Random generator to draw tokens from. Default is a fresh generator.
+    predict_fn (callable, optional): Function mapping a batch of padded token sequences to the model outputs, used
+                                     instead of `model.predict`. Default is None.
+    prefix_cache (PrefixCache, optional): Cache of the model outputs for token prefixes. Traces whose prefix is
+                                          cached are not passed to the model. Default is None.
+    return_token_ids (bool, optional): Return the token indices of the traces instead of sentences, to be decoded by
+                                       `decode_token_sequences`. Default is False.
+    valid_token_table (dict, optional): Valid token indices per (activity, column) pair as built by
+                                        `build_valid_token_table`. Default is None, which builds the table.
+    instrumentation (Instrumentation, optional): Instrumentation receiving a 'sample_step' span for every step of
+                                                 the batch, with the number of traces extended, model rows predicted
+                                                 and traces kept and discarded. Default is None, which records
+                                                 nothing.
+    verbose (bool, optional): Print a progress bar and a summary of the batch. Default is False.
+
+    Returns:
+    list: List of at most `sample_size` synthetic event log sentences, or arrays of token indices if
+          `return_token_ids` is set.
     """
     start_time = time.time()
+    rng = rng if rng is not None else np.random.default_rng()
+    instrumentation = get_instrumentation(instrumentation)
+
+    retention_len = round(max_sequence_len * 1.5)
+    prior_rate = min(max(survival_rate or 1.0, MIN_SURVIVAL_RATE), 1.0)
+    max_traces = sample_size * MAX_OVERSAMPLING
+    batch_capacity = min(max(batch_size, math.ceil(sample_size / prior_rate)), max_traces)
 
-    effective_batch_size = max(batch_size, sample_size)
-    synthetic_event_log_sentences = []
     index_word = {index: word for word, index in tokenizer.word_index.items()}
-    batch_seed_texts = [[START_TOKEN] * num_cols for _ in range(effective_batch_size)]
-    batch_active = np.ones(effective_batch_size, dtype=bool)
+    if valid_token_table is None:
+        valid_token_table = build_valid_token_table(index_word, column_list)
+    token_activities = {index: word.split("==")[0] for index, word in index_word.items()}
+    start_token_index = tokenizer.word_index[START_TOKEN]
+
+    batch_token_lists = []
+    batch_outcomes = []
+    batch_window = np.zeros((0, max_sequence_len), dtype=np.int32)
+    batch_live = np.zeros(0, dtype=np.int64)
+
+    model_calls = 0
+    rows_predicted = 0
+    prefix_cache_hits = 0
+    traces_kept = 0
+    traces_discarded = 0
+    selected_traces = []
+    frontier = 0
 
     # Progress tracking variables
-    total_sequences = effective_batch_size
+    total_sequences = sample_size
     completed_sequences = 0
     last_percentage = 0
 
     def update_progress():
         nonlocal completed_sequences, last_percentage
         completed_sequences += 1
-        current_percentage = int((completed_sequences / total_sequences) * 100)
-        if current_percentage > last_percentage:
+        current_percentage = min(int((completed_sequences / total_sequences) * 100), 100)
+        if verbose and current_percentage > last_percentage:
             progress_bar = "█" * (current_percentage // 2) + "░" * (50 - (current_percentage // 2))
             print(f"\rProgress: |{progress_bar}| {current_percentage}% ", end="", flush=True)
             last_percentage = current_percentage
 
-    while np.any(batch_active):
-        token_lists = [tokenizer.texts_to_sequences([seq])[0] for seq in batch_seed_texts]
-        padded_token_lists = pad_sequences(token_lists, maxlen=max_sequence_len, padding="pre")
-        model.reset_states()
-        predictions = model.predict(padded_token_lists, verbose=0)
+    while len(selected_traces) < sample_size:
+        # Refill free batch slots while the expected number of survivors falls short of the sample size
+        rate = (traces_kept + prior_rate * PRIOR_WEIGHT) / (traces_kept + traces_discarded + PRIOR_WEIGHT)
+        rate = max(rate, MIN_SURVIVAL_RATE)
+        expected_survivors = traces_kept + len(batch_live) * rate
+        if expected_survivors < sample_size:
+            num_new = min(
+                batch_capacity - len(batch_live),
+                max_traces - len(batch_token_lists),
+                math.ceil((sample_size - expected_survivors) / rate)
+            )
+            if num_new > 0:
+                new_window = np.zeros((num_new, max_sequence_len), dtype=np.int32)
+                new_window[:, -num_cols:] = start_token_index
+                new_live = np.arange(len(batch_token_lists), len(batch_token_lists) + num_new)
+                batch_window = np.concatenate([batch_window, new_window], axis=0)
+                batch_live = np.concatenate([batch_live, new_live])
+                batch_token_lists.extend([start_token_index] * num_cols for _ in range(num_new))
+                batch_outcomes.extend([TRACE_RUNNING] * num_new)
+
+        if len(batch_live) == 0:
+            break
 
-        for i, (active, seq) in enumerate(zip(batch_active, batch_seed_texts)):
-            if not active:
-                continue
+        step_span = instrumentation.span("sample_step", traces=len(batch_live))
+        rows_predicted_before = rows_predicted
+        traces_kept_before = traces_kept
+        traces_discarded_before = traces_discarded
+        if prefix_cache is None:
+            predictions = predict_outputs(batch_window, model, predict_fn)
+            model_calls += 1
+            rows_predicted += len(batch_live)
+        else:
+            cached_outputs = prefix_cache.lookup_many([batch_token_lists[trace_index] for trace_index in batch_live])
+            miss_rows = [row for row, cached_output in enumerate(cached_outputs) if cached_output is None]
+            predictions = np.empty((num_cols, len(batch_live), len(index_word) + 1), dtype=np.float32)
 
+            for row, cached_output in enumerate(cached_outputs):
+                if cached_output is not None:
+                    predictions[:, row] = cached_output
+
+            if miss_rows:
+                miss_predictions = np.stack(predict_outputs(batch_window[miss_rows], model, predict_fn))
+                predictions[:, miss_rows] = miss_predictions
+                for miss_index, row in enumerate(miss_rows):
+                    prefix_cache.insert(batch_token_lists[batch_live[row]], miss_predictions[:, miss_index])
+                model_calls += 1
+                rows_predicted += len(miss_rows)
+
+            prefix_cache_hits += len(batch_live) - len(miss_rows)
+
+        batch_continue = np.ones(len(batch_live), dtype=bool)
+        batch_next_tokens = np.zeros((len(batch_live), num_cols), dtype=np.int32)
+
+        for row, trace_index in enumerate(batch_live):
             latest_concept_name = None
-            synth_row = []
-
-            for prediction_output, column in zip(predictions, column_list):
-                prediction_output = prediction_output[i]
-                prediction_output = prediction_output / np.sum(prediction_output)
-
-                if latest_concept_name is None:
-                    valid_tokens = [
-                        index for index, word in index_word.items()
-                        if f"=={column}==" in word
-                    ]
-                else:
-                    valid_tokens = [
-                        index for index, word in index_word.items()
-                        if f"{latest_concept_name}=={column}==" in word
-                    ]
-
-                if len(valid_tokens) == 0:
-                    batch_active[i] = False
-                    update_progress()
+
+            for step, (prediction_output, column) in enumerate(zip(predictions, column_list)):
+                valid_tokens = valid_token_table.get((latest_concept_name, column))
+
+                if valid_tokens is None:
+                    batch_continue[row] = False
                     break
 
-                filtered_probabilities = [prediction_output[token] for token in valid_tokens]
-                filtered_probabilities = np.array(filtered_probabilities) / np.sum(filtered_probabilities)
+                filtered_probabilities = prediction_output[row, valid_tokens]
+                filtered_probabilities = filtered_probabilities / np.sum(filtered_probabilities)
 
-                next_word_index = np.random.choice(valid_tokens, p=filtered_probabilities)
-                next_word = index_word.get(next_word_index, END_TOKEN)
+                next_word_index = rng.choice(valid_tokens, p=filtered_probabilities)
 
                 if column == "concept:name":
-                    latest_concept_name = next_word.split("==")[0]
-                    if latest_concept_name == "END" or next_word == END_TOKEN:
-                        batch_active[i] = False
-                        update_progress()
+                    latest_concept_name = token_activities.get(next_word_index, "END")
+                    if latest_concept_name == "END":
+                        batch_continue[row] = False
                         break
 
-                synth_row.append(next_word)
+                batch_next_tokens[row, step] = next_word_index
+
+            token_list = batch_token_lists[trace_index]
+            if batch_continue[row]:
+                token_list.extend(batch_next_tokens[row].tolist())
+                if len(token_list) >= retention_len:
+                    batch_continue[row] = False
+                    batch_outcomes[trace_index] = TRACE_DISCARDED
+                    traces_discarded += 1
+            elif len(token_list) > num_cols:
+                batch_outcomes[trace_index] = TRACE_KEPT
+                traces_kept += 1
+                update_progress()
+            else:
+                batch_outcomes[trace_index] = TRACE_DISCARDED
+                traces_discarded += 1
 
-            if batch_active[i]:
-                seq.extend(synth_row)
-                if len(seq) >= (max_sequence_len * 2):
-                    batch_active[i] = False
-                    update_progress()
+        # Select survivors in start order up to the first trace that is still running
+        while frontier < len(batch_outcomes) and batch_outcomes[frontier] != TRACE_RUNNING:
+            if batch_outcomes[frontier] == TRACE_KEPT and len(selected_traces) < sample_size:
+                selected_traces.append(frontier)
+            frontier += 1
 
-    synthetic_event_log_sentences.extend(batch_seed_texts)
-    K.clear_session()
+        # Compact the window to the traces that are still being extended
+        batch_window = np.concatenate([batch_window[:, num_cols:], batch_next_tokens], axis=1)[batch_continue]
+        batch_live = batch_live[batch_continue]
+        step_span.add(
+            rows_predicted=rows_predicted - rows_predicted_before,
+            traces_kept=traces_kept - traces_kept_before,
+            traces_discarded=traces_discarded - traces_discarded_before
+        )
+        step_span.end()
 
-    # Clean event prefixes and exclude overly long sequences
-    clean_synthetic_event_log_sentences = [
-        clean_sequence(sentence, round(max_sequence_len * 1.5))
-        for sentence in synthetic_event_log_sentences
-        if len(sentence) < round(max_sequence_len * 1.5)
-    ]
+    if stats is not None:
+        stats["model_calls"] = stats.get("model_calls", 0) + model_calls
+        stats["rows_predicted"] = stats.get("rows_predicted", 0) + rows_predicted
+        stats["batch_slots"] = stats.get("batch_slots", 0) + model_calls * batch_capacity
+        stats["traces_started"] = stats.get("traces_started", 0) + len(batch_token_lists)
+        stats["traces_kept"] = stats.get("traces_kept", 0) + traces_kept
+        stats["traces_discarded"] = stats.get("traces_discarded", 0) + traces_discarded
+        if prefix_cache is not None:
+            stats["prefix_cache_hits"] = stats.get("prefix_cache_hits", 0) + prefix_cache_hits
+        stats["utilization"] = stats["rows_predicted"] / max(stats["batch_slots"], 1)
+        stats["survival_rate"] = stats["traces_kept"] / max(stats["traces_kept"] + stats["traces_discarded"], 1)
 
-    # Randomly sample the required number of sequences
-    if len(clean_synthetic_event_log_sentences) > sample_size:
-        clean_synthetic_event_log_sentences = random.sample(clean_synthetic_event_log_sentences, sample_size)
+    if return_token_ids:
+        clean_synthetic_event_log_sentences = [
+            np.array(batch_token_lists[trace_index], dtype=np.int32) for trace_index in selected_traces
+        ]
+    else:
+        # Clean event prefixes
+        clean_synthetic_event_log_sentences = [
+            clean_sequence([index_word[index] for index in batch_token_lists[trace_index]], retention_len)
+            for trace_index in selected_traces
+        ]
 
-    print(f"\nGenerated {len(clean_synthetic_event_log_sentences)} sequences")
-    print("Time taken to generate synthetic event log sentences: ", time.time() - start_time)
+    if verbose:
+        print(f"\nGenerated {len(clean_synthetic_event_log_sentences)} sequences from {len(batch_token_lists)} traces")
+        print(f"Batch utilization: {rows_predicted / max(model_calls * batch_capacity, 1):.1%}")
+        print("Time taken to generate synthetic event log sentences: ", time.time() - start_time)
 
-    return clean_synthetic_event_log_sentences
\ No newline at end of file
+    return clean_synthetic_event_log_sentences
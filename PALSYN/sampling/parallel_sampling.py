@@ -0,0 +1,148 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+_worker_synthesizer = None
+
+
+def _init_worker(model_path: str, intra_op_threads: int) -> None:
+    """
+    Load the synthesizer once per worker process. TensorFlow is limited to its share of the CPU cores, so that the
+    workers do not oversubscribe the machine.
+
+    Parameters:
+    model_path (str): Path to the saved model.
+    intra_op_threads (int): Number of threads TensorFlow may use for a single operation.
+
+    Returns:
+    None
+    """
+    global _worker_synthesizer
+
+    import tensorflow as tf
+    from PALSYN.synthesizer import DPEventLogSynthesizer
+
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    _worker_synthesizer = DPEventLogSynthesizer()
+    _worker_synthesizer.load(model_path)
+
+
+def _sample_worker(
+        sample_size: int,
+        batch_size: int,
+        seed_sequence: np.random.SeedSequence,
+        survival_rate: float
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Sample a share of the event log in a worker process.
+
+    Parameters:
+    sample_size (int): Number of traces to sample in this worker.
+    batch_size (int): Number of traces to sample in a batch.
+    seed_sequence (np.random.SeedSequence): Seed sequence of this share.
+    survival_rate (float): Survival rate used to over-provision the first batch.
+
+    Returns:
+    tuple: Sampled DataFrame and the sampling statistics of the worker.
+    """
+    _worker_synthesizer.survival_rate = survival_rate
+    df = _worker_synthesizer.sample(sample_size, batch_size, seed=seed_sequence)
+    return df, _worker_synthesizer.sampling_stats
+
+
+def merge_sampling_stats(stats_list: list[dict]) -> dict:
+    """
+    Merge the sampling statistics of several sampling runs by summing the counters and recomputing the rates.
+
+    Parameters:
+    stats_list (list[dict]): Sampling statistics as filled by `sample_batch`.
+
+    Returns:
+    dict: Merged sampling statistics.
+    """
+    merged = {}
+    for stats in stats_list:
+        for key, value in stats.items():
+            if key not in ["utilization", "survival_rate"]:
+                merged[key] = merged.get(key, 0) + value
+
+    if "batch_slots" in merged:
+        merged["utilization"] = merged["rows_predicted"] / max(merged["batch_slots"], 1)
+    if "traces_kept" in merged:
+        merged["survival_rate"] = merged["traces_kept"] / max(merged["traces_kept"] + merged["traces_discarded"], 1)
+
+    return merged
+
+
+def merge_event_logs(dfs: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate sampled event logs and renumber the case IDs, so that they are unique across the logs. Case IDs are
+    assigned consecutively in the order of the logs and of the first appearance of a case within each log.
+
+    Parameters:
+    dfs (list[pd.DataFrame]): Sampled event logs.
+
+    Returns:
+    pd.DataFrame: Merged event log.
+    """
+    case_id_offset = 0
+    renumbered_dfs = []
+    for df in dfs:
+        df = df.copy()
+        case_codes, case_ids = pd.factorize(df["case:concept:name"])
+        df["case:concept:name"] = (case_codes + case_id_offset).astype(str)
+        case_id_offset += len(case_ids)
+        renumbered_dfs.append(df)
+
+    return pd.concat(renumbered_dfs, axis=0, ignore_index=True)
+
+
+def sample_parallel(
+        model_path: str,
+        sample_size: int,
+        batch_size: int,
+        n_jobs: int,
+        seed=None,
+        survival_rate: float = None
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Sample an event log with several worker processes. The requested traces are split evenly across the workers and
+    every share draws from its own generator, derived from the seed with `np.random.SeedSequence.spawn`. The result
+    is therefore reproducible for a given seed and number of workers, independent of the worker scheduling.
+
+    Parameters:
+    model_path (str): Path to the saved model, which each worker loads once.
+    sample_size (int): Number of traces to sample.
+    batch_size (int): Number of traces to sample in a batch.
+    n_jobs (int): Number of worker processes.
+    seed (int or np.random.SeedSequence, optional): Seed of the sampling run. Default is fresh entropy.
+    survival_rate (float, optional): Survival rate used to over-provision the first batch of every worker.
+
+    Returns:
+    tuple: Merged event log and merged sampling statistics.
+    """
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    shares = [sample_size // n_jobs + (1 if i < sample_size % n_jobs else 0) for i in range(n_jobs)]
+    intra_op_threads = max(1, math.floor((os.cpu_count() or 1) / n_jobs))
+
+    with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_path, intra_op_threads)
+    ) as executor:
+        futures = [
+            executor.submit(_sample_worker, share, batch_size, child_sequence, survival_rate)
+            for share, child_sequence in zip(shares, seed_sequence.spawn(n_jobs))
+            if share > 0
+        ]
+        results = [future.result() for future in futures]
+
+    df = merge_event_logs([df for df, _ in results])
+    stats = merge_sampling_stats([stats for _, stats in results])
+
+    return df, stats
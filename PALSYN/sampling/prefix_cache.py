@@ -0,0 +1,224 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Default number of events of the cached prefixes and default size limit of the cached distributions
+DEFAULT_PREFIX_EVENTS = 3
+DEFAULT_MAX_BYTES = 256 * 2 ** 20
+
+
+class _TrieNode:
+    __slots__ = ("token", "parent", "children", "value")
+
+    def __init__(self, token: int = None, parent: "_TrieNode" = None) -> None:
+        self.token = token
+        self.parent = parent
+        self.children = {}
+        self.value = None
+
+
+class PrefixCache:
+    """
+    Bounded LRU cache of the model outputs for token prefixes. Prefixes are stored in a trie, so traces that share
+    their first events share the path to the cached next-event distributions. Only prefixes of at most `max_depth`
+    tokens are cached, deeper prefixes are rarely shared and always fall through to the model. When the cache exceeds
+    `max_entries` entries or `max_bytes` bytes, the least recently used distributions are evicted.
+
+    Parameters:
+    max_entries (int): Maximum number of cached prefixes. Default is 10000.
+    max_depth (int): Maximum prefix length in tokens that is cached. Default is None, which caches prefixes of any
+                     length.
+    max_bytes (int): Maximum size of the cached distributions in bytes. Every entry takes 4 * num_cols * total_words
+                     bytes. Default is 256 MB, None only bounds the number of entries.
+
+    Returns:
+    None
+    """
+
+    def __init__(
+            self,
+            max_entries: int = 10000,
+            max_depth: int = None,
+            max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be a positive integer")
+
+        self.max_entries = max_entries
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+
+        self._root = _TrieNode()
+        self._entries = OrderedDict()
+        self._num_nodes = 1
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._uncacheable = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        with self._lock:
+            state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def lookup(self, prefix: list[int]) -> np.ndarray:
+        """
+        Look up the cached model outputs for a token prefix and mark them as recently used. Prefixes deeper than
+        `max_depth` are counted as uncacheable, not as misses.
+
+        Parameters:
+        prefix (list[int]): Token indices of the trace so far.
+
+        Returns:
+        np.ndarray: Array of shape (num_cols, total_words) with one output distribution per column, or None if the
+                    prefix is not cached.
+        """
+        return self.lookup_many([prefix])[0]
+
+    def lookup_many(self, prefixes: list[list[int]]) -> list:
+        """
+        Look up the cached model outputs for several token prefixes under a single acquisition of the lock, e.g. for
+        all traces of a sampling step. Prefixes deeper than `max_depth` are skipped without walking the trie and
+        counted as uncacheable, so the hit rate only covers prefixes the cache can hold.
+
+        Parameters:
+        prefixes (list[list[int]]): Token indices of the traces so far.
+
+        Returns:
+        list: Cached output array or None for every prefix.
+        """
+        values = [None] * len(prefixes)
+        with self._lock:
+            for position, prefix in enumerate(prefixes):
+                if self.max_depth is not None and len(prefix) > self.max_depth:
+                    self._uncacheable += 1
+                    continue
+
+                node = self._root
+                for token in prefix:
+                    node = node.children.get(token)
+                    if node is None:
+                        break
+
+                if node is None or node.value is None:
+                    self._misses += 1
+                    continue
+
+                self._hits += 1
+                self._entries.move_to_end(node)
+                values[position] = node.value
+
+        return values
+
+    def insert(self, prefix: list[int], value: np.ndarray) -> None:
+        """
+        Cache the model outputs for a token prefix. Prefixes deeper than `max_depth` are ignored.
+
+        Parameters:
+        prefix (list[int]): Token indices of the trace so far.
+        value (np.ndarray): Array of shape (num_cols, total_words) with one output distribution per column.
+
+        Returns:
+        None
+        """
+        if self.max_depth is not None and len(prefix) > self.max_depth:
+            return
+
+        value = np.array(value, dtype=np.float32)
+        if self.max_bytes is not None and value.nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            node = self._root
+            for token in prefix:
+                child = node.children.get(token)
+                if child is None:
+                    child = _TrieNode(token, node)
+                    node.children[token] = child
+                    self._num_nodes += 1
+                node = child
+
+            if node.value is not None:
+                self._nbytes -= node.value.nbytes
+            node.value = value
+            self._nbytes += value.nbytes
+            self._entries[node] = None
+            self._entries.move_to_end(node)
+
+            while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and self._nbytes > self.max_bytes
+            ):
+                self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        """
+        Drop the least recently used distribution and prune trie nodes that no longer lead to a cached prefix.
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        node, _ = self._entries.popitem(last=False)
+        self._nbytes -= node.value.nbytes
+        node.value = None
+        self._evictions += 1
+
+        while node.parent is not None and node.value is None and not node.children:
+            del node.parent.children[node.token]
+            self._num_nodes -= 1
+            node = node.parent
+
+    def clear(self) -> None:
+        """
+        Remove all cached distributions and reset the statistics.
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        with self._lock:
+            self._root = _TrieNode()
+            self._entries.clear()
+            self._num_nodes = 1
+            self._nbytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._uncacheable = 0
+            self._evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Return hit-rate and memory statistics of the cache.
+
+        Parameters:
+        None
+
+        Returns:
+        dict: Dictionary with the number of 'hits', 'misses', lookups of prefixes deeper than `max_depth`
+              ('uncacheable') and 'evictions', the 'hit_rate' of the cacheable lookups, the number of cached
+              'entries', the number of trie 'nodes' and the size of the cached distributions in 'bytes'.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "uncacheable": self._uncacheable,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "nodes": self._num_nodes,
+                "bytes": self._nbytes,
+            }
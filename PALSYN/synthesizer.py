@@ -1,33 +1,46 @@
 import os
 import pickle
+import shutil
+import tempfile
+import threading
 import yaml
 
+import numpy as np
 import pandas as pd
 import tensorflow as tf
-from keras import Input, Model
-from keras.callbacks import EarlyStopping
-from keras.layers import (
-    BatchNormalization,
-    Bidirectional,
-    Dense,
-    Dropout,
-    Embedding,
-    LSTM,
-    Masking,
-    GRU,
-    GlobalAveragePooling1D,
-    SimpleRNN,
-)
-
-from tensorflow_privacy.privacy.optimizers.dp_optimizer_keras import (
-    DPKerasAdamOptimizer,
-)
+from tensorflow.keras.preprocessing.text import Tokenizer
 
-from PALSYN.metrics_logger import MetricsLogger, CustomProgressBar
+from PALSYN.instrumentation import NULL_INSTRUMENTATION, Instrumentation
 from PALSYN.preprocessing.log_preprocessing import preprocess_event_log
 from PALSYN.preprocessing.log_tokenization import tokenize_log
-from PALSYN.sampling.log_sampling import sample_batch
-from PALSYN.postprocessing.log_postprocessing import generate_df
+from PALSYN.sampling.log_sampling import build_valid_token_table, sample_batch
+from PALSYN.sampling.parallel_sampling import sample_parallel
+from PALSYN.sampling.prefix_cache import DEFAULT_MAX_BYTES, DEFAULT_PREFIX_EVENTS, PrefixCache
+from PALSYN.postprocessing.token_decoding import TokenVocabulary, decode_token_sequences
+from PALSYN.postprocessing.xes_writer import write_xes
+from PALSYN.postprocessing.parquet_writer import write_parquet
+from PALSYN.model_bundle import decode_strings, encode_strings, read_bundle, write_bundle
+
+
+# Directory of the inference graph that earlier versions exported next to the Keras model
+INFERENCE_GRAPH_DIR = "inference"
+
+# Attributes set by the preprocessing and tokenization of the input event log
+PREPROCESSED_ATTRIBUTES = (
+    "event_log_sentences",
+    "cluster_dict",
+    "dict_dtypes",
+    "start_epoch",
+    "num_examples",
+    "noise_multiplier",
+    "num_cols",
+    "column_list",
+    "xs",
+    "ys",
+    "total_words",
+    "max_sequence_len",
+    "tokenizer",
+)
 
 
 class DPEventLogSynthesizer:
@@ -94,6 +107,52 @@ class DPEventLogSynthesizer:
         self.epsilon = epsilon
         self.l2_norm_clip = l2_norm_clip
         self.num_examples = None
+        self.sampling_stats = None
+        self.survival_rate = None
+        self.model_path = None
+        self.prefix_cache = None
+        self.instrumentation = NULL_INSTRUMENTATION
+        self._predict_fn = None
+        self._token_vocabulary = None
+        self._valid_token_table = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        """
+        Return the state for pickling and copying. Locks and traced TensorFlow functions cannot be pickled, the
+        inference function is traced again on use. The model is stored as architecture and weights without its DP
+        optimizer, which Keras cannot restore, so like a loaded model the restored one samples but is not compiled.
+
+        Parameters:
+        None
+
+        Returns:
+        dict: State of the synthesizer.
+        """
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_predict_fn"] = None
+        if self.model is not None:
+            state["model"] = (self.model.to_json(), self.model.get_weights())
+
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the state of a pickled or copied synthesizer.
+
+        Parameters:
+        state (dict): State returned by `__getstate__`.
+
+        Returns:
+        None
+        """
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        if self.model is not None:
+            model_config, weights = self.model
+            self.model = tf.keras.models.model_from_json(model_config)
+            self.model.set_weights(weights)
 
     def initialize_model(self, input_data: pd.DataFrame) -> None:
         """
@@ -107,21 +166,109 @@ class DPEventLogSynthesizer:
         Returns:
         None
         """
-        (
-            self.event_log_sentences,
-            self.cluster_dict,
-            self.dict_dtypes,
-            self.start_epoch,
-            self.num_examples,
-            self.noise_multiplier,
-            self.num_cols,
-            self.column_list
-        ) = preprocess_event_log(
-            input_data, self.max_clusters, self.trace_quantile, self.epsilon, self.batch_size, self.epochs
-        )
+        self.preprocess(input_data)
+        self._build_model()
+
+    def preprocessing_key(self) -> tuple:
+        """
+        Return the settings the preprocessing depends on. Synthesizers with equal keys produce the same preprocessed
+        state, so one preprocessing pass can be shared between them with `initialize_from_preprocessed`.
+
+        Parameters:
+        None
+
+        Returns:
+        tuple: Maximum number of clusters, trace quantile, epsilon, batch size and number of epochs.
+        """
+        return self.max_clusters, self.trace_quantile, self.epsilon, self.batch_size, self.epochs
+
+    def preprocess(self, input_data: pd.DataFrame) -> dict:
+        """
+        Preprocesses and tokenizes the input event log without building the model.
+
+        Parameters:
+        input_data (pd.DataFrame): Input event log data to be processed.
+
+        Returns:
+        dict: Preprocessed state for `initialize_from_preprocessed`, including the preprocessing key.
+        """
+        with self.instrumentation.span("preprocess") as span:
+            (
+                self.event_log_sentences,
+                self.cluster_dict,
+                self.dict_dtypes,
+                self.start_epoch,
+                self.num_examples,
+                self.noise_multiplier,
+                self.num_cols,
+                self.column_list
+            ) = preprocess_event_log(
+                input_data, self.max_clusters, self.trace_quantile, self.epsilon, self.batch_size, self.epochs,
+                instrumentation=self.instrumentation
+            )
+            span.add(traces=len(self.event_log_sentences), events=self.num_examples)
+
+        with self.instrumentation.span("tokenize_log", traces=len(self.event_log_sentences)) as span:
+            (self.xs, self.ys, self.total_words, self.max_sequence_len, self.tokenizer) = tokenize_log(
+                self.event_log_sentences, steps=self.num_cols
+            )
+            span.add(sequences=len(self.xs))
 
-        (self.xs, self.ys, self.total_words, self.max_sequence_len, self.tokenizer) = tokenize_log(
-            self.event_log_sentences, steps=self.num_cols
+        preprocessed = {name: getattr(self, name) for name in PREPROCESSED_ATTRIBUTES}
+        preprocessed["preprocessing_key"] = self.preprocessing_key()
+
+        return preprocessed
+
+    def initialize_from_preprocessed(self, preprocessed: dict) -> None:
+        """
+        Initializes and compiles the model from the preprocessed state of another synthesizer with the same
+        preprocessing key, e.g. of a hyperparameter sweep, so the event log is not preprocessed again. The arrays of
+        the state are shared, not copied. With differential privacy, sharing the state also means the DP clustering
+        and bounds are released only once.
+
+        Parameters:
+        preprocessed (dict): Preprocessed state returned by `preprocess`.
+
+        Returns:
+        None
+        """
+        if tuple(preprocessed["preprocessing_key"]) != self.preprocessing_key():
+            raise ValueError(
+                f"Preprocessed state with key {preprocessed['preprocessing_key']} does not match the preprocessing "
+                f"key {self.preprocessing_key()} of this synthesizer"
+            )
+
+        for name in PREPROCESSED_ATTRIBUTES:
+            setattr(self, name, preprocessed[name])
+        self._build_model()
+
+    def _build_model(self) -> None:
+        """
+        Builds the model architecture for the preprocessed event log and compiles it with the differentially private
+        optimizer.
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        # Layers and the DP optimizer are only needed for training, so sampling does not import them
+        from keras import Input, Model
+        from keras.layers import (
+            BatchNormalization,
+            Bidirectional,
+            Dense,
+            Dropout,
+            Embedding,
+            LSTM,
+            Masking,
+            GRU,
+            GlobalAveragePooling1D,
+            SimpleRNN,
+        )
+        from tensorflow_privacy.privacy.optimizers.dp_optimizer_keras import (
+            DPKerasAdamOptimizer,
         )
 
         inputs = Input(shape=(self.max_sequence_len,), dtype='int32')
@@ -168,6 +315,8 @@ class DPEventLogSynthesizer:
         )
 
         self.model = Model(inputs=inputs, outputs=outputs)
+        self.model_path = None
+        self._reset_inference_state()
         self.model.compile(
             loss=["sparse_categorical_crossentropy"] * self.num_cols,
             optimizer=dp_optimizer,
@@ -185,6 +334,9 @@ class DPEventLogSynthesizer:
         Returns:
         None
         """
+        from keras.callbacks import EarlyStopping
+        from PALSYN.metrics_logger import MetricsLogger, CustomProgressBar, InstrumentationCallback
+
         y_outputs = [self.ys[:, step] for step in range(self.num_cols)]
 
         early_stopping = EarlyStopping(
@@ -200,17 +352,24 @@ class DPEventLogSynthesizer:
 
         metrics_logger = MetricsLogger(num_cols=self.num_cols, column_list=self.column_list)
         custom_progress_bar = CustomProgressBar()
-
-        self.model.fit(
-            self.xs,
-            y_outputs,
-            epochs=epochs,
-            batch_size=self.batch_size,
-            callbacks=[early_stopping, metrics_logger, custom_progress_bar],
-            verbose=0
-        )
+        callbacks = [early_stopping, metrics_logger, custom_progress_bar]
+        # Step callbacks are only registered when they record something, as Keras calls them on every batch
+        if self.instrumentation.enabled:
+            callbacks.append(InstrumentationCallback(self.instrumentation, len(self.xs), self.batch_size))
+
+        with self.instrumentation.span("train", attributes={"epochs": epochs}):
+            self.model.fit(
+                self.xs,
+                y_outputs,
+                epochs=epochs,
+                batch_size=self.batch_size,
+                callbacks=callbacks,
+                verbose=0
+            )
 
         self.metrics_df = metrics_logger.get_dataframe()
+        self.model_path = None
+        self._reset_inference_state()
 
     def fit(self, input_data: pd.DataFrame) -> None:
         """
@@ -226,46 +385,416 @@ class DPEventLogSynthesizer:
         self.initialize_model(input_data)
         self.train(self.epochs)
 
-    def sample(self, sample_size: int, batch_size: int) -> pd.DataFrame:
+    def sample(self, sample_size: int, batch_size: int, n_jobs: int = 1, seed=None) -> pd.DataFrame:
         """
         Sample an event log from a trained DP-Bi-LSTM Model. The model must be trained before sampling. The sampling
         process can be controlled by the temperature parameter, which controls the randomness of sampling process.
         A higher temperature results in more randomness.
 
+        The number of traces started per batch is over-provisioned by the share of traces that survived the length
+        cutoff in the previous call, so the requested sample size is usually reached in a single pass. After
+        sampling, `sampling_stats` holds the number of model calls, the number of predicted rows, the batch
+        utilization, i.e. the share of batch slots that held a trace which was still being extended, and the
+        observed survival rate.
+
+        With `n_jobs` > 1 the traces are split across worker processes, which load the saved model once. Every
+        worker draws from its own generator derived from `seed`, so the sampled log is reproducible for a given seed
+        and number of workers. Case IDs are numbered consecutively and are unique across the workers. Seeded runs
+        do not use the survival rate of previous calls, as it changes the order in which random values are drawn.
+        The workers are spawned and import the main module, so scripts must call `sample` with `n_jobs` > 1 under an
+        `if __name__ == "__main__":` guard.
+
+        Sampling does not reset the global Keras session and keeps its random generator and buffers local to the
+        call, so `sample` may be called concurrently from several threads on the same instance.
+
         Parameters:
         sample_size (int): Number of traces to sample.
         batch_size (int): Number of traces to sample in a batch.
+        n_jobs (int): Number of worker processes. -1 uses all CPU cores. Default is 1.
+        seed (int or np.random.SeedSequence, optional): Seed for reproducible sampling. Default is None.
 
         Returns:
         pd.DataFrame: DataFrame containing the sampled event log.
         """
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+
+        with self.instrumentation.span("sample", attributes={"n_jobs": n_jobs}, traces=sample_size) as span:
+            if n_jobs > 1:
+                df = self._sample_parallel(sample_size, batch_size, n_jobs, seed)
+            else:
+                chunks = list(self.sample_chunks(sample_size, batch_size, seed=seed))
+                df = pd.concat(chunks, axis=0, ignore_index=True) if chunks else pd.DataFrame()
+            span.add(events=len(df))
+
+        return df
+
+    def sample_chunks(self, sample_size: int, batch_size: int, chunk_size: int = None, seed=None):
+        """
+        Sample an event log chunk by chunk. Every chunk holds at most `chunk_size` complete traces and case IDs are
+        numbered consecutively across the chunks, so the chunks can be written to a file one at a time while the
+        memory use stays bounded by the chunk size. `sampling_stats` is updated after the last chunk.
+
+        Parameters:
+        sample_size (int): Number of traces to sample.
+        batch_size (int): Number of traces to sample in a batch.
+        chunk_size (int, optional): Maximum number of traces per chunk. Default is None, which samples as few chunks
+                                    as possible.
+        seed (int or np.random.SeedSequence, optional): Seed for reproducible sampling. Default is None.
+
+        Returns:
+        generator: Generator of DataFrames containing consecutive chunks of the sampled event log.
+        """
+        rng = np.random.default_rng(seed)
+        survival_rate = self.survival_rate if seed is None else None
+        predict_fn = self._get_predict_fn()
+        token_vocabulary = self._get_token_vocabulary()
+        valid_token_table = self._get_valid_token_table()
         len_synthetic_event_log = 0
-        synthetic_df = pd.DataFrame()
+        sampling_stats = {}
 
         while len_synthetic_event_log < sample_size:
             print("Sampling Event Log with:", sample_size - len_synthetic_event_log, "traces left")
             sample_size_new = sample_size - len_synthetic_event_log
-
-            synthetic_event_log_sentences = sample_batch(
-                sample_size_new,
-                self.tokenizer,
-                self.max_sequence_len,
-                self.model,
-                batch_size,
-                self.num_cols,
-                self.column_list
-            )
-
-            df = generate_df(synthetic_event_log_sentences, self.cluster_dict, self.dict_dtypes, self.start_epoch)
+            if chunk_size is not None:
+                sample_size_new = min(sample_size_new, chunk_size)
+
+            with self.instrumentation.span("sample_batch", traces=sample_size_new) as span:
+                stats_before = dict(sampling_stats)
+                synthetic_token_sequences = sample_batch(
+                    sample_size_new,
+                    self.tokenizer,
+                    self.max_sequence_len,
+                    self.model,
+                    batch_size,
+                    self.num_cols,
+                    self.column_list,
+                    stats=sampling_stats,
+                    survival_rate=survival_rate,
+                    rng=rng,
+                    predict_fn=predict_fn,
+                    prefix_cache=self.prefix_cache,
+                    return_token_ids=True,
+                    valid_token_table=valid_token_table,
+                    instrumentation=self.instrumentation
+                )
+                span.add(sequences=len(synthetic_token_sequences), **{
+                    key: sampling_stats[key] - stats_before.get(key, 0)
+                    for key in ["traces_started", "model_calls", "rows_predicted", "batch_slots"]
+                })
+            if sampling_stats.get("traces_kept", 0) + sampling_stats.get("traces_discarded", 0) > 0:
+                survival_rate = sampling_stats["survival_rate"]
+
+            with self.instrumentation.span("decode", traces=len(synthetic_token_sequences)) as span:
+                df = decode_token_sequences(
+                    synthetic_token_sequences,
+                    token_vocabulary,
+                    self.start_epoch,
+                    rng=rng,
+                    case_id_offset=len_synthetic_event_log,
+                    instrumentation=self.instrumentation
+                )
+                span.add(events=len(df))
             df.reset_index(drop=True, inplace=True)
-            synthetic_df = pd.concat([synthetic_df, df], axis=0, ignore_index=True)
             len_synthetic_event_log += df["case:concept:name"].nunique()
+            yield df
+
+        with self._lock:
+            self.sampling_stats = sampling_stats
+            if survival_rate is not None:
+                self.survival_rate = survival_rate
+
+    def sample_to_xes(
+            self,
+            path: str,
+            sample_size: int,
+            batch_size: int,
+            chunk_size: int = 10000,
+            seed=None,
+            compress: bool = None
+    ) -> int:
+        """
+        Sample an event log and stream it to an XES file. The log is sampled in chunks of `chunk_size` traces and
+        every chunk is written before the next one is sampled, so the memory use does not grow with the sample size.
+        NA values are skipped while writing, so the file does not need to be cleaned with `clean_xes_file`.
+
+        Parameters:
+        path (str): Path of the XES file. Paths ending in '.gz' are gzip-compressed.
+        sample_size (int): Number of traces to sample.
+        batch_size (int): Number of traces to sample in a batch.
+        chunk_size (int): Maximum number of traces held in memory. Default is 10000.
+        seed (int or np.random.SeedSequence, optional): Seed for reproducible sampling. Default is None.
+        compress (bool, optional): Gzip-compress the file. Default is None, which compresses paths ending in '.gz'.
+
+        Returns:
+        int: Number of written traces.
+        """
+        return write_xes(self.sample_chunks(sample_size, batch_size, chunk_size, seed), path, compress)
+
+    def sample_to_parquet(
+            self,
+            path: str,
+            sample_size: int,
+            batch_size: int,
+            chunk_size: int = 10000,
+            seed=None,
+            partition_cols: list[str] = None,
+            compression: str = "snappy"
+    ) -> int:
+        """
+        Sample an event log and stream it to a Parquet dataset. Every chunk of `chunk_size` traces is written to its
+        own file in the directory `path`. String attributes such as activities and resources are dictionary-encoded,
+        timestamps keep their type and missing values are written as nulls. The schema of all files follows the
+        attribute data types of the model. Requires pyarrow.
+
+        Parameters:
+        path (str): Directory of the Parquet dataset.
+        sample_size (int): Number of traces to sample.
+        batch_size (int): Number of traces to sample in a batch.
+        chunk_size (int): Maximum number of traces held in memory. Default is 10000.
+        seed (int or np.random.SeedSequence, optional): Seed for reproducible sampling. Default is None.
+        partition_cols (list[str], optional): Columns to partition the dataset by. Default is None.
+        compression (str): Parquet compression codec. Default is "snappy".
+
+        Returns:
+        int: Number of written events.
+        """
+        return write_parquet(
+            self.sample_chunks(sample_size, batch_size, chunk_size, seed), path, partition_cols, compression,
+            self.dict_dtypes
+        )
+
+    def enable_prefix_cache(
+            self,
+            max_entries: int = 10000,
+            max_depth: int = None,
+            max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        """
+        Cache the next-event distributions of the model for trace prefixes. Most synthetic traces start with the same
+        few activities, so the first sampling steps are served from the cache instead of the model. Deeper prefixes
+        are almost all unique and are not cached. The statistics of the cache are available through
+        `prefix_cache.stats()`, whose hit rate only covers the prefixes the cache can hold.
+
+        Every cached prefix holds one float32 distribution over the vocabulary per predicted column, i.e.
+        4 * num_cols * total_words bytes, e.g. 2 MB for 10 columns and a vocabulary of 50,000 tokens.
+
+        Parameters:
+        max_entries (int): Maximum number of cached prefixes. Default is 10000.
+        max_depth (int): Maximum prefix length in tokens that is cached. Default is None, which caches prefixes of
+                         up to DEFAULT_PREFIX_EVENTS events, i.e. (DEFAULT_PREFIX_EVENTS + 1) * num_cols tokens
+                         including the start tokens. This requires a trained or loaded model.
+        max_bytes (int): Maximum size of the cached distributions in bytes, None for no limit. Default is 256 MB.
+
+        Returns:
+        None
+        """
+        if max_depth is None:
+            if self.num_cols is None:
+                raise ValueError("Train or load the model before enabling the prefix cache, or pass max_depth")
+            max_depth = (DEFAULT_PREFIX_EVENTS + 1) * self.num_cols
+
+        self.prefix_cache = PrefixCache(max_entries=max_entries, max_depth=max_depth, max_bytes=max_bytes)
+
+    def disable_prefix_cache(self) -> None:
+        """
+        Remove the prefix cache, so every sampling step is predicted by the model.
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.prefix_cache = None
+
+    def enable_instrumentation(self, *sinks) -> Instrumentation:
+        """
+        Record the wall time, peak memory, counts and throughput of every pipeline stage: the preprocessing steps,
+        tokenization, training with every epoch and step, and sampling with every batch, sampling step and the
+        decoding into a DataFrame. The records are passed to the sinks, e.g. a `MemorySink`, a `JSONLinesSink` or any
+        callable taking the record dictionary. Worker processes of parallel sampling are not instrumented, only the
+        'sample' span of the call is recorded.
+
+        Parameters:
+        *sinks (callable): Callables receiving every record.
+
+        Returns:
+        Instrumentation: The instrumentation of the synthesizer.
+        """
+        self.instrumentation = Instrumentation(*sinks)
+
+        return self.instrumentation
+
+    def disable_instrumentation(self) -> None:
+        """
+        Stop recording the pipeline stages. Disabled instrumentation costs one method call per stage.
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.instrumentation = NULL_INSTRUMENTATION
+
+    def warm_up(self) -> None:
+        """
+        Prepare a trained or loaded model for sampling: run the inference function once and build the decoding tables
+        of the vocabulary and the valid tokens, so the first sampling call is as fast as later ones. `load` already
+        warms up the inference function.
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self._warm_up_predict_fn()
+        self._get_token_vocabulary()
+        self._get_valid_token_table()
+
+    def _reset_inference_state(self) -> None:
+        """
+        Drop the traced inference function, the decoding tables and the cached predictions after the model has changed.
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self._predict_fn = None
+        self._token_vocabulary = None
+        self._valid_token_table = None
+        if self.prefix_cache is not None:
+            self.prefix_cache.clear()
+
+    def _build_predict_fn(self):
+        """
+        Build the inference function of the model with a fixed input signature of padded int32 token sequences.
+
+        Parameters:
+        None
+
+        Returns:
+        tf.types.experimental.GenericFunction: Function mapping padded token sequences to the model outputs.
+        """
+        model = self.model
+
+        @tf.function(input_signature=[tf.TensorSpec(shape=[None, self.max_sequence_len], dtype=tf.int32)])
+        def predict_fn(token_sequences):
+            return model(token_sequences, training=False)
+
+        return predict_fn
+
+    def _get_predict_fn(self):
+        """
+        Return the inference function used for sampling. The function is traced once per model with a fixed input
+        signature, so concurrent sampling calls share it without retracing.
+
+        Parameters:
+        None
+
+        Returns:
+        tf.types.experimental.GenericFunction: Function mapping padded token sequences to the model outputs.
+        """
+        with self._lock:
+            if self._predict_fn is None:
+                predict_fn = self._build_predict_fn()
+                predict_fn.get_concrete_function()
+                self._predict_fn = predict_fn
+
+            return self._predict_fn
+
+    def _warm_up_predict_fn(self) -> None:
+        """
+        Trace the inference function and run it once on a dummy batch. The first call also pays for setting up the
+        kernels, so warming it up when the model is loaded makes the first sampled trace as cheap as later ones.
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        predict_fn = self._get_predict_fn()
+        predict_fn(np.zeros((1, self.max_sequence_len), dtype=np.int32))
+
+    def _get_token_vocabulary(self) -> TokenVocabulary:
+        """
+        Return the decoding tables of the tokenizer vocabulary, which are built once per model.
+
+        Parameters:
+        None
+
+        Returns:
+        TokenVocabulary: Decoding tables used to turn sampled token indices into typed columns.
+        """
+        with self._lock:
+            if self._token_vocabulary is None:
+                self._token_vocabulary = TokenVocabulary(self.tokenizer.word_index, self.cluster_dict, self.dict_dtypes)
+
+            return self._token_vocabulary
+
+    def _get_valid_token_table(self) -> dict:
+        """
+        Return the tokens that may be drawn per (activity, column) pair, which are built once per model or read from
+        the model bundle.
+
+        Parameters:
+        None
+
+        Returns:
+        dict: Mapping from (activity, column) to the list of valid token indices.
+        """
+        with self._lock:
+            if self._valid_token_table is None:
+                index_word = {index: word for word, index in self.tokenizer.word_index.items()}
+                self._valid_token_table = build_valid_token_table(index_word, self.column_list)
+
+            return self._valid_token_table
+
+    def _sample_parallel(self, sample_size: int, batch_size: int, n_jobs: int, seed) -> pd.DataFrame:
+        """
+        Sample an event log with several worker processes. Workers load the model from the path it was last saved to
+        or loaded from. A model that has not been saved since training is saved to a temporary bundle first.
+
+        Parameters:
+        sample_size (int): Number of traces to sample.
+        batch_size (int): Number of traces to sample in a batch.
+        n_jobs (int): Number of worker processes.
+        seed (int or np.random.SeedSequence): Seed for reproducible sampling.
+
+        Returns:
+        pd.DataFrame: DataFrame containing the sampled event log.
+        """
+        survival_rate = self.survival_rate if seed is None else None
+
+        if self.model_path is not None:
+            synthetic_df, sampling_stats = sample_parallel(
+                self.model_path, sample_size, batch_size, n_jobs, seed, survival_rate
+            )
+        else:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                bundle_path = os.path.join(temp_dir, "model.pbles")
+                self.save_bundle(bundle_path)
+                synthetic_df, sampling_stats = sample_parallel(
+                    bundle_path, sample_size, batch_size, n_jobs, seed, survival_rate
+                )
+            self.model_path = None
+
+        with self._lock:
+            self.sampling_stats = sampling_stats
+            if sampling_stats.get("traces_kept", 0) + sampling_stats.get("traces_discarded", 0) > 0:
+                self.survival_rate = sampling_stats["survival_rate"]
 
         return synthetic_df
 
     def save_model(self, path: str) -> None:
         """
-        Save a trained PBLES Model to a given path.
+        Save a trained PBLES Model to a given path, i.e. the Keras model and the preprocessing artifacts. The weights
+        are stored once, in the Keras model, and `load` traces the inference function from it.
 
         Parameters:
         path (str): Path to save the trained PBLES Model.
@@ -274,8 +803,11 @@ class DPEventLogSynthesizer:
         None
         """
         os.makedirs(path, exist_ok=True)
+        self.model_path = path
 
         self.model.save(os.path.join(path, "model.keras"))
+        # An inference graph exported by an earlier version would hold a stale second copy of the weights
+        shutil.rmtree(os.path.join(path, INFERENCE_GRAPH_DIR), ignore_errors=True)
         self.metrics_df.to_excel(os.path.join(path, "training_metrics.xlsx"), index=False)
 
         config = {
@@ -319,7 +851,10 @@ class DPEventLogSynthesizer:
 
     def load(self, path: str) -> None:
         """
-        Load a trained PBLES Model from a given path.
+        Load a trained PBLES Model from a given path. The path may be a directory written by `save_model` or a
+        bundle file written by `save_bundle`. The inference function is traced on the Keras model and warmed up, so the
+        first sampling call does not pay for it and the loaded synthesizer holds a single copy of the weights.
+        Inference graphs exported by earlier versions are ignored.
 
         Parameters:
         path (str): Path to the trained PBLES Model.
@@ -327,7 +862,13 @@ class DPEventLogSynthesizer:
         Returns:
         None
         """
+        if os.path.isfile(path):
+            self.load_bundle(path)
+            return
+
         self.model = tf.keras.models.load_model(os.path.join(path, "model.keras"), compile=False)
+        self.model_path = path
+        self._reset_inference_state()
 
         with open(os.path.join(path, "tokenizer.pkl"), "rb") as handle:
             self.tokenizer = pickle.load(handle)
@@ -349,3 +890,132 @@ class DPEventLogSynthesizer:
 
         with open(os.path.join(path, "column_list.pkl"), "rb") as handle:
             self.column_list = pickle.load(handle)
+
+        self._warm_up_predict_fn()
+
+    def save_bundle(self, path: str) -> None:
+        """
+        Save a trained PBLES Model as a single versioned bundle file. The vocabulary, the cluster table, the valid
+        tokens per (activity, column) pair and the model weights are stored as arrays that `load_bundle` maps into
+        memory, and the remaining settings and the model architecture are stored in a JSON header. Training metrics
+        are not part of the bundle.
+
+        Parameters:
+        path (str): Path of the bundle file.
+
+        Returns:
+        None
+        """
+        config = {
+            'embedding_output_dims': self.embedding_output_dims,
+            'method': self.method,
+            'units_per_layer': self.units_per_layer,
+            'epochs': self.epochs,
+            'batch_size': self.batch_size,
+            'max_clusters': self.max_clusters,
+            'dropout': self.dropout,
+            'trace_quantile': self.trace_quantile,
+            'l2_norm_clip': self.l2_norm_clip,
+            'epsilon': self.epsilon,
+            'noise_multiplier': self.noise_multiplier,
+            'num_examples': self.num_examples
+        }
+        tokenizer_config = {
+            'num_words': self.tokenizer.num_words,
+            'filters': self.tokenizer.filters,
+            'lower': self.tokenizer.lower,
+            'split': self.tokenizer.split,
+            'char_level': self.tokenizer.char_level,
+            'oov_token': self.tokenizer.oov_token
+        }
+
+        words = list(self.tokenizer.word_index)
+        vocabulary_data, vocabulary_offsets = encode_strings(words)
+        cluster_labels = list(self.cluster_dict)
+        cluster_label_data, cluster_label_offsets = encode_strings(cluster_labels)
+
+        valid_token_table = self._get_valid_token_table()
+        valid_token_keys = list(valid_token_table)
+        valid_token_indptr = np.zeros(len(valid_token_keys) + 1, dtype=np.int64)
+        np.cumsum([len(valid_token_table[key]) for key in valid_token_keys], out=valid_token_indptr[1:])
+        valid_token_indices = np.array(
+            [index for key in valid_token_keys for index in valid_token_table[key]], dtype=np.int32
+        )
+
+        cluster_values = np.array([self.cluster_dict[label] for label in cluster_labels], dtype=float).reshape(-1, 4)
+
+        weights = self.model.get_weights()
+        arrays = {
+            "vocabulary_data": vocabulary_data,
+            "vocabulary_offsets": vocabulary_offsets,
+            "vocabulary_indices": np.array([self.tokenizer.word_index[word] for word in words], dtype=np.int32),
+            "cluster_label_data": cluster_label_data,
+            "cluster_label_offsets": cluster_label_offsets,
+            "cluster_values": cluster_values,
+            "valid_token_indptr": valid_token_indptr,
+            "valid_token_indices": valid_token_indices,
+        }
+        for weight_index, weight in enumerate(weights):
+            arrays[f"weight_{weight_index}"] = weight
+
+        header = {
+            'config': config,
+            'tokenizer_config': tokenizer_config,
+            'dict_dtypes': self.dict_dtypes,
+            'max_sequence_len': int(self.max_sequence_len),
+            'start_epoch': [float(value) for value in self.start_epoch],
+            'num_cols': int(self.num_cols),
+            'column_list': list(self.column_list),
+            'valid_token_keys': [list(key) for key in valid_token_keys],
+            'num_weights': len(weights),
+            'model_config': self.model.to_json()
+        }
+
+        write_bundle(path, header, arrays)
+        self.model_path = path
+
+    def load_bundle(self, path: str) -> None:
+        """
+        Load a trained PBLES Model from a bundle file written by `save_bundle`. The model is rebuilt from its
+        architecture and the weights are set from the memory-mapped arrays, the tokenizer is rebuilt from the
+        vocabulary without its word counts.
+
+        Parameters:
+        path (str): Path of the bundle file.
+
+        Returns:
+        None
+        """
+        header, arrays = read_bundle(path)
+
+        self.model = tf.keras.models.model_from_json(header["model_config"])
+        self.model.set_weights([arrays[f"weight_{weight_index}"] for weight_index in range(header["num_weights"])])
+        self.model_path = path
+        self._reset_inference_state()
+
+        for key, value in header["config"].items():
+            setattr(self, key, value)
+
+        words = decode_strings(arrays["vocabulary_data"], arrays["vocabulary_offsets"])
+        self.tokenizer = Tokenizer(**header["tokenizer_config"])
+        self.tokenizer.word_index = dict(zip(words, arrays["vocabulary_indices"].tolist()))
+        self.tokenizer.index_word = {index: word for word, index in self.tokenizer.word_index.items()}
+        self.total_words = len(words) + 1
+
+        cluster_labels = decode_strings(arrays["cluster_label_data"], arrays["cluster_label_offsets"])
+        self.cluster_dict = dict(zip(cluster_labels, arrays["cluster_values"].tolist()))
+
+        self.dict_dtypes = header["dict_dtypes"]
+        self.max_sequence_len = header["max_sequence_len"]
+        self.start_epoch = header["start_epoch"]
+        self.num_cols = header["num_cols"]
+        self.column_list = header["column_list"]
+
+        valid_token_indptr = arrays["valid_token_indptr"].tolist()
+        valid_token_indices = arrays["valid_token_indices"].tolist()
+        self._valid_token_table = {
+            tuple(key): valid_token_indices[start:end]
+            for key, start, end in zip(header["valid_token_keys"], valid_token_indptr[:-1], valid_token_indptr[1:])
+        }
+
+        self._warm_up_predict_fn()
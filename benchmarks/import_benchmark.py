@@ -0,0 +1,79 @@
+"""
+Measure the import time of the sampling, postprocessing and training code paths with `python -X importtime`.
+
+Usage:
+python benchmarks/import_benchmark.py --repeats 3 --top 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports of every code path. The training path also imports the dependencies that are loaded on first use
+# during preprocessing and training.
+CODE_PATHS = {
+    "postprocessing": "import PALSYN.postprocessing.token_decoding, PALSYN.postprocessing.xes_writer",
+    "sampling": "from PALSYN import DPEventLogSynthesizer; DPEventLogSynthesizer",
+    "training": (
+        "from PALSYN import DPEventLogSynthesizer; DPEventLogSynthesizer; "
+        "import pm4py, sklearn.cluster, diffprivlib.models, diffprivlib.mechanisms, keras.layers, "
+        "tensorflow_privacy.privacy.optimizers.dp_optimizer_keras, PALSYN.metrics_logger"
+    ),
+}
+
+
+def measure_imports(statement: str) -> dict:
+    """
+    Run an import statement in a fresh interpreter with `-X importtime` and parse the report.
+
+    Parameters:
+    statement (str): Import statement to run.
+
+    Returns:
+    dict: Total import time in seconds under 'total' and the import time in seconds spent in the modules of every
+          top-level package under 'packages'.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT,
+        env={**os.environ, "PYTHONPATH": REPO_ROOT, "TF_CPP_MIN_LOG_LEVEL": "3"},
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_time, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_time) / 1e6
+
+    return {"total": sum(packages.values()), "packages": packages}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=3, help="Number of fresh interpreters per code path")
+    parser.add_argument("--top", type=int, default=8, help="Number of slowest packages to list per code path")
+    args = parser.parse_args()
+
+    for code_path, statement in CODE_PATHS.items():
+        measurements = [measure_imports(statement) for _ in range(args.repeats)]
+        total = statistics.median(measurement["total"] for measurement in measurements)
+        packages = {
+            package: statistics.median(measurement["packages"].get(package, 0) for measurement in measurements)
+            for package in measurements[0]["packages"]
+        }
+
+        print(f"{code_path}: {total:.2f} s")
+        for package, seconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {package:<24} {seconds:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
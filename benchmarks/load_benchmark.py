@@ -0,0 +1,73 @@
+"""
+Compare the load time of a model saved as directory with `save_model` and as single-file bundle with `save_bundle`.
+
+Usage:
+python benchmarks/load_benchmark.py models/Bi-LSTM_Road_Fines_u=32_e=inf --repeats 10
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from PALSYN.synthesizer import DPEventLogSynthesizer
+
+
+def time_loads(path: str, repeats: int) -> list[float]:
+    """
+    Load a model repeatedly into fresh synthesizers and measure the load time.
+
+    Parameters:
+    path (str): Path of the model directory or bundle file.
+    repeats (int): Number of loads.
+
+    Returns:
+    list[float]: Load time of every repetition in seconds.
+    """
+    load_times = []
+    for _ in range(repeats):
+        synthesizer = DPEventLogSynthesizer()
+        start_time = time.perf_counter()
+        synthesizer.load(path)
+        load_times.append(time.perf_counter() - start_time)
+
+    return load_times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("model_path", help="Model directory written by save_model")
+    parser.add_argument("--repeats", type=int, default=10, help="Number of loads per format")
+    args = parser.parse_args()
+
+    synthesizer = DPEventLogSynthesizer()
+    synthesizer.load(args.model_path)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bundle_path = os.path.join(temp_dir, "model.pbles")
+        synthesizer.save_bundle(bundle_path)
+
+        # Warm up the Keras layer registry and the file system cache for both formats
+        time_loads(args.model_path, 1)
+        time_loads(bundle_path, 1)
+
+        results = {
+            "directory": time_loads(args.model_path, args.repeats),
+            "bundle": time_loads(bundle_path, args.repeats),
+        }
+        bundle_size = os.path.getsize(bundle_path)
+
+    directory_size = sum(
+        os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(args.model_path) for name in names
+    )
+    print(f"{'format':<10} {'size (KB)':>10} {'median (ms)':>12} {'min (ms)':>10}")
+    for name, size in [("directory", directory_size), ("bundle", bundle_size)]:
+        load_times = results[name]
+        print(
+            f"{name:<10} {size / 1024:>10.1f} {statistics.median(load_times) * 1000:>12.1f} "
+            f"{min(load_times) * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
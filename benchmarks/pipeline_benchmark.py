@@ -0,0 +1,292 @@
+"""
+Time every stage of the pipeline, from preprocessing to evaluation, on generated event logs of increasing size.
+
+Every stage is timed separately: `preprocess_event_log`, `tokenize_log`, one training epoch, `sample_batch`,
+`generate_df`, a full `DPEventLogSynthesizer.sample` call and the evaluation functions of the experiments. The
+results are written to a JSON file, and a previous results file can be passed with --compare to print the change of
+every stage.
+
+Usage:
+python benchmarks/pipeline_benchmark.py --sizes 1000 10000 --output benchmark_results.json
+python benchmarks/pipeline_benchmark.py --sizes 1000 10000 --output new.json --compare benchmark_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from synthetic_log import TRACE_LENGTH_DISTRIBUTIONS, generate_event_log
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The evaluation functions live in the experiments scripts, which import each other as top-level modules
+sys.path.insert(0, os.path.join(REPO_ROOT, "experiments"))
+sys.path.insert(0, REPO_ROOT)
+
+from PALSYN.instrumentation import max_rss_mb  # noqa: E402
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+
+def time_stage(stages: dict, name: str, function, *args, repeats: int = 1, **kwargs):
+    """
+    Call a stage `repeats` times, record its timings in `stages` and return the result of the last call.
+
+    Parameters:
+    stages (dict): Timings by stage name, updated in place.
+    name (str): Name of the stage.
+    function (callable): Function of the stage.
+    repeats (int): Number of calls. Default is 1.
+
+    Returns:
+    object: Result of the last call.
+    """
+    seconds = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        result = function(*args, **kwargs)
+        seconds.append(time.perf_counter() - start_time)
+
+    stages[name] = {
+        "seconds": statistics.median(seconds),
+        "min_seconds": min(seconds),
+        "repeats": repeats,
+        "max_rss_mb": max_rss_mb(),
+    }
+    print(f"    {name:<52} {stages[name]['seconds']:>10.3f} s")
+
+    return result
+
+
+def benchmark_size(num_cases: int, args: argparse.Namespace) -> dict:
+    """
+    Generate an event log with `num_cases` cases and time every stage of the pipeline on it. If a stage fails, its
+    error is recorded and the stages depending on it are skipped.
+
+    Parameters:
+    num_cases (int): Number of cases of the generated event log.
+    args (argparse.Namespace): Arguments of the benchmark.
+
+    Returns:
+    dict: Size of the event log, model dimensions and timings of every stage.
+    """
+    from PALSYN.postprocessing.log_postprocessing import generate_df
+    from PALSYN.preprocessing.log_preprocessing import preprocess_event_log
+    from PALSYN.preprocessing.log_tokenization import tokenize_log
+    from PALSYN.sampling.log_sampling import sample_batch
+    from PALSYN.synthesizer import PREPROCESSED_ATTRIBUTES, DPEventLogSynthesizer
+
+    from evaluation_runner import fidelity_metric_jobs
+    from reference_profile import build_reference_profile
+
+    stages = {}
+    result = {"cases": num_cases, "stages": stages}
+    repeats = args.repeats
+
+    try:
+        event_log = time_stage(
+            stages, "generate_event_log", generate_event_log, num_cases,
+            num_activities=args.activities,
+            trace_length_distribution=args.trace_length,
+            trace_length_mean=args.mean_length,
+            max_trace_length=args.max_length,
+            num_numeric=args.numeric,
+            num_categorical=args.categorical,
+            num_categories=args.categories,
+            num_case_attributes=args.case_attributes,
+            seed=args.seed
+        )
+        result["events"] = len(event_log)
+
+        synthesizer = DPEventLogSynthesizer(
+            embedding_output_dims=args.embedding_dims,
+            method=args.method,
+            units_per_layer=args.units,
+            epochs=1,
+            batch_size=args.batch_size,
+            max_clusters=args.max_clusters,
+            trace_quantile=args.trace_quantile,
+            epsilon=args.epsilon,
+        )
+
+        # preprocess_event_log modifies its input, so every repetition gets a fresh copy
+        (
+            event_log_sentences, cluster_dict, dict_dtypes, start_epoch, num_examples, noise_multiplier, num_cols,
+            column_list
+        ) = time_stage(
+            stages, "preprocess_event_log",
+            lambda: preprocess_event_log(
+                event_log.copy(), synthesizer.max_clusters, synthesizer.trace_quantile, synthesizer.epsilon,
+                synthesizer.batch_size, synthesizer.epochs
+            ),
+            repeats=repeats
+        )
+        xs, ys, total_words, max_sequence_len, tokenizer = time_stage(
+            stages, "tokenize_log", tokenize_log, event_log_sentences, steps=num_cols, repeats=repeats
+        )
+        result.update({
+            "training_examples": len(xs),
+            "vocabulary_size": total_words,
+            "max_sequence_len": max_sequence_len,
+        })
+
+        # One epoch over all training examples would not fit in memory at the largest sizes, so the epoch is timed
+        # on the first --train-examples examples and the time per example is recorded for extrapolation
+        if args.train_examples is not None:
+            xs, ys = xs[:args.train_examples], ys[:args.train_examples]
+        preprocessed = dict(zip(PREPROCESSED_ATTRIBUTES, [
+            event_log_sentences, cluster_dict, dict_dtypes, start_epoch, num_examples, noise_multiplier, num_cols,
+            column_list, xs, ys, total_words, max_sequence_len, tokenizer
+        ]))
+        preprocessed["preprocessing_key"] = synthesizer.preprocessing_key()
+        time_stage(stages, "build_model", synthesizer.initialize_from_preprocessed, preprocessed)
+        # The first epoch also traces the training step, so it is timed separately from the next ones
+        time_stage(stages, "train_first_epoch", synthesizer.train, epochs=1)
+        time_stage(stages, "train_epoch", synthesizer.train, epochs=1, repeats=repeats)
+        stages["train_epoch"]["examples"] = len(xs)
+        stages["train_epoch"]["seconds_per_example"] = stages["train_epoch"]["seconds"] / max(len(xs), 1)
+
+        rng = np.random.default_rng(args.seed)
+        synthetic_sentences = time_stage(
+            stages, "sample_batch", sample_batch, args.sample_size, synthesizer.tokenizer,
+            synthesizer.max_sequence_len, synthesizer.model, args.sample_batch_size, synthesizer.num_cols,
+            synthesizer.column_list, rng=rng, repeats=repeats
+        )
+        time_stage(
+            stages, "generate_df", generate_df, synthetic_sentences, synthesizer.cluster_dict,
+            synthesizer.dict_dtypes, synthesizer.start_epoch, rng=rng, repeats=repeats
+        )
+        synthetic_event_log = time_stage(
+            stages, "sample", synthesizer.sample, args.sample_size, args.sample_batch_size, seed=args.seed,
+            repeats=repeats
+        )
+
+        reference_profile = time_stage(
+            stages, "build_reference_profile", build_reference_profile, event_log, repeats=repeats
+        )
+        for name, job in fidelity_metric_jobs(reference_profile, synthetic_event_log).items():
+            time_stage(stages, f"metric:{name}", job["function"], *job["args"], repeats=repeats, **job["kwargs"])
+    except Exception as exception:
+        result["error"] = f"{type(exception).__name__}: {exception}"
+        print(f"    failed: {result['error']}")
+
+    return result
+
+
+def environment_metadata() -> dict:
+    """
+    Describe the machine and the package versions the benchmark ran with.
+
+    Parameters:
+    None
+
+    Returns:
+    dict: Time, git commit, Python version, platform, CPU count and package versions.
+    """
+    import pandas as pd
+    import tensorflow as tf
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "time": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "tensorflow": tf.__version__,
+    }
+
+
+def compare_results(results: dict, previous: dict) -> None:
+    """
+    Print the change of the median time of every stage relative to a previous run, for the sizes both runs share.
+
+    Parameters:
+    results (dict): Results of this run.
+    previous (dict): Results of the previous run.
+
+    Returns:
+    None
+    """
+    previous_sizes = {size_result["cases"]: size_result for size_result in previous["results"]}
+    print(f"Comparison with the run of commit {previous['metadata'].get('commit')}:")
+    for size_result in results["results"]:
+        previous_result = previous_sizes.get(size_result["cases"])
+        if previous_result is None:
+            continue
+        print(f"{size_result['cases']} cases:")
+        for name, stage in size_result["stages"].items():
+            previous_stage = previous_result["stages"].get(name)
+            if previous_stage is None or previous_stage["seconds"] == 0:
+                continue
+            change = stage["seconds"] / previous_stage["seconds"] - 1
+            print(f"    {name:<52} {previous_stage['seconds']:>10.3f} s -> {stage['seconds']:>10.3f} s "
+                  f"{change:>+8.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Numbers of cases")
+    parser.add_argument("--output", default="benchmark_results.json", help="Path of the JSON results file")
+    parser.add_argument("--compare", default=None, help="JSON results file of a previous run to compare with")
+    parser.add_argument("--repeats", type=int, default=1, help="Number of calls per stage, the median is reported")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the log generator and the sampling")
+
+    log_group = parser.add_argument_group("event log")
+    log_group.add_argument("--activities", type=int, default=10, help="Number of distinct activities")
+    log_group.add_argument("--trace-length", choices=TRACE_LENGTH_DISTRIBUTIONS, default="poisson",
+                           help="Distribution of the trace lengths")
+    log_group.add_argument("--mean-length", type=float, default=5.0, help="Mean trace length")
+    log_group.add_argument("--max-length", type=int, default=None, help="Maximum trace length")
+    log_group.add_argument("--numeric", type=int, default=2, help="Number of numeric event attributes")
+    log_group.add_argument("--categorical", type=int, default=2, help="Number of categorical event attributes")
+    log_group.add_argument("--categories", type=int, default=5, help="Number of values per categorical attribute")
+    log_group.add_argument("--case-attributes", type=int, default=1, help="Number of categorical case attributes")
+
+    model_group = parser.add_argument_group("model")
+    model_group.add_argument("--method", default="LSTM", help="Type of recurrent layer")
+    model_group.add_argument("--units", type=int, nargs="+", default=[32], help="Units per recurrent layer")
+    model_group.add_argument("--embedding-dims", type=int, default=16, help="Dimension of the embedding")
+    model_group.add_argument("--batch-size", type=int, default=128, help="Training batch size")
+    model_group.add_argument("--max-clusters", type=int, default=10, help="Maximum number of clusters")
+    model_group.add_argument("--trace-quantile", type=float, default=0.95, help="Quantile of the trace lengths")
+    model_group.add_argument("--epsilon", type=float, default=None, help="Privacy budget, None trains without DP")
+    model_group.add_argument("--train-examples", type=int, default=100000,
+                             help="Maximum number of training examples of the timed epochs")
+
+    sampling_group = parser.add_argument_group("sampling")
+    sampling_group.add_argument("--sample-size", type=int, default=1000, help="Number of sampled traces")
+    sampling_group.add_argument("--sample-batch-size", type=int, default=100, help="Sampling batch size")
+    args = parser.parse_args()
+
+    results = {"metadata": environment_metadata(), "arguments": vars(args), "results": []}
+    for num_cases in args.sizes:
+        print(f"{num_cases} cases:")
+        results["results"].append(benchmark_size(num_cases, args))
+
+        # Written after every size, so the smaller sizes are kept if a larger one runs out of memory
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+    print(f"Results written to {args.output}")
+    if args.compare is not None:
+        with open(args.compare) as handle:
+            compare_results(results, json.load(handle))
+
+
+if __name__ == "__main__":
+    main()
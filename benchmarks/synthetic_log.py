@@ -0,0 +1,222 @@
+"""
+Generate synthetic event logs of any size with a controlled number of cases, activities, trace lengths and attributes.
+
+Usage:
+python benchmarks/synthetic_log.py synthetic_10k.xes --cases 10000 --activities 20 --numeric 2 --categorical 2
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+TRACE_LENGTH_DISTRIBUTIONS = ("poisson", "geometric", "uniform")
+
+
+def sample_trace_lengths(
+        rng: np.random.Generator,
+        num_cases: int,
+        distribution: str,
+        mean: float,
+        max_length: int = None
+) -> np.ndarray:
+    """
+    Draw the number of events of every case. All traces have at least one event.
+
+    Parameters:
+    rng (np.random.Generator): Random generator.
+    num_cases (int): Number of cases.
+    distribution (str): Distribution of the trace lengths, one of 'poisson', 'geometric' and 'uniform'.
+    mean (float): Mean trace length before the lengths are capped at `max_length`.
+    max_length (int, optional): Maximum trace length. Default is None, which does not cap the lengths.
+
+    Returns:
+    np.ndarray: Trace length of every case.
+    """
+    if mean < 1:
+        raise ValueError("The mean trace length must be at least 1")
+
+    if distribution == "poisson":
+        lengths = 1 + rng.poisson(mean - 1, num_cases)
+    elif distribution == "geometric":
+        lengths = rng.geometric(1 / mean, num_cases)
+    elif distribution == "uniform":
+        lengths = rng.integers(1, int(round(2 * mean - 1)) + 1, num_cases)
+    else:
+        raise ValueError(f"Unknown trace length distribution {distribution!r}, use one of {TRACE_LENGTH_DISTRIBUTIONS}")
+
+    if max_length is not None:
+        lengths = np.minimum(lengths, max_length)
+
+    return lengths.astype(np.int64)
+
+
+def sample_activities(
+        rng: np.random.Generator,
+        trace_lengths: np.ndarray,
+        num_activities: int,
+        concentration: float = 0.3
+) -> np.ndarray:
+    """
+    Draw the activities of all events from a random first-order Markov chain, so the log has a control flow with
+    frequent and rare directly-follows relations instead of independent activities. The chain is walked for all
+    cases at once, one position at a time.
+
+    Parameters:
+    rng (np.random.Generator): Random generator.
+    trace_lengths (np.ndarray): Trace length of every case.
+    num_activities (int): Number of distinct activities.
+    concentration (float): Dirichlet concentration of the transition probabilities. Smaller values give a more
+                           structured process with fewer likely successors per activity. Default is 0.3.
+
+    Returns:
+    np.ndarray: Activity index of every event, ordered by case and position.
+    """
+    start_probabilities = rng.dirichlet(np.full(num_activities, concentration))
+    transition_probabilities = rng.dirichlet(np.full(num_activities, concentration), num_activities)
+    start_cumulative = np.cumsum(start_probabilities)
+    transition_cumulative = np.cumsum(transition_probabilities, axis=1)
+
+    max_length = int(trace_lengths.max(initial=0))
+    activities = np.zeros((len(trace_lengths), max_length), dtype=np.int64)
+    if max_length == 0:
+        return activities.ravel()
+
+    activities[:, 0] = np.searchsorted(start_cumulative, rng.random(len(trace_lengths)), side="right")
+    for position in range(1, max_length):
+        active = np.flatnonzero(trace_lengths > position)
+        cumulative = transition_cumulative[activities[active, position - 1]]
+        activities[active, position] = (cumulative < rng.random((len(active), 1))).sum(axis=1)
+    activities = np.minimum(activities, num_activities - 1)
+
+    return activities[np.arange(max_length) < trace_lengths[:, None]]
+
+
+def sample_categories(rng: np.random.Generator, size: int, num_categories: int, prefix: str) -> np.ndarray:
+    """
+    Draw categorical values with Zipf-like frequencies, so a few categories are common and most are rare.
+
+    Parameters:
+    rng (np.random.Generator): Random generator.
+    size (int): Number of values.
+    num_categories (int): Number of distinct categories.
+    prefix (str): Prefix of the category names.
+
+    Returns:
+    np.ndarray: Object array of category names.
+    """
+    weights = 1 / np.arange(1, num_categories + 1)
+    names = np.array([f"{prefix}_{index}" for index in range(num_categories)], dtype=object)
+
+    return names[rng.choice(num_categories, size=size, p=weights / weights.sum())]
+
+
+def generate_event_log(
+        num_cases: int,
+        num_activities: int = 10,
+        trace_length_distribution: str = "poisson",
+        trace_length_mean: float = 5.0,
+        max_trace_length: int = None,
+        num_numeric: int = 2,
+        num_categorical: int = 2,
+        num_categories: int = 5,
+        num_case_attributes: int = 1,
+        seed: int = None
+) -> pd.DataFrame:
+    """
+    Generate an event log in the DataFrame layout of `pm4py.read_xes`, sorted by case and timestamp. The activities
+    follow a random Markov chain, the cases start uniformly within a year and the time between events is exponential
+    with a mean of one day. Numeric attributes alternate between float amounts with a log-normal distribution and
+    integer counts with a Poisson distribution. Categorical event attributes are named 'category_<i>', case
+    attributes 'case:attribute_<i>'.
+
+    Parameters:
+    num_cases (int): Number of cases.
+    num_activities (int): Number of distinct activities. Default is 10.
+    trace_length_distribution (str): Distribution of the trace lengths, one of 'poisson', 'geometric' and
+                                     'uniform'. Default is 'poisson'.
+    trace_length_mean (float): Mean trace length. Default is 5.0.
+    max_trace_length (int, optional): Maximum trace length. Default is None, which does not cap the lengths.
+    num_numeric (int): Number of numeric event attributes. Default is 2.
+    num_categorical (int): Number of categorical event attributes. Default is 2.
+    num_categories (int): Number of distinct values of every categorical attribute. Default is 5.
+    num_case_attributes (int): Number of categorical case attributes. Default is 1.
+    seed (int, optional): Seed of the random generator. Default is None.
+
+    Returns:
+    pd.DataFrame: Generated event log.
+    """
+    rng = np.random.default_rng(seed)
+
+    trace_lengths = sample_trace_lengths(rng, num_cases, trace_length_distribution, trace_length_mean,
+                                         max_trace_length)
+    num_events = int(trace_lengths.sum())
+    case_index = np.repeat(np.arange(num_cases), trace_lengths)
+
+    activity_names = np.array([f"Activity {index}" for index in range(num_activities)], dtype=object)
+    activities = activity_names[sample_activities(rng, trace_lengths, num_activities)]
+
+    # Time since the case start, accumulated over the gaps within every case
+    case_starts = np.datetime64("2023-01-01T00:00:00", "s").astype(np.int64) + rng.integers(
+        0, 365 * 86400, num_cases
+    )
+    gaps = np.round(rng.exponential(86400, num_events)).astype(np.int64)
+    elapsed = np.cumsum(gaps)
+    elapsed -= np.repeat(elapsed[np.cumsum(trace_lengths) - trace_lengths], trace_lengths)
+    timestamps = pd.to_datetime(case_starts[case_index] + elapsed, unit="s", utc=True)
+
+    columns = {
+        "case:concept:name": np.arange(num_cases).astype(str).astype(object)[case_index],
+        "concept:name": activities,
+        "time:timestamp": timestamps,
+    }
+    for index in range(num_numeric):
+        if index % 2 == 0:
+            columns[f"amount_{index}"] = np.round(rng.lognormal(3, 1, num_events), 2)
+        else:
+            columns[f"count_{index}"] = rng.poisson(3, num_events).astype(np.int64)
+    for index in range(num_categorical):
+        columns[f"category_{index}"] = sample_categories(rng, num_events, num_categories, f"category_{index}")
+    for index in range(num_case_attributes):
+        columns[f"case:attribute_{index}"] = sample_categories(
+            rng, num_cases, num_categories, f"attribute_{index}"
+        )[case_index]
+
+    return pd.DataFrame(columns)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output", help="Path of the generated XES file")
+    parser.add_argument("--cases", type=int, default=1000, help="Number of cases")
+    parser.add_argument("--activities", type=int, default=10, help="Number of distinct activities")
+    parser.add_argument("--trace-length", choices=TRACE_LENGTH_DISTRIBUTIONS, default="poisson",
+                        help="Distribution of the trace lengths")
+    parser.add_argument("--mean-length", type=float, default=5.0, help="Mean trace length")
+    parser.add_argument("--max-length", type=int, default=None, help="Maximum trace length")
+    parser.add_argument("--numeric", type=int, default=2, help="Number of numeric event attributes")
+    parser.add_argument("--categorical", type=int, default=2, help="Number of categorical event attributes")
+    parser.add_argument("--categories", type=int, default=5, help="Number of values per categorical attribute")
+    parser.add_argument("--case-attributes", type=int, default=1, help="Number of categorical case attributes")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator")
+    args = parser.parse_args()
+
+    from PALSYN.postprocessing.xes_writer import write_xes
+
+    event_log = generate_event_log(
+        args.cases,
+        num_activities=args.activities,
+        trace_length_distribution=args.trace_length,
+        trace_length_mean=args.mean_length,
+        max_trace_length=args.max_length,
+        num_numeric=args.numeric,
+        num_categorical=args.categorical,
+        num_categories=args.categories,
+        num_case_attributes=args.case_attributes,
+        seed=args.seed
+    )
+    write_xes(event_log, args.output)
+    print(f"Wrote {args.cases} cases with {len(event_log)} events to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,424 @@
+import functools
+
+import numpy as np
+import pandas as pd
+import pm4py
+from pm4py.objects.log.obj import Event, EventLog, Trace
+
+from evaluation_runner import hellinger_complement
+from fidelity_metrics import categorical_distances, ks_statistic
+from process_mining_eval_functions import to_dataframe
+
+CASE_COLUMN = "case:concept:name"
+
+
+def case_table(log):
+    """Sort the events of a log by case and index the events of every case, so subsamples of cases can be drawn
+    without grouping the log again. Cases are stratified by their trace length in powers of two, i.e. lengths 1, 2-3,
+    4-7 and so on, so the trace length distribution keeps some sampling variance within every stratum.
+
+    :param log: The event log.
+    :type log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :return: The 'events' sorted by case, and the first row ('starts'), number of events ('lengths') and stratum
+        ('strata') of every case.
+    :rtype: dict
+    """
+    df = to_dataframe(log)
+    df = df[df[CASE_COLUMN].notna()]
+    codes, _ = pd.factorize(df[CASE_COLUMN])
+    order = np.argsort(codes, kind="stable")
+    lengths = np.bincount(codes)
+
+    return {
+        "events": df.iloc[order].reset_index(drop=True),
+        "starts": np.cumsum(lengths) - lengths,
+        "lengths": lengths,
+        "strata": np.log2(lengths).astype(np.intp),
+    }
+
+
+def take_cases(table, cases):
+    """Return the events of the given cases. Cases drawn more than once are repeated under new case ids.
+
+    :param table: The case table of the event log, as returned by case_table.
+    :type table: dict
+    :param cases: The positions of the cases in the case table.
+    :type cases: np.ndarray
+    :return: The events of the cases, numbered from 0 in the order of the cases.
+    :rtype: pd.DataFrame
+    """
+    lengths = table["lengths"][cases]
+    ends = np.cumsum(lengths)
+    rows = np.arange(ends[-1] if len(ends) else 0) + np.repeat(table["starts"][cases] - (ends - lengths), lengths)
+
+    return table["events"].iloc[rows].assign(**{CASE_COLUMN: np.repeat(np.arange(len(cases)), lengths)})
+
+
+def stratified_sample(table, num_cases, rng):
+    """Draw a sample of cases without replacement, stratified by trace length. The cases are ordered by stratum and
+    randomly within each stratum, then every k-th case is taken, so each stratum gets its proportional share of the
+    sample. If the log has at most num_cases cases, all of them are returned.
+
+    :param table: The case table of the event log, as returned by case_table.
+    :type table: dict
+    :param num_cases: The number of cases to draw.
+    :type num_cases: int
+    :param rng: The random number generator.
+    :type rng: np.random.Generator
+    :return: The positions of the sampled cases in the case table.
+    :rtype: np.ndarray
+    """
+    total_cases = len(table["lengths"])
+    if num_cases >= total_cases:
+        return np.arange(total_cases)
+
+    order = np.lexsort((rng.random(total_cases), table["strata"]))
+    positions = ((np.arange(num_cases) + rng.random()) * (total_cases / num_cases)).astype(np.intp)
+
+    return order[positions]
+
+
+def stratified_resample(table, cases, rng):
+    """Draw a bootstrap resample of a sample of cases, i.e. draw with replacement within every stratum.
+
+    :param table: The case table of the event log, as returned by case_table.
+    :type table: dict
+    :param cases: The positions of the sampled cases in the case table.
+    :type cases: np.ndarray
+    :param rng: The random number generator.
+    :type rng: np.random.Generator
+    :return: The positions of the resampled cases in the case table.
+    :rtype: np.ndarray
+    """
+    strata = table["strata"][cases]
+    order = np.argsort(strata, kind="stable")
+    cases = cases[order]
+    _, first, counts = np.unique(strata[order], return_index=True, return_counts=True)
+    stratum_index = np.repeat(np.arange(len(first)), counts)
+
+    return cases[first[stratum_index] + (rng.random(len(cases)) * counts[stratum_index]).astype(np.intp)]
+
+
+def event_distribution_complement(real_events, synthetic_events):
+    """Calculate one minus the Hellinger distance of the event distributions of two logs.
+
+    :param real_events: The events of the real log.
+    :type real_events: pd.DataFrame
+    :param synthetic_events: The events of the synthetic log.
+    :type synthetic_events: pd.DataFrame
+    :return: One minus the Hellinger distance.
+    :rtype: float
+    """
+    return hellinger_complement(
+        real_events["concept:name"].dropna().value_counts(), synthetic_events["concept:name"].dropna().value_counts()
+    )
+
+
+def trace_length_complement(real_events, synthetic_events):
+    """Calculate one minus the Hellinger distance of the trace length distributions of two logs.
+
+    :param real_events: The events of the real log.
+    :type real_events: pd.DataFrame
+    :param synthetic_events: The events of the synthetic log.
+    :type synthetic_events: pd.DataFrame
+    :return: One minus the Hellinger distance.
+    :rtype: float
+    """
+    return hellinger_complement(
+        real_events[CASE_COLUMN].value_counts().value_counts(),
+        synthetic_events[CASE_COLUMN].value_counts().value_counts()
+    )
+
+
+def case_throughput_times(events):
+    """Calculate the time between the first and the last event of every case in seconds, like
+    pm4py.get_all_case_durations but without converting the events to an event log.
+
+    :param events: The events of the log.
+    :type events: pd.DataFrame
+    :return: The throughput time of every case with a timestamp.
+    :rtype: np.ndarray
+    """
+    timestamps = events.dropna(subset=["time:timestamp"]).groupby(CASE_COLUMN)["time:timestamp"]
+
+    return (timestamps.max() - timestamps.min()).dt.total_seconds().to_numpy()
+
+
+def throughput_time_complement(real_events, synthetic_events):
+    """Calculate the KSComplement of the throughput times of two logs.
+
+    :param real_events: The events of the real log.
+    :type real_events: pd.DataFrame
+    :param synthetic_events: The events of the synthetic log.
+    :type synthetic_events: pd.DataFrame
+    :return: One minus the Kolmogorov-Smirnov statistic.
+    :rtype: float
+    """
+    return 1 - ks_statistic(case_throughput_times(real_events), case_throughput_times(synthetic_events))
+
+
+def attribute_ks_complement(real_events, synthetic_events, column):
+    """Calculate the KSComplement of a numeric column of two logs.
+
+    :param real_events: The events of the real log.
+    :type real_events: pd.DataFrame
+    :param synthetic_events: The events of the synthetic log.
+    :type synthetic_events: pd.DataFrame
+    :param column: The numeric column.
+    :type column: str
+    :return: One minus the Kolmogorov-Smirnov statistic, NaN if either log has no values in the column.
+    :rtype: float
+    """
+    real_values = real_events[column].dropna().to_numpy(dtype=float)
+    synthetic_values = synthetic_events[column].dropna().to_numpy(dtype=float)
+    if len(real_values) == 0 or len(synthetic_values) == 0:
+        return np.nan
+
+    return 1 - ks_statistic(real_values, synthetic_values)
+
+
+def attribute_hellinger_complement(real_events, synthetic_events, column):
+    """Calculate one minus the Hellinger distance of the value distributions of a categorical column of two logs.
+
+    :param real_events: The events of the real log.
+    :type real_events: pd.DataFrame
+    :param synthetic_events: The events of the synthetic log.
+    :type synthetic_events: pd.DataFrame
+    :param column: The categorical column.
+    :type column: str
+    :return: One minus the Hellinger distance, NaN if either log has no values in the column.
+    :rtype: float
+    """
+    return 1 - categorical_distances(real_events, synthetic_events, [column])["hellinger"].iloc[0]
+
+
+def attribute_metrics(reference_profile, synthetic_log):
+    """Create the metrics of the attribute_ks and attribute_tv jobs of fidelity_metric_jobs, one per column, so
+    every column is estimated on case subsamples. Columns are skipped like in fidelity_metric_jobs, i.e. if the
+    synthetic log has no values in them.
+
+    :param reference_profile: The reference profile of the real event log.
+    :type reference_profile: dict
+    :param synthetic_log: The synthetic event log.
+    :type synthetic_log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :return: The metrics by result name, '<column>_ks' and '<column>_tv'.
+    :rtype: dict
+    """
+    df_synthetic = to_dataframe(synthetic_log)
+    metrics = {}
+    for kind, suffix, metric in [("numeric", "ks", attribute_ks_complement),
+                                 ("categorical", "tv", attribute_hellinger_complement)]:
+        for col, data_real in reference_profile[f"{kind}_columns"].items():
+            if col in df_synthetic.columns and len(data_real) > 0 and df_synthetic[col].notna().any():
+                metrics[f"{col}_{suffix}"] = functools.partial(metric, column=col)
+
+    return metrics
+
+
+def alignment_fitness(real_events, synthetic_events, petri_net, cache):
+    """Calculate the alignment fitness of the synthetic log on a Petri net discovered from the real log, i.e. the
+    average fitness of its traces. The fitness of every variant is aligned once and kept in the cache, so bootstrap
+    resamples of the same cases do not align again.
+
+    :param real_events: The events of the real log, unused as the Petri net stands for the real log.
+    :type real_events: pd.DataFrame
+    :param synthetic_events: The events of the synthetic log.
+    :type synthetic_events: pd.DataFrame
+    :param petri_net: The Petri net with its initial and final marking.
+    :type petri_net: list
+    :param cache: The fitness of the variants aligned so far.
+    :type cache: dict
+    :return: The average fitness of the traces.
+    :rtype: float
+    """
+    variants = synthetic_events.dropna(subset=["concept:name"]).groupby(CASE_COLUMN, sort=False)["concept:name"]
+    variants = variants.agg(tuple)
+
+    new_variants = [variant for variant in variants.unique() if variant not in cache]
+    if new_variants:
+        log = EventLog([Trace([Event({"concept:name": activity}) for activity in variant]) for variant in new_variants])
+        alignments = pm4py.conformance_diagnostics_alignments(log, petri_net[0], petri_net[1], petri_net[2])
+        cache.update(zip(new_variants, (alignment["fitness"] for alignment in alignments)))
+
+    return float(np.mean([cache[variant] for variant in variants]))
+
+
+def fitness_metrics(petri_net_dict):
+    """Create the alignment fitness metrics of a synthetic log on the Petri nets of a real log, e.g. the Petri nets
+    of a reference profile, with the result names of compare_logs. Precision and generalization are not averages
+    over traces and stay exact-only.
+
+    :param petri_net_dict: The Petri nets with initial and final markings, as returned by calculate_petri_nets.
+    :type petri_net_dict: dict
+    :return: The metrics by result name.
+    :rtype: dict
+    """
+    return {
+        f"synthetic_{key}_Fitness": functools.partial(alignment_fitness, petri_net=petri_net, cache={})
+        for key, petri_net in petri_net_dict.items()
+    }
+
+
+# Metrics of fidelity_metric_jobs that compare whole logs and are estimated on case subsamples
+BOOTSTRAP_METRICS = {
+    "tv_statistic_event_distribution": event_distribution_complement,
+    "hellinger_distance_trace_length_distribution": trace_length_complement,
+    "ks_statistic_throughput_time_distribution": throughput_time_complement,
+}
+
+
+def sample_events(table, cases, rng=None):
+    """Return the events of the given cases, or of a stratified resample of them if a random number generator is
+    given.
+
+    :param table: The case table of the event log, as returned by case_table, or None for a missing log.
+    :type table: dict
+    :param cases: The positions of the cases in the case table.
+    :type cases: np.ndarray
+    :param rng: The random number generator of the resample. Default is None, which takes the cases as they are.
+    :type rng: np.random.Generator
+    :return: The events of the cases, None if the table is None.
+    :rtype: pd.DataFrame
+    """
+    if table is None:
+        return None
+    if rng is not None:
+        cases = stratified_resample(table, cases, rng)
+
+    return take_cases(table, cases)
+
+
+def bootstrap_metric(metric, real_table, synthetic_table, initial_cases=500, max_cases=None, target_width=0.05,
+                     confidence=0.95, n_bootstrap=200, growth=2.0, distance=True, rng=None):
+    """Estimate a metric on stratified case subsamples of two logs with a bootstrap confidence interval. The metric
+    is computed on a subsample of initial_cases cases of every log and on n_bootstrap stratified resamples of it.
+    While the confidence interval is wider than target_width, the subsample grows by the factor growth. Once a
+    subsample would hold more than half of a log, the exact value on the full logs is returned instead, as it costs
+    less than the bootstrap.
+
+    Distances between small samples are biased upwards, because the sampling noise adds to the squared distance. For
+    metrics that are one minus a distance, the estimate is therefore corrected on the squared distance by the bias of
+    the resamples, scaled by the share of the cases not in the subsample, since the full logs hold some noise
+    themselves. The interval is the basic bootstrap interval around the corrected estimate on the same scale. Other
+    metrics, e.g. averages over traces, are corrected on their own scale.
+
+    :param metric: The metric, a function of the events of the real and of the synthetic log.
+    :type metric: callable
+    :param real_table: The case table of the real event log, as returned by case_table, or None for metrics of the
+        synthetic log alone, e.g. its fitness on Petri nets of the real log.
+    :type real_table: dict
+    :param synthetic_table: The case table of the synthetic event log, as returned by case_table.
+    :type synthetic_table: dict
+    :param initial_cases: The number of cases of the first subsample. Default is 500.
+    :type initial_cases: int
+    :param max_cases: The maximum number of cases of a subsample. Default is None, which allows the full logs.
+    :type max_cases: int
+    :param target_width: The width of the confidence interval at which sampling stops. Default is 0.05.
+    :type target_width: float
+    :param confidence: The confidence level of the interval. Default is 0.95.
+    :type confidence: float
+    :param n_bootstrap: The number of bootstrap resamples of every subsample. Default is 200.
+    :type n_bootstrap: int
+    :param growth: The factor by which the subsample grows. Default is 2.0.
+    :type growth: float
+    :param distance: Whether the metric is one minus a distance. Default is True.
+    :type distance: bool
+    :param rng: The random number generator or its seed. Default is None, which uses fresh entropy.
+    :type rng: np.random.Generator or int
+    :return: The 'estimate', its confidence interval 'ci_low' and 'ci_high', the number of real 'cases' it is based
+        on (synthetic cases without a real log) and whether the estimate is 'exact'.
+    :rtype: dict
+    """
+    rng = np.random.default_rng(rng)
+    alpha = (1 - confidence) / 2
+    num_cases = initial_cases if max_cases is None else min(initial_cases, max_cases)
+    tables = [table for table in (real_table, synthetic_table) if table is not None]
+    total_cases = max(len(table["lengths"]) for table in tables)
+    if distance:
+        to_scale, from_scale = lambda value: (1 - value) ** 2, lambda squared: 1 - np.sqrt(np.maximum(squared, 0))
+    else:
+        to_scale, from_scale = lambda value: value, lambda value: value
+
+    while True:
+        if 2 * num_cases > total_cases:
+            value = metric(None if real_table is None else real_table["events"], synthetic_table["events"])
+            return {"estimate": value, "ci_low": value, "ci_high": value, "cases": len(tables[0]["lengths"]),
+                    "exact": True}
+
+        real_cases = None if real_table is None else stratified_sample(real_table, num_cases, rng)
+        synthetic_cases = stratified_sample(synthetic_table, num_cases, rng)
+        value = metric(sample_events(real_table, real_cases), sample_events(synthetic_table, synthetic_cases))
+
+        values = [
+            metric(sample_events(real_table, real_cases, rng), sample_events(synthetic_table, synthetic_cases, rng))
+            for _ in range(n_bootstrap)
+        ]
+        scaled_value = to_scale(value)
+        scaled_values = to_scale(np.asarray(values, dtype=float))
+        mean = np.nanmean(scaled_values)
+        lower_quantile, upper_quantile = np.nanquantile(scaled_values, [alpha, 1 - alpha])
+
+        center = scaled_value - (mean - scaled_value) * (1 - num_cases / total_cases)
+        ci_low, ci_high = sorted([
+            from_scale(center - (upper_quantile - mean)), from_scale(center - (lower_quantile - mean))
+        ])
+        if ci_high - ci_low <= target_width or num_cases == max_cases:
+            return {
+                "estimate": float(from_scale(center)),
+                "ci_low": float(ci_low),
+                "ci_high": float(ci_high),
+                "cases": len(synthetic_cases if real_cases is None else real_cases),
+                "exact": False,
+            }
+
+        num_cases = int(np.ceil(num_cases * growth))
+        if max_cases is not None:
+            num_cases = min(num_cases, max_cases)
+
+
+def bootstrap_fidelity_metrics(real_log, synthetic_log, metrics=None, mode="bootstrap", seed=None, **kwargs):
+    """Compare a synthetic event log with a real event log on metrics that compare whole logs. In 'bootstrap' mode
+    every metric is estimated on case subsamples with bootstrap_metric, in 'exact' mode it is computed once on the
+    full logs.
+
+    :param real_log: The real event log, or its case table from case_table to reuse it across synthetic logs. None
+        for metrics of the synthetic log alone, such as fitness_metrics.
+    :type real_log: pm4py.objects.log.log.EventLog or pd.DataFrame or dict
+    :param synthetic_log: The synthetic event log.
+    :type synthetic_log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :param metrics: The metrics by result name, functions of the events of the real and of the synthetic log.
+        Default is None, which uses BOOTSTRAP_METRICS.
+    :type metrics: dict
+    :param mode: 'bootstrap' or 'exact'. Default is 'bootstrap'.
+    :type mode: str
+    :param seed: The seed of the subsamples. Default is None, which uses fresh entropy.
+    :type seed: int
+    :param kwargs: The keyword arguments of bootstrap_metric.
+    :return: Dictionary with the estimate of every metric and its confidence interval as '<name>_ci_low' and
+        '<name>_ci_high', and the number of real cases it is based on as '<name>_cases'.
+    :rtype: dict
+    """
+    if mode not in ("bootstrap", "exact"):
+        raise ValueError(f"Unknown evaluation mode '{mode}', expected 'bootstrap' or 'exact'")
+    if metrics is None:
+        metrics = BOOTSTRAP_METRICS
+
+    real_table = real_log if real_log is None or isinstance(real_log, dict) else case_table(real_log)
+    synthetic_table = case_table(synthetic_log)
+    rng = np.random.default_rng(seed)
+
+    results = {}
+    for name, metric in metrics.items():
+        if mode == "exact":
+            value = metric(None if real_table is None else real_table["events"], synthetic_table["events"])
+            cases = len((synthetic_table if real_table is None else real_table)["lengths"])
+            estimate = {"estimate": value, "ci_low": value, "ci_high": value, "cases": cases}
+        else:
+            estimate = bootstrap_metric(metric, real_table, synthetic_table, rng=rng, **kwargs)
+
+        results[name] = estimate["estimate"]
+        results[f"{name}_ci_low"] = estimate["ci_low"]
+        results[f"{name}_ci_high"] = estimate["ci_high"]
+        results[f"{name}_cases"] = estimate["cases"]
+
+    return results
@@ -0,0 +1,320 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+import numpy as np
+import pm4py
+
+from fidelity_metrics import categorical_distances, ks_statistic, ks_statistics
+from process_mining_eval_functions import (calc_hellinger, calculate_conformance, calculate_simplicity,
+                                           calculate_throughput_time, calculate_trace_length_distribution,
+                                           to_dataframe)
+
+
+def metric_job(function, *args, timeout=None, **kwargs):
+    """Describe a metric to be computed by run_metric_jobs. The function and its arguments must be picklable, i.e.
+    the function has to be defined at module level.
+
+    :param function: The function computing the metric. If it returns a dict, its items are added to the results.
+    :type function: callable
+    :param args: The positional arguments of the function.
+    :param timeout: The time in seconds after which the metric is aborted. Default is None, which uses the default
+        timeout of run_metric_jobs.
+    :type timeout: float
+    :param kwargs: The keyword arguments of the function.
+    :return: The metric job.
+    :rtype: dict
+    """
+    return {"function": function, "args": args, "kwargs": kwargs, "timeout": timeout}
+
+
+def _metric_worker(connection):
+    """Compute metrics in a worker process until the runner sends None. The value or the error of every metric is
+    sent back to the runner together with the time it took.
+
+    :param connection: The pipe to the runner.
+    :type connection: multiprocessing.connection.Connection
+    """
+    while True:
+        job = connection.recv()
+        if job is None:
+            break
+
+        function, args, kwargs = job
+        start_time = time.perf_counter()
+        try:
+            value, error = function(*args, **kwargs), None
+        except Exception as exception:
+            value, error = None, f"{type(exception).__name__}: {exception}"
+        connection.send((value, error, time.perf_counter() - start_time))
+
+    connection.close()
+
+
+def _start_metric_worker(context):
+    """Start a worker process for run_metric_jobs.
+
+    :param context: The multiprocessing context.
+    :type context: multiprocessing.context.BaseContext
+    :return: The worker process and the pipe to it.
+    :rtype: tuple
+    """
+    connection, worker_connection = context.Pipe()
+    process = context.Process(target=_metric_worker, args=(worker_connection,), daemon=True)
+    process.start()
+    worker_connection.close()
+
+    return process, connection
+
+
+def run_metric_jobs(jobs, max_workers=None, timeout=None):
+    """Compute independent metrics in parallel on a pool of worker processes. The workers are reused across metrics,
+    and a worker whose metric exceeds its timeout is terminated and replaced without affecting the other metrics.
+    Metrics that fail or time out are reported and set to None. The wall time of every metric is added to the results
+    as '<name>_time'.
+
+    :param jobs: The metric jobs by result name, as created by metric_job.
+    :type jobs: dict
+    :param max_workers: The maximum number of worker processes. Default is the number of CPU cores.
+    :type max_workers: int
+    :param timeout: The default timeout of the metrics in seconds. Default is None, which waits indefinitely.
+    :type timeout: float
+    :return: Dictionary with the value and the wall time of every metric.
+    :rtype: dict
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    context = multiprocessing.get_context("spawn")
+    pending = deque(jobs.items())
+    idle_workers = [_start_metric_worker(context) for _ in range(min(max_workers, len(jobs)))]
+    running = {}
+    results = {}
+
+    def record(name, value, error, seconds):
+        results[f"{name}_time"] = seconds
+        if error is not None:
+            print(f"Metric {name} failed: {error}")
+            results[name] = None
+        elif isinstance(value, dict):
+            results.update(value)
+        else:
+            results[name] = value
+
+    try:
+        while pending or running:
+            while pending and idle_workers:
+                name, job = pending.popleft()
+                process, connection = idle_workers.pop()
+                connection.send((job["function"], job["args"], job["kwargs"]))
+                job_timeout = job["timeout"] if job["timeout"] is not None else timeout
+                deadline = time.perf_counter() + job_timeout if job_timeout is not None else None
+                running[connection] = (name, process, deadline, job_timeout)
+
+            deadlines = [deadline for _, _, deadline, _ in running.values() if deadline is not None]
+            wait_time = max(0.0, min(deadlines) - time.perf_counter()) if deadlines else None
+            ready = wait(list(running), timeout=wait_time)
+
+            for connection in list(running):
+                name, process, deadline, job_timeout = running[connection]
+                if connection in ready:
+                    del running[connection]
+                    try:
+                        value, error, seconds = connection.recv()
+                    except EOFError:
+                        connection.close()
+                        record(name, None, f"worker exited with code {process.exitcode}", 0.0)
+                        idle_workers.append(_start_metric_worker(context))
+                        continue
+                    record(name, value, error, seconds)
+                    idle_workers.append((process, connection))
+                elif deadline is not None and time.perf_counter() >= deadline:
+                    del running[connection]
+                    process.kill()
+                    process.join()
+                    connection.close()
+                    record(name, None, f"timed out after {job_timeout} seconds", job_timeout)
+                    if pending:
+                        idle_workers.append(_start_metric_worker(context))
+    finally:
+        for process, connection in idle_workers:
+            connection.send(None)
+            connection.close()
+            process.join()
+        for connection, (_, process, _, _) in running.items():
+            process.kill()
+            connection.close()
+
+    return results
+
+
+def ks_complement(real_data, synthetic_data):
+    """Calculate the KSComplement of two numeric samples, i.e. one minus the Kolmogorov-Smirnov statistic.
+
+    :param real_data: The real values.
+    :type real_data: pd.Series or list
+    :param synthetic_data: The synthetic values.
+    :type synthetic_data: pd.Series or list
+    :return: One minus the Kolmogorov-Smirnov statistic.
+    :rtype: float
+    """
+    return 1 - ks_statistic(np.asarray(real_data, dtype=float), np.asarray(synthetic_data, dtype=float))
+
+
+def attribute_ks_complements(real_columns, synthetic_columns):
+    """Calculate the KSComplement of every numeric column.
+
+    :param real_columns: The values of the real columns.
+    :type real_columns: dict
+    :param synthetic_columns: The values of the synthetic columns.
+    :type synthetic_columns: dict
+    :return: The KSComplement of every column as '<column>_ks'.
+    :rtype: dict
+    """
+    statistics = ks_statistics(real_columns, synthetic_columns)
+    return {f"{col}_ks": 1 - statistic for col, statistic in statistics.items()}
+
+
+def attribute_hellinger_complements(real_columns, synthetic_columns):
+    """Calculate one minus the Hellinger distance of every categorical column.
+
+    :param real_columns: The values of the real columns.
+    :type real_columns: dict
+    :param synthetic_columns: The values of the synthetic columns.
+    :type synthetic_columns: dict
+    :return: One minus the Hellinger distance of every column as '<column>_tv'.
+    :rtype: dict
+    """
+    distances = categorical_distances(real_columns, synthetic_columns)
+    return {f"{col}_tv": 1 - distance for col, distance in distances["hellinger"].items()}
+
+
+def hellinger_complement(real_distribution, synthetic_distribution):
+    """Calculate one minus the Hellinger distance of two value distributions.
+
+    :param real_distribution: The value counts of the real data.
+    :type real_distribution: pd.Series
+    :param synthetic_distribution: The value counts of the synthetic data.
+    :type synthetic_distribution: pd.Series
+    :return: One minus the Hellinger distance.
+    :rtype: float
+    """
+    return 1 - calc_hellinger(real_distribution, synthetic_distribution, input_type="distribution")
+
+
+def trace_length_similarity(real_distribution, synthetic_event_log):
+    """Calculate one minus the Hellinger distance of the trace length distributions of a real and a synthetic log.
+
+    :param real_distribution: The trace length distribution of the real event log.
+    :type real_distribution: pd.Series
+    :param synthetic_event_log: The synthetic event log.
+    :type synthetic_event_log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :return: One minus the Hellinger distance.
+    :rtype: float
+    """
+    return hellinger_complement(real_distribution, calculate_trace_length_distribution(synthetic_event_log))
+
+
+def throughput_time_similarity(real_throughput_times, synthetic_event_log):
+    """Calculate the KSComplement of the throughput times of a real and a synthetic log.
+
+    :param real_throughput_times: The throughput times of the real event log.
+    :type real_throughput_times: list
+    :param synthetic_event_log: The synthetic event log.
+    :type synthetic_event_log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :return: One minus the Kolmogorov-Smirnov statistic.
+    :rtype: float
+    """
+    return ks_complement(real_throughput_times, calculate_throughput_time(synthetic_event_log))
+
+
+def conformance_metrics(log, net_name, petri_net, prefix):
+    """Calculate fitness, precision and generalization of an event log on one Petri net.
+
+    :param log: The event log.
+    :type log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :param net_name: The name of the Petri net.
+    :type net_name: str
+    :param petri_net: The Petri net with its initial and final marking.
+    :type petri_net: list
+    :param prefix: The prefix of the result keys.
+    :type prefix: str
+    :return: Dictionary containing the metrics with prefixed keys
+    :rtype: dict
+    """
+    fitness, prec, gen = calculate_conformance(log, petri_net)
+
+    return {
+        f"{prefix}_{net_name}_Fitness": fitness,
+        f"{prefix}_{net_name}_Precision": prec,
+        f"{prefix}_{net_name}_Generalization": gen,
+    }
+
+
+def fidelity_metric_jobs(reference_profile, synthetic_event_log, threshold=None, timeout=None):
+    """Create the metric jobs comparing a synthetic event log with the reference profile of the real log: the
+    KSComplement of all numeric columns, one minus the Hellinger distance of all categorical columns, of the event
+    distribution and of the trace length distribution, and the KSComplement of the throughput times. If a threshold
+    is given and the profile holds Petri nets discovered with it, the conformance of the synthetic log on every net
+    and the simplicity of the nets discovered from the synthetic log are added. Each of these is a separate job.
+
+    :param reference_profile: The reference profile of the real event log.
+    :type reference_profile: dict
+    :param synthetic_event_log: The synthetic event log.
+    :type synthetic_event_log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :param threshold: The threshold for the heuristic mining algorithm. Default is None, which skips the Petri nets.
+    :type threshold: float
+    :param timeout: The timeout of every metric in seconds. Default is None, which uses the timeout of
+        run_metric_jobs.
+    :type timeout: float
+    :return: The metric jobs by result name.
+    :rtype: dict
+    """
+    df_synthetic = to_dataframe(synthetic_event_log)
+    jobs = {}
+
+    # All numeric and all categorical columns are compared in one job each
+    real_columns = {"numeric": {}, "categorical": {}}
+    synthetic_columns = {"numeric": {}, "categorical": {}}
+    for kind in ["numeric", "categorical"]:
+        for col, data_real in reference_profile[f"{kind}_columns"].items():
+            if col not in df_synthetic.columns or len(data_real) == 0 or df_synthetic[col].isna().all():
+                print(f"Skipping {col} - column not found in synthetic data or empty")
+                continue
+            real_columns[kind][col] = data_real
+            synthetic_columns[kind][col] = df_synthetic[col].dropna()
+
+    jobs["attribute_ks"] = metric_job(
+        attribute_ks_complements, real_columns["numeric"], synthetic_columns["numeric"], timeout=timeout
+    )
+    jobs["attribute_tv"] = metric_job(
+        attribute_hellinger_complements, real_columns["categorical"], synthetic_columns["categorical"],
+        timeout=timeout
+    )
+
+    jobs["tv_statistic_event_distribution"] = metric_job(
+        hellinger_complement,
+        reference_profile["event_distribution"],
+        df_synthetic["concept:name"].dropna().value_counts(),
+        timeout=timeout
+    )
+    jobs["hellinger_distance_trace_length_distribution"] = metric_job(
+        trace_length_similarity, reference_profile["trace_length_distribution"], df_synthetic, timeout=timeout
+    )
+    jobs["ks_statistic_throughput_time_distribution"] = metric_job(
+        throughput_time_similarity, reference_profile["throughput_times"], df_synthetic, timeout=timeout
+    )
+
+    if threshold is not None and reference_profile["petri_nets"] is not None \
+            and reference_profile["threshold"] == threshold:
+        for net_name, petri_net in reference_profile["petri_nets"].items():
+            jobs[f"synthetic_{net_name}_conformance"] = metric_job(
+                conformance_metrics, synthetic_event_log, net_name, petri_net, "synthetic", timeout=timeout
+            )
+        jobs["synthetic_simplicity"] = metric_job(
+            calculate_simplicity, synthetic_event_log, threshold, "synthetic", timeout=timeout
+        )
+
+    return jobs
@@ -1,25 +1,22 @@
 from datetime import datetime
-import time
+import functools
 import os
 
-import pandas as pd
 import pm4py
-from PALSYN.synthesizer import DPEventLogSynthesizer
-from sdmetrics.single_column import KSComplement
-from PALSYN.postprocessing.log_postprocessing import clean_xes_file
-from process_mining_eval_functions import (calculate_throughput_time, \
-                                           calculate_trace_length_distribution, calc_hellinger)
+from bootstrap_evaluation import BOOTSTRAP_METRICS, attribute_metrics, bootstrap_fidelity_metrics, case_table
+from evaluation_runner import fidelity_metric_jobs, run_metric_jobs
+from reference_profile import load_reference_profile
+from successive_halving import run_successive_halving
+from sweep_runner import run_sweep, sweep_job
 
 
 # To run this file you need to install the following packages:
 # pip install pyemd
-# pip install sdmetrics
 # pip install openpyxl
 
 # Read Event Log
 log_filename = "Road_Traffic_Fine_Management_Process_short.xes"
 real_event_log_filename = os.path.join(os.path.dirname(os.path.dirname(__file__)), "example_logs", log_filename)
-event_log_train = pm4py.read_xes(real_event_log_filename)
 
 event_log_name = "Sepsis_Case"
 method_array = ["LSTM"]
@@ -27,184 +24,22 @@ num_epochs = 5  # Total number of epochs to train
 breakpoint_interval = 5  # Save and evaluate model every 10 epochs
 units_per_layer_array = [64]
 epsilon_array = [None]
+sweep_workers = 2  # Number of configurations trained in parallel, each worker holds its own TensorFlow model
+scheduler = "grid"  # "successive_halving" stops training the worst configurations after every rung of epochs
+halving_reduction_factor = 3  # Only the best third of the configurations of a rung is trained further
 
 # Sampling
 sample_size = 200
 batch_size = 10
 
-# Dataframe result array
-df_result_array = []
-
-# Loop through all combinations
-for method in method_array:
-    for units in units_per_layer_array:
-        for epsilon in epsilon_array:
-            # Create model name
-            if epsilon is None:
-                epsilon_str = "inf"
-            else:
-                epsilon_str = str(epsilon)
-
-            # Initialize model once
-            model = DPEventLogSynthesizer(
-                embedding_output_dims=128,
-                epochs=num_epochs,
-                batch_size=128,
-                max_clusters=10,
-                dropout=0.0,
-                trace_quantile=0.8,
-                epsilon=epsilon,
-                l2_norm_clip=1.0,
-                method=method,
-                units_per_layer=[units],
-            )
-
-            # Initialize model architecture
-            model.initialize_model(event_log_train)
-
-            # Train in intervals defined by breakpoint_interval
-            for current_epoch in range(breakpoint_interval, num_epochs + breakpoint_interval, breakpoint_interval):
-                results = {"method": method, "units": units, "epsilon": epsilon_str, "epochs": current_epoch}
-
-                # Train for breakpoint_interval epochs
-                start_time = time.time()
-                print(f"Training epochs {current_epoch - breakpoint_interval} to {current_epoch}")
-                model.train(epochs=breakpoint_interval)
-
-                model_name = f"models/{method}_{event_log_name}_u={units}_e={epsilon_str}_ep={current_epoch}"
-                model.save_model(model_name)
-                print(f"Model saved at epoch {current_epoch}: {model_name}")
-
-                # End timer for training time
-                end_time = time.time()
-                training_time = end_time - start_time
-                results["training_time"] = training_time
-
-                try:
-                    # Sampling time
-                    start_time = time.time()
-                    event_log_sample = model.sample(sample_size=sample_size, batch_size=batch_size)
-                    event_log_xes = pm4py.convert_to_event_log(event_log_sample)
-                    end_time = time.time()
-                    sampling_time = end_time - start_time
-                    results["sampling_time"] = sampling_time
-
-                    # Save as XES File
-                    xes_filename = f"synthetic_logs/{method}_{event_log_name}_u={units}_e={epsilon_str}_ep={current_epoch}.xes"
-                    pm4py.write_xes(event_log_xes, xes_filename)
-                except:
-                    continue
-
-                # Transform XES
-                clean_xes_file(xes_filename, xes_filename)
-
-                # Load and Process Real Event Log
-                real_event_log = pm4py.read_xes(real_event_log_filename)
-                synthetic_event_log = pm4py.read_xes(xes_filename)
-                df_real = pm4py.convert_to_dataframe(real_event_log)
-                df_synthetic = pm4py.convert_to_dataframe(synthetic_event_log)
-
-                # region DF pre-processing
-                df_real = df_real.drop(columns=['time:timestamp', 'case:concept:name', 'concept:name'], axis=1)
-                df_synthetic = df_synthetic.drop(columns=['time:timestamp', 'case:concept:name', 'concept:name'],
-                                                 axis=1)
-
-                # Make dataframe with only numeric columns
-                df_real_numeric = df_real.select_dtypes(include=['int64', 'float64'])
-                df_synthetic_numeric = df_synthetic.select_dtypes(include=['int64', 'float64'])
-
-                # Make dataframe with only categorical columns
-                df_real_categorical = df_real.select_dtypes(include=['object'])
-                df_synthetic_categorical = df_synthetic.select_dtypes(include=['object'])
-                # endregion
-
-                # region Attribute Perspective Evaluation
-                average_ks = []
-                for col in df_real_numeric.columns:
-                    if col not in df_synthetic_numeric.columns:
-                        print(f"Skipping {col} - column not found in synthetic data")
-                        continue
-
-                    if df_real_numeric[col].isna().all() or df_synthetic_numeric[col].isna().all():
-                        print(f"Skipping {col} - empty column detected")
-                        continue
-
-                    data_real = df_real_numeric[col].dropna()
-                    data_synthetic = df_synthetic_numeric[col].dropna()
-                    ks_statistic = KSComplement.compute(real_data=data_real, synthetic_data=data_synthetic)
-                    print(f"{col} KS Statistic: {ks_statistic}", "Length Real: ", len(data_real),
-                          "Length Synthetic: ", len(data_synthetic))
-                    average_ks.append(ks_statistic)
-
-                average_tv = []
-                for col in df_real_categorical.columns:
-                    if col not in df_synthetic_categorical.columns:
-                        print(f"Skipping {col} - column not found in synthetic data")
-                        continue
-
-                    if df_real_categorical[col].isna().all() or df_synthetic_categorical[col].isna().all():
-                        print(f"Skipping {col} - empty column detected")
-                        continue
-
-                    data_real = df_real_categorical[col].dropna().astype(str)
-                    data_synthetic = df_synthetic_categorical[col].dropna().astype(str)
-                    tv_statistic = 1 - calc_hellinger(data_real, data_synthetic)
-                    print(f"{col} TV Statistic: {tv_statistic}", "Length Real: ", len(data_real),
-                          "Length Synthetic: ", len(data_synthetic))
-                    average_tv.append(tv_statistic)
-
-                average_ks_value = sum(average_ks) / len(average_ks) if average_ks else None
-                average_tv_value = sum(average_tv) / len(average_tv) if average_tv else None
-
-                if average_ks_value:
-                    print(f"Average KS Statistic: {average_ks_value}")
-                if average_tv_value:
-                    print(f"Average TV Statistic: {average_tv_value}")
-
-                results["average_ks"] = average_ks_value
-                results["average_tv"] = average_tv_value
-
-                if average_ks and average_tv:
-                    weighted_ks = sum(average_ks) / len(average_ks) * (
-                            len(average_ks) / (len(average_ks) + len(average_tv)))
-                    weighted_tv = sum(average_tv) / len(average_tv) * (
-                            len(average_tv) / (len(average_ks) + len(average_tv)))
-                    print(f"Combined Resemblance: {weighted_tv + weighted_ks}")
-                # endregion
-
-                # Reload original dataframes for event-based metrics
-                df_real = pm4py.convert_to_dataframe(real_event_log)
-                df_synthetic = pm4py.convert_to_dataframe(synthetic_event_log)
-
-                # Calculate TV Statistic for events
-                data_real = df_real["concept:name"].dropna()
-                data_synthetic = df_synthetic["concept:name"].dropna()
-                hellinger_distance_events = calc_hellinger(data_real, data_synthetic)
-                results["tv_statistic_event_distribution"] = (1 - hellinger_distance_events)
-                print("TV Statistic for Event Distribution: ", (1 - hellinger_distance_events))
-
-                # Calculate trace length distribution
-                trace_length_real = calculate_trace_length_distribution(real_event_log)
-                trace_length_synthetic = calculate_trace_length_distribution(synthetic_event_log)
-                hellinger_distance_trace = calc_hellinger(trace_length_real, trace_length_synthetic, input_type="distribution")
-                results["hellinger_distance_trace_length_distribution"] = (1 - hellinger_distance_trace)
-                print("Hellinger Distance for Trace Length Distribution: ", (1 - hellinger_distance_trace))
-
-                # Calculate throughput time distribution
-                throughput_time_real = calculate_throughput_time(real_event_log)
-                throughput_time_synthetic = calculate_throughput_time(synthetic_event_log)
-                ks_statistic = KSComplement.compute(real_data=throughput_time_real,
-                                                    synthetic_data=throughput_time_synthetic)
-                results["ks_statistic_throughput_time_distribution"] = ks_statistic
-                print("KS Statistic for Throughput Time Distribution: ", ks_statistic)
-
-                # Add results to df_result_array
-                df_result_array.append(results)
-
-# Save final results
-df_results = pd.DataFrame(df_result_array)
-
-# Calculate the average of the specified columns
+# Evaluation
+metric_workers = None  # Number of metrics computed in parallel per configuration, None splits the CPU cores
+metric_timeout = 600  # Seconds after which a metric is aborted
+write_synthetic_xes = True  # Save the synthetic logs as XES files, off the critical path of the sweep
+evaluation_mode = "exact"  # "bootstrap" estimates the distribution metrics on case subsamples of huge logs
+bootstrap_target_width = 0.05  # Width of the confidence intervals at which the bootstrap stops sampling
+
+# Columns of the results that are averaged into the score of a configuration
 columns_to_average = [
     'average_ks',
     'average_tv',
@@ -213,9 +48,167 @@ columns_to_average = [
     'ks_statistic_throughput_time_distribution'
 ]
 
-df_results['Average'] = df_results[columns_to_average].mean(axis=1)
 
-# Save to Excel
-timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-filename = f"evaluation_result_{event_log_name}_{timestamp}.xlsx"
-df_results.to_excel(filename, index=False)
\ No newline at end of file
+def evaluate_sample(event_log_sample, reference_profile, real_case_table=None):
+    """Compute the fidelity metrics of a sampled event log. Runs in the worker processes of the sweep.
+
+    :param event_log_sample: The sampled event log.
+    :type event_log_sample: pd.DataFrame
+    :param reference_profile: The reference profile of the real event log.
+    :type reference_profile: dict
+    :param real_case_table: The case table of the real event log for the bootstrap, or None to compute all metrics
+        exactly.
+    :type real_case_table: dict
+    :return: Dictionary with the metrics.
+    :rtype: dict
+    """
+    results = {}
+
+    # Compute the independent metrics in parallel, each one is aborted after metric_timeout seconds.
+    # The real event log is covered by the reference profile.
+    metric_jobs = fidelity_metric_jobs(reference_profile, event_log_sample)
+    if real_case_table is not None:
+        # The log distribution and attribute metrics are estimated on case subsamples with confidence intervals
+        for name in [*BOOTSTRAP_METRICS, "attribute_ks", "attribute_tv"]:
+            del metric_jobs[name]
+    max_workers = metric_workers or max(1, (os.cpu_count() or 1) // sweep_workers)
+    metric_results = run_metric_jobs(metric_jobs, max_workers=max_workers, timeout=metric_timeout)
+    results.update(metric_results)
+    if real_case_table is not None:
+        results.update(bootstrap_fidelity_metrics(
+            real_case_table, event_log_sample,
+            metrics={**BOOTSTRAP_METRICS, **attribute_metrics(reference_profile, event_log_sample)},
+            target_width=bootstrap_target_width
+        ))
+
+    # region Attribute Perspective Evaluation
+    average_ks = []
+    average_tv = []
+    for col in reference_profile["numeric_columns"]:
+        if results.get(f"{col}_ks") is not None:
+            print(f"{col} KS Statistic: {results[f'{col}_ks']}")
+            average_ks.append(results[f"{col}_ks"])
+    for col in reference_profile["categorical_columns"]:
+        if results.get(f"{col}_tv") is not None:
+            print(f"{col} TV Statistic: {results[f'{col}_tv']}")
+            average_tv.append(results[f"{col}_tv"])
+
+    average_ks_value = sum(average_ks) / len(average_ks) if average_ks else None
+    average_tv_value = sum(average_tv) / len(average_tv) if average_tv else None
+
+    if average_ks_value:
+        print(f"Average KS Statistic: {average_ks_value}")
+    if average_tv_value:
+        print(f"Average TV Statistic: {average_tv_value}")
+
+    results["average_ks"] = average_ks_value
+    results["average_tv"] = average_tv_value
+
+    if average_ks and average_tv:
+        weighted_ks = sum(average_ks) / len(average_ks) * (
+                len(average_ks) / (len(average_ks) + len(average_tv)))
+        weighted_tv = sum(average_tv) / len(average_tv) * (
+                len(average_tv) / (len(average_ks) + len(average_tv)))
+        print(f"Combined Resemblance: {weighted_tv + weighted_ks}")
+    # endregion
+
+    print("TV Statistic for Event Distribution: ", results["tv_statistic_event_distribution"])
+    print("Hellinger Distance for Trace Length Distribution: ",
+          results["hellinger_distance_trace_length_distribution"])
+    print("KS Statistic for Throughput Time Distribution: ",
+          results["ks_statistic_throughput_time_distribution"])
+
+    return results
+
+
+def score_results(results):
+    """Average the metrics of an evaluation into the score of the configuration, as in the 'Average' column.
+
+    :param results: The results of the evaluation.
+    :type results: dict
+    :return: The average of the available metrics, None if there is none.
+    :rtype: float
+    """
+    values = [results[column] for column in columns_to_average if results.get(column) is not None]
+
+    return sum(values) / len(values) if values else None
+
+
+# The sweep and metric worker processes import this file, so the experiment only runs when it is executed as script
+if __name__ == "__main__":
+    event_log_train = pm4py.read_xes(real_event_log_filename)
+
+    # Statistics of the real event log, computed once and stored next to the log for later runs
+    reference_profile = load_reference_profile(real_event_log_filename)
+
+    # Cases of the real event log for the subsamples of the bootstrap
+    real_case_table = case_table(event_log_train) if evaluation_mode == "bootstrap" else None
+
+    # One job per combination, combinations with the same preprocessing settings share one preprocessing pass
+    jobs = []
+    for method in method_array:
+        for units in units_per_layer_array:
+            for epsilon in epsilon_array:
+                # Create model name
+                if epsilon is None:
+                    epsilon_str = "inf"
+                else:
+                    epsilon_str = str(epsilon)
+
+                jobs.append(sweep_job(
+                    f"{method}_{event_log_name}_u={units}_e={epsilon_str}",
+                    {"method": method, "units": units, "epsilon": epsilon_str},
+                    {
+                        "embedding_output_dims": 128,
+                        "epochs": num_epochs,
+                        "batch_size": 128,
+                        "max_clusters": 10,
+                        "dropout": 0.0,
+                        "trace_quantile": 0.8,
+                        "epsilon": epsilon,
+                        "l2_norm_clip": 1.0,
+                        "method": method,
+                        "units_per_layer": [units],
+                    }
+                ))
+
+    evaluate = functools.partial(evaluate_sample, reference_profile=reference_profile, real_case_table=real_case_table)
+    synthetic_log_dir = "synthetic_logs" if write_synthetic_xes else None
+
+    if scheduler == "successive_halving":
+        # Train every combination for breakpoint_interval epochs, then only the best ones up to num_epochs
+        df_results = run_successive_halving(
+            event_log_train,
+            jobs,
+            score_results,
+            min_epochs=breakpoint_interval,
+            reduction_factor=halving_reduction_factor,
+            max_epochs=num_epochs,
+            sample_size=sample_size,
+            sample_batch_size=batch_size,
+            evaluate=evaluate,
+            max_workers=sweep_workers,
+            model_dir="models",
+            synthetic_log_dir=synthetic_log_dir,
+        )
+    else:
+        # Train, sample and evaluate the combinations in parallel, saving the model at every breakpoint
+        df_results = run_sweep(
+            event_log_train,
+            jobs,
+            breakpoint_interval,
+            sample_size,
+            batch_size,
+            evaluate=evaluate,
+            max_workers=sweep_workers,
+            model_dir="models",
+            synthetic_log_dir=synthetic_log_dir,
+        )
+
+    # Calculate the average of the specified columns, metrics that failed for every configuration are missing
+    df_results['Average'] = df_results.reindex(columns=columns_to_average).mean(axis=1)
+
+    # Save to Excel
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f"evaluation_result_{event_log_name}_{timestamp}.xlsx"
+    df_results.to_excel(filename, index=False)
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+
+def _column_values(data, column):
+    """Return the non-missing values of a column as array.
+
+    :param data: The data, a DataFrame or a dictionary of columns.
+    :type data: pd.DataFrame or dict
+    :param column: The column name.
+    :type column: str
+    :return: The non-missing values of the column.
+    :rtype: np.ndarray
+    """
+    values = data[column] if isinstance(data[column], pd.Series) else pd.Series(data[column], dtype=object)
+    return values[values.notna()].to_numpy()
+
+
+def encode_categorical_columns(real_data, synthetic_data, columns):
+    """Encode the values of several categorical columns of a real and a synthetic data set with one shared
+    vocabulary. Every (column, value) pair gets its own code, values are compared as strings.
+
+    :param real_data: The real data, a DataFrame or a dictionary of columns.
+    :type real_data: pd.DataFrame or dict
+    :param synthetic_data: The synthetic data, a DataFrame or a dictionary of columns.
+    :type synthetic_data: pd.DataFrame or dict
+    :param columns: The columns to encode.
+    :type columns: list
+    :return: The codes of the real and of the synthetic values, and the column index of every code.
+    :rtype: tuple
+    """
+    real_codes = []
+    synthetic_codes = []
+    code_columns = []
+    offset = 0
+    for column_index, column in enumerate(columns):
+        real_values = _column_values(real_data, column)
+        synthetic_values = _column_values(synthetic_data, column)
+        # Only the distinct values are converted to strings, values with the same string share a code
+        raw_codes, raw_values = pd.factorize(np.concatenate([real_values, synthetic_values]))
+        string_codes, vocabulary = pd.factorize(np.asarray(raw_values).astype(str))
+        codes = string_codes[raw_codes]
+
+        real_codes.append(codes[:len(real_values)] + offset)
+        synthetic_codes.append(codes[len(real_values):] + offset)
+        code_columns.append(np.full(len(vocabulary), column_index))
+        offset += len(vocabulary)
+
+    return (
+        np.concatenate(real_codes + [np.empty(0, dtype=np.intp)]),
+        np.concatenate(synthetic_codes + [np.empty(0, dtype=np.intp)]),
+        np.concatenate(code_columns + [np.empty(0, dtype=np.intp)])
+    )
+
+
+def categorical_distances(real_data, synthetic_data, columns=None):
+    """Calculate the Hellinger distance and the total variation distance between the value distributions of every
+    categorical column of a real and a synthetic data set. All columns are encoded with one shared vocabulary and
+    counted with a single bincount, so no per-column alignment of value counts is needed.
+
+    :param real_data: The real data, a DataFrame or a dictionary of columns.
+    :type real_data: pd.DataFrame or dict
+    :param synthetic_data: The synthetic data, a DataFrame or a dictionary of columns.
+    :type synthetic_data: pd.DataFrame or dict
+    :param columns: The columns to compare. Default is None, which compares the columns of the real data that are
+        also in the synthetic data.
+    :type columns: list
+    :return: The 'hellinger' and 'total_variation' distances indexed by column. Columns without values on either
+        side are NaN.
+    :rtype: pd.DataFrame
+    """
+    if columns is None:
+        columns = [column for column in real_data.keys() if column in synthetic_data.keys()]
+    columns = list(columns)
+
+    real_codes, synthetic_codes, code_columns = encode_categorical_columns(real_data, synthetic_data, columns)
+    num_codes = len(code_columns)
+    real_counts = np.bincount(real_codes, minlength=num_codes)
+    synthetic_counts = np.bincount(synthetic_codes, minlength=num_codes)
+
+    real_totals = np.bincount(code_columns, real_counts, len(columns))
+    synthetic_totals = np.bincount(code_columns, synthetic_counts, len(columns))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        real_probabilities = real_counts / real_totals[code_columns]
+        synthetic_probabilities = synthetic_counts / synthetic_totals[code_columns]
+
+    squared_differences = (np.sqrt(real_probabilities) - np.sqrt(synthetic_probabilities)) ** 2
+    absolute_differences = np.abs(real_probabilities - synthetic_probabilities)
+
+    distances = pd.DataFrame(
+        {
+            "hellinger": np.sqrt(np.bincount(code_columns, squared_differences, len(columns)) / 2),
+            "total_variation": np.bincount(code_columns, absolute_differences, len(columns)) / 2,
+        },
+        index=pd.Index(columns, dtype=object)
+    )
+    distances[(real_totals == 0) | (synthetic_totals == 0)] = np.nan
+
+    return distances
+
+
+def ks_statistic(real_values, synthetic_values):
+    """Calculate the two-sample Kolmogorov-Smirnov statistic from the sorted samples. The empirical distribution
+    functions are evaluated at every sample value by binary search, ties are handled by searching to the right.
+
+    :param real_values: The real values.
+    :type real_values: np.ndarray
+    :param synthetic_values: The synthetic values.
+    :type synthetic_values: np.ndarray
+    :return: The largest absolute difference of the empirical distribution functions.
+    :rtype: float
+    """
+    real_values = np.sort(real_values)
+    synthetic_values = np.sort(synthetic_values)
+
+    differences = [
+        np.searchsorted(real_values, values, side="right") / len(real_values)
+        - np.searchsorted(synthetic_values, values, side="right") / len(synthetic_values)
+        for values in (real_values, synthetic_values)
+    ]
+
+    return float(max(np.abs(differences[0]).max(), np.abs(differences[1]).max()))
+
+
+def ks_statistics(real_data, synthetic_data, columns=None):
+    """Calculate the two-sample Kolmogorov-Smirnov statistic of every numeric column of a real and a synthetic data
+    set. Every sample is sorted once and compared by binary search, which gives the statistic of
+    scipy.stats.ks_2samp without computing p-values.
+
+    :param real_data: The real data, a DataFrame or a dictionary of columns.
+    :type real_data: pd.DataFrame or dict
+    :param synthetic_data: The synthetic data, a DataFrame or a dictionary of columns.
+    :type synthetic_data: pd.DataFrame or dict
+    :param columns: The columns to compare. Default is None, which compares the columns of the real data that are
+        also in the synthetic data.
+    :type columns: list
+    :return: The Kolmogorov-Smirnov statistic indexed by column. Columns without values on either side are NaN.
+    :rtype: pd.Series
+    """
+    if columns is None:
+        columns = [column for column in real_data.keys() if column in synthetic_data.keys()]
+    columns = list(columns)
+
+    statistics = np.full(len(columns), np.nan)
+    for column_index, column in enumerate(columns):
+        real_values = _column_values(real_data, column).astype(float)
+        synthetic_values = _column_values(synthetic_data, column).astype(float)
+        if len(real_values) > 0 and len(synthetic_values) > 0:
+            statistics[column_index] = ks_statistic(real_values, synthetic_values)
+
+    return pd.Series(statistics, index=pd.Index(columns, dtype=object))
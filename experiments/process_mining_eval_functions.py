@@ -1,21 +1,60 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pm4py
 import pandas as pd
+from scipy import sparse
+from scipy.optimize import linprog
+try:
+    from pyemd import emd
+except ImportError:
+    emd = None
 from pm4py.statistics.variants.log import get as variants_module
-from pm4py.algo.evaluation.earth_mover_distance import algorithm as emd_evaluator
 from pm4py.algo.evaluation.generalization import algorithm as generalization_evaluator
 from pm4py.algo.evaluation.simplicity import algorithm as simplicity_evaluator
+from PALSYN.postprocessing.log_postprocessing import normalize_na_values
+
+
+def to_dataframe(log):
+    """Return an event log as DataFrame. Sampled DataFrames are used directly, their NA strings are replaced with
+    missing values as if the log had been written to XES, cleaned and read back.
+
+    :param log: The event log.
+    :type log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :returns: The event log as DataFrame.
+    :rtype: pd.DataFrame
+    """
+    if isinstance(log, pd.DataFrame):
+        return normalize_na_values(log)
+
+    return pm4py.convert_to_dataframe(log)
+
+
+def to_event_log(log):
+    """Return an event log as PM4Py event log. Sampled DataFrames are converted in memory, their NA strings are
+    replaced with missing values as if the log had been written to XES, cleaned and read back.
+
+    :param log: The event log.
+    :type log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :returns: The PM4Py event log.
+    :rtype: pm4py.objects.log.log.EventLog
+    """
+    if isinstance(log, pd.DataFrame):
+        return pm4py.convert_to_event_log(normalize_na_values(log))
+
+    return log
 
 
 def event_distribution(log):
     """Return the count of each event type in a PM4Py event log as a pandas Series.
 
     :param log: The PM4Py event log.
-    :type log: pm4py.objects.log.log.EventLog
+    :type log: pm4py.objects.log.log.EventLog or pd.DataFrame
     :returns: The count of each event type in the event log.
     :rtype: pd.Series
     """
-    df = pm4py.convert_to_dataframe(log)
+    df = to_dataframe(log)
     count_data = df['concept:name'].value_counts()
 
     return count_data
@@ -25,11 +64,11 @@ def calculate_trace_length_distribution(log):
     """Return the count of each trace length in a PM4Py event log as a pandas Series.
 
     :param log: The PM4Py event log.
-    :type log: pm4py.objects.log.log.EventLog
+    :type log: pm4py.objects.log.log.EventLog or pd.DataFrame
     :returns: The count of each trace length in the event log.
     :rtype: pd.Series
     """
-    df = pm4py.convert_to_dataframe(log)
+    df = to_dataframe(log)
     count_data = df['case:concept:name'].value_counts()
     # Get the count of each trace length
     count_data = count_data.value_counts()
@@ -62,19 +101,17 @@ def calc_hellinger(real_data, synthetic_data, input_type = "column"):
         dist1 = real_data
         dist2 = synthetic_data
 
-    # Align distributions
-    all_indices = sorted(set(dist1.index) | set(dist2.index))
-    dist1_aligned = pd.Series(0, index=all_indices)
-    dist2_aligned = pd.Series(0, index=all_indices)
-
-    dist1_aligned[dist1.index] = dist1
-    dist2_aligned[dist2.index] = dist2
+    # Align distributions by encoding the values of both with one vocabulary
+    codes, values = pd.factorize(np.concatenate([dist1.index.to_numpy(dtype=object),
+                                                 dist2.index.to_numpy(dtype=object)]))
+    counts1 = np.bincount(codes[:len(dist1)], weights=dist1.to_numpy(dtype=float), minlength=len(values))
+    counts2 = np.bincount(codes[len(dist1):], weights=dist2.to_numpy(dtype=float), minlength=len(values))
 
     # Convert to probabilities
-    p1 = dist1_aligned / dist1_aligned.sum()
-    p2 = dist2_aligned / dist2_aligned.sum()
+    p1 = counts1 / counts1.sum()
+    p2 = counts2 / counts2.sum()
 
-    return np.sqrt(np.sum((np.sqrt(p1.values) - np.sqrt(p2.values)) ** 2)) / np.sqrt(2)
+    return np.sqrt(np.sum((np.sqrt(p1) - np.sqrt(p2)) ** 2)) / np.sqrt(2)
 
 
 def calculate_throughput_time(log):
@@ -82,12 +119,12 @@ def calculate_throughput_time(log):
     first and the last event of a trace.
 
     :param log: The PM4Py event log.
-    :type log: pm4py.objects.log.log.EventLog
+    :type log: pm4py.objects.log.log.EventLog or pd.DataFrame
     :returns: The throughput time of the event log.
     :rtype: float
     """
     # Remove all timestamps that are NaN
-    df = pm4py.convert_to_dataframe(log)
+    df = to_dataframe(log)
     df = df.dropna(subset=['time:timestamp'])
     # Transform df back to log
     log = pm4py.convert_to_event_log(df)
@@ -111,33 +148,416 @@ def calculate_fitness(alignments):
     return fitness
 
 
-def calculate_earth_mover_distance(real_log, synthetic_log):
+def calculate_earth_mover_distance(real_log, synthetic_log, real_language=None):
     """Calculate the earth mover distance between two event logs. The earth mover distance is defined as the
-    minimum cost of turning one distribution into the other.
+    minimum cost of turning one distribution into the other. The exact distance is computed by PM4Py, which
+    requires pyemd; `calculate_approximate_earth_mover_distance` works without it.
 
     :param real_log: The real event log.
-    :type real_log: pm4py.objects.log.log.EventLog
+    :type real_log: pm4py.objects.log.log.EventLog or pd.DataFrame
     :param synthetic_log: The synthetic event log.
-    :type synthetic_log: pm4py.objects.log.log.EventLog
+    :type synthetic_log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :param real_language: The variant frequencies of the real event log, e.g. from a reference profile. Default is
+        None, which computes them from the real event log.
+    :type real_language: dict
     :return: The earth mover distance between the two event logs.
     :rtype: float
     """
-    real_language = variants_module.get_language(real_log)
-    synthetic_language = variants_module.get_language(synthetic_log)
+    # PM4Py's earth mover distance imports pyemd, so it is only imported when the exact distance is computed
+    from pm4py.algo.evaluation.earth_mover_distance import algorithm as emd_evaluator
+
+    if real_language is None:
+        real_language = variants_module.get_language(to_event_log(real_log))
+    synthetic_language = variants_module.get_language(to_event_log(synthetic_log))
     earth_mover_distance = emd_evaluator.apply(synthetic_language, real_language)
 
     return earth_mover_distance
 
 
+def truncate_language(language, top_k):
+    """Keep the top_k most frequent variants of a language and renormalize their probabilities. The probability mass
+    of the dropped variants is the tail mass.
+
+    :param language: The variant probabilities of an event log, as returned by get_language.
+    :type language: dict
+    :param top_k: The number of variants to keep, None to keep all variants.
+    :type top_k: int
+    :return: The truncated language and its tail mass.
+    :rtype: tuple
+    """
+    total_mass = sum(language.values())
+    if top_k is None or len(language) <= top_k:
+        return {variant: probability / total_mass for variant, probability in language.items()}, 0.0
+
+    variants = sorted(language.items(), key=lambda item: item[1], reverse=True)[:top_k]
+    kept_mass = sum(probability for _, probability in variants)
+
+    return {variant: probability / kept_mass for variant, probability in variants}, 1 - kept_mass / total_mass
+
+
+def encode_variants(variants, activity_codes):
+    """Encode variants as rows of activity codes, padded with -1.
+
+    :param variants: The variants as tuples of activities.
+    :type variants: list
+    :param activity_codes: The code of every activity.
+    :type activity_codes: dict
+    :return: The padded activity codes and the length of every variant.
+    :rtype: tuple
+    """
+    lengths = np.array([len(variant) for variant in variants], dtype=np.int32)
+    codes = np.full((len(variants), max(lengths.max(initial=0), 1)), -1, dtype=np.int32)
+    for row, variant in enumerate(variants):
+        codes[row, :len(variant)] = [activity_codes[activity] for activity in variant]
+
+    return codes, lengths
+
+
+def banded_levenshtein(codes_a, lengths_a, codes_b, lengths_b, max_edits):
+    """Calculate the Levenshtein distances of many pairs of encoded variants at once. The dynamic program runs over
+    the rows of all pairs together and only fills the cells within max_edits of the diagonal, so distances above
+    max_edits are not computed exactly but reported as max_edits + 1.
+
+    :param codes_a: The padded activity codes of the first variant of every pair.
+    :type codes_a: np.ndarray
+    :param lengths_a: The length of the first variant of every pair.
+    :type lengths_a: np.ndarray
+    :param codes_b: The padded activity codes of the second variant of every pair.
+    :type codes_b: np.ndarray
+    :param lengths_b: The length of the second variant of every pair.
+    :type lengths_b: np.ndarray
+    :param max_edits: The band width, None for exact distances.
+    :type max_edits: int
+    :return: The Levenshtein distance of every pair, capped at max_edits + 1.
+    :rtype: np.ndarray
+    """
+    num_pairs, width_a = codes_a.shape
+    width_b = codes_b.shape[1]
+    band = max(width_a, width_b) if max_edits is None else max_edits
+    outside = band + 1
+    # Distances are bounded by the variant lengths, so short variants fit into 16 bits and need less memory traffic
+    dtype = np.int16 if max(width_a, width_b) < 2 ** 14 else np.int32
+    columns = np.arange(width_b + 1, dtype=dtype)[:, None]
+    # The table is stored column by column over all pairs, so every operation runs over contiguous pairs
+    codes_a = np.ascontiguousarray(codes_a.T)
+    codes_b = np.ascontiguousarray(codes_b.T)
+    pair_index = np.arange(num_pairs)
+
+    previous = np.repeat(np.minimum(columns, outside), num_pairs, axis=1)
+    distances = lengths_b.astype(dtype)
+    for i in range(1, width_a + 1):
+        # Only the columns within the band are computed, the others are outside the band
+        low, high = max(0, i - band), min(width_b, i + band)
+        first = max(low, 1)
+        window = np.empty((high - low + 1, num_pairs), dtype=dtype)
+        if low == 0:
+            window[0] = min(i, outside)
+        mismatch = codes_a[i - 1] != codes_b[first - 1:high]
+        np.minimum(previous[first:high + 1] + 1, previous[first - 1:high] + mismatch, out=window[first - low:])
+        for column in range(1, high - low + 1):
+            np.minimum(window[column], window[column - 1] + 1, out=window[column])
+        current = np.full((width_b + 1, num_pairs), outside, dtype=dtype)
+        current[low:high + 1] = np.minimum(window, outside)
+
+        finished = np.flatnonzero(lengths_a == i)
+        distances[finished] = current[lengths_b[finished], pair_index[finished]]
+        previous = current
+
+        # Early cutoff: once every pair is beyond the band, the remaining rows cannot bring one back
+        if max_edits is not None and (current.min(axis=0) >= outside).all():
+            distances[lengths_a > i] = outside
+            break
+
+    return np.minimum(distances, outside)
+
+
+def variant_distance_matrix(variants_a, variants_b, max_edits=None, n_jobs=None, block_size=64):
+    """Calculate the normalized Levenshtein distances between two lists of variants, as used by the earth mover
+    distance of pm4py. Blocks of rows are computed in parallel threads. With max_edits, distances above max_edits
+    edits are set to 1, which overestimates them by at most the returned saturation error.
+
+    :param variants_a: The first variants as tuples of activities.
+    :type variants_a: list
+    :param variants_b: The second variants as tuples of activities.
+    :type variants_b: list
+    :param max_edits: The maximum number of edits computed exactly, None for exact distances.
+    :type max_edits: int
+    :param n_jobs: The number of threads. Default is the number of CPU cores.
+    :type n_jobs: int
+    :param block_size: The number of rows computed together.
+    :type block_size: int
+    :return: The distance matrix and the saturation error.
+    :rtype: tuple
+    """
+    activities = sorted(set(activity for variant in variants_a + variants_b for activity in variant))
+    activity_codes = {activity: code for code, activity in enumerate(activities)}
+    codes_a, lengths_a = encode_variants(variants_a, activity_codes)
+    codes_b, lengths_b = encode_variants(variants_b, activity_codes)
+
+    # Rows of similar length share a block, so the dynamic program of a block stops at its longest variant
+    order = np.argsort(lengths_a, kind="stable")
+    distances = np.empty((len(variants_a), len(variants_b)), dtype=np.int32)
+
+    def compute_block(rows):
+        width = max(lengths_a[rows].max(initial=0), 1)
+        block = banded_levenshtein(
+            np.repeat(codes_a[rows, :width], len(variants_b), axis=0),
+            np.repeat(lengths_a[rows], len(variants_b)),
+            np.tile(codes_b, (len(rows), 1)),
+            np.tile(lengths_b, len(rows)),
+            max_edits
+        )
+        distances[rows] = block.reshape(len(rows), len(variants_b))
+
+    blocks = [order[start:start + block_size] for start in range(0, len(order), block_size)]
+    with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count() or 1) as executor:
+        list(executor.map(compute_block, blocks))
+
+    max_lengths = np.maximum.outer(lengths_a, lengths_b)
+    distance_matrix = distances / np.maximum(max_lengths, 1)
+    saturation_error = 0.0
+    if max_edits is not None:
+        saturated = distances > max_edits
+        if saturated.any():
+            # The true distance of a saturated pair lies between (max_edits + 1) / length and 1
+            saturation_error = float((1 - (max_edits + 1) / max_lengths[saturated]).max(initial=0.0))
+            distance_matrix[saturated] = 1.0
+
+    return distance_matrix, saturation_error
+
+
+def solve_transport(distance_matrix, weights_a, weights_b):
+    """Solve the optimal transport problem between two distributions, i.e. the earth mover distance for a given
+    ground distance. The network simplex of pyemd is used if it is installed, otherwise a linear program.
+
+    :param distance_matrix: The ground distances between the support points of the distributions.
+    :type distance_matrix: np.ndarray
+    :param weights_a: The probabilities of the first distribution.
+    :type weights_a: np.ndarray
+    :param weights_b: The probabilities of the second distribution.
+    :type weights_b: np.ndarray
+    :return: The minimal transport cost.
+    :rtype: float
+    """
+    num_a, num_b = distance_matrix.shape
+    if emd is not None:
+        # pyemd expects both histograms on a common support, mass only moves from the first to the second part
+        costs = np.ones((num_a + num_b, num_a + num_b))
+        np.fill_diagonal(costs, 0.0)
+        costs[:num_a, num_a:] = distance_matrix
+        costs[num_a:, :num_a] = distance_matrix.T
+        return float(emd(
+            np.concatenate([weights_a, np.zeros(num_b)]), np.concatenate([np.zeros(num_a), weights_b]), costs
+        ))
+
+    row_sums = sparse.kron(sparse.identity(num_a, format="csr"), np.ones((1, num_b)), format="csr")
+    column_sums = sparse.kron(np.ones((1, num_a)), sparse.identity(num_b, format="csr"), format="csr")
+    result = linprog(
+        distance_matrix.ravel(),
+        A_eq=sparse.vstack([row_sums, column_sums], format="csr"),
+        b_eq=np.concatenate([weights_a, weights_b]),
+        bounds=(0, None),
+        method="highs"
+    )
+    if not result.success:
+        raise RuntimeError(f"Earth mover distance could not be computed: {result.message}")
+
+    return float(result.fun)
+
+
+def tail_length_masses(language, kept_variants):
+    """Sum the probabilities of the variants outside kept_variants per variant length.
+
+    :param language: The variant probabilities of an event log.
+    :type language: dict
+    :param kept_variants: The variants that are compared explicitly.
+    :type kept_variants: set
+    :return: The tail mass of every variant length.
+    :rtype: dict
+    """
+    length_masses = {}
+    for variant, probability in language.items():
+        if variant not in kept_variants:
+            length_masses[len(variant)] = length_masses.get(len(variant), 0.0) + probability
+
+    return length_masses
+
+
+def length_distance_bound(lengths_a, lengths_b, distinct):
+    """Calculate a lower bound of the normalized Levenshtein distance between variants of the given lengths. The
+    lengths differ by at least |length_a - length_b| edits and distinct variants by at least one edit.
+
+    :param lengths_a: The lengths of the first variants.
+    :type lengths_a: np.ndarray
+    :param lengths_b: The lengths of the second variants.
+    :type lengths_b: np.ndarray
+    :param distinct: Whether each pair of variants is known to differ.
+    :type distinct: np.ndarray
+    :return: The lower bound of the distance of every pair.
+    :rtype: np.ndarray
+    """
+    edits = np.abs(np.subtract.outer(lengths_a, lengths_b))
+    edits = np.where(distinct, np.maximum(edits, 1), edits)
+
+    return edits / np.maximum(np.maximum.outer(lengths_a, lengths_b), 1)
+
+
+def truncation_bounds(real_full, synthetic_full, real_variants, synthetic_variants, distance_matrix, max_edits):
+    """Bound the exact earth mover distance using the distances between the kept variants only. The lower bound
+    aggregates the tail variants of each log by length and moves their mass at the smallest distance a variant of that
+    length can have, i.e. zero to an identical variant and the length difference otherwise. Saturated distances count
+    with their lower limit. The upper bound matches identical variants outside the compared pairs at no cost and moves
+    all other tail mass at the maximal distance of 1.
+
+    :param real_full: The variant probabilities of the real event log, before truncation.
+    :type real_full: dict
+    :param synthetic_full: The variant probabilities of the synthetic event log, before truncation.
+    :type synthetic_full: dict
+    :param real_variants: The kept variants of the real event log.
+    :type real_variants: list
+    :param synthetic_variants: The kept variants of the synthetic event log.
+    :type synthetic_variants: list
+    :param distance_matrix: The distances between the kept variants, saturated distances set to 1.
+    :type distance_matrix: np.ndarray
+    :param max_edits: The maximum number of edits computed exactly, None for exact distances.
+    :type max_edits: int
+    :return: The lower and the upper bound of the exact earth mover distance.
+    :rtype: tuple
+    """
+    real_total = sum(real_full.values())
+    synthetic_total = sum(synthetic_full.values())
+    real_full = {variant: probability / real_total for variant, probability in real_full.items()}
+    synthetic_full = {variant: probability / synthetic_total for variant, probability in synthetic_full.items()}
+    real_kept, synthetic_kept = set(real_variants), set(synthetic_variants)
+    real_weights = np.array([real_full[variant] for variant in real_variants])
+    synthetic_weights = np.array([synthetic_full[variant] for variant in synthetic_variants])
+    real_lengths = np.array([len(variant) for variant in real_variants])
+    synthetic_lengths = np.array([len(variant) for variant in synthetic_variants])
+
+    lower_matrix = distance_matrix
+    if max_edits is not None:
+        # A distance of 1 is either exact or saturated, the true distance of a saturated pair is at least this
+        max_lengths = np.maximum(np.maximum.outer(real_lengths, synthetic_lengths), 1)
+        saturation_floor = np.minimum((max_edits + 1) / max_lengths, 1.0)
+        lower_matrix = np.where(distance_matrix == 1.0, saturation_floor, distance_matrix)
+
+    real_tail = tail_length_masses(real_full, real_kept)
+    synthetic_tail = tail_length_masses(synthetic_full, synthetic_kept)
+    real_tail_lengths = np.array(sorted(real_tail), dtype=int)
+    synthetic_tail_lengths = np.array(sorted(synthetic_tail), dtype=int)
+
+    # A tail variant differs from the kept variants of its own log, and from a kept variant of the other log unless
+    # that variant is also in its tail
+    real_tail_matches = np.array([
+        variant in real_full and variant not in real_kept and len(variant) == length
+        for length in real_tail_lengths for variant in synthetic_variants
+    ], dtype=bool).reshape(len(real_tail_lengths), len(synthetic_variants))
+    synthetic_tail_matches = np.array([
+        variant in synthetic_full and variant not in synthetic_kept and len(variant) == length
+        for variant in real_variants for length in synthetic_tail_lengths
+    ], dtype=bool).reshape(len(real_variants), len(synthetic_tail_lengths))
+    lower_costs = np.block([
+        [lower_matrix, length_distance_bound(real_lengths, synthetic_tail_lengths, ~synthetic_tail_matches)],
+        [length_distance_bound(real_tail_lengths, synthetic_lengths, ~real_tail_matches),
+         length_distance_bound(real_tail_lengths, synthetic_tail_lengths,
+                               np.zeros((len(real_tail_lengths), len(synthetic_tail_lengths)), dtype=bool))]
+    ])
+    lower_bound = solve_transport(
+        lower_costs,
+        np.concatenate([real_weights, [real_tail[length] for length in real_tail_lengths]]),
+        np.concatenate([synthetic_weights, [synthetic_tail[length] for length in synthetic_tail_lengths]])
+    )
+
+    if not real_tail and not synthetic_tail:
+        # Without tails the saturated distances of 1 are upper limits, so the approximation is the upper bound
+        return lower_bound, solve_transport(distance_matrix, real_weights, synthetic_weights)
+
+    # The upper bound is the cost of a feasible transport plan: identical variants of which at least one is in a tail
+    # are matched first, the remaining mass is transported with the kept distances and a cost of 1 for tail mass
+    real_remaining = dict(real_full)
+    synthetic_remaining = dict(synthetic_full)
+    for variant in real_remaining.keys() & synthetic_remaining.keys():
+        if variant not in real_kept or variant not in synthetic_kept:
+            matched = min(real_remaining[variant], synthetic_remaining[variant])
+            real_remaining[variant] -= matched
+            synthetic_remaining[variant] -= matched
+    real_tail_mass = sum(real_remaining[variant] for variant in real_remaining if variant not in real_kept)
+    synthetic_tail_mass = sum(synthetic_remaining[variant] for variant in synthetic_remaining
+                              if variant not in synthetic_kept)
+    upper_costs = np.ones((len(real_variants) + 1, len(synthetic_variants) + 1))
+    upper_costs[:-1, :-1] = distance_matrix
+    upper_bound = solve_transport(
+        upper_costs,
+        np.append([real_remaining[variant] for variant in real_variants], real_tail_mass),
+        np.append([synthetic_remaining[variant] for variant in synthetic_variants], synthetic_tail_mass)
+    )
+
+    return lower_bound, upper_bound
+
+
+def calculate_approximate_earth_mover_distance(real_log, synthetic_log, top_k=1000, max_edits=None, n_jobs=None,
+                                               real_language=None):
+    """Approximate the earth mover distance between two event logs for logs with many variants. Only the top_k most
+    frequent variants of each log are compared, distances above max_edits edits are not computed exactly, and the
+    distance matrix is computed in parallel. The result differs from the exact earth mover distance by at most the
+    returned error bound, which is derived from a lower and an upper bound of the exact distance that only need the
+    distances between the compared variants (see `truncation_bounds`).
+
+    :param real_log: The real event log. May be None if real_language is given.
+    :type real_log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :param synthetic_log: The synthetic event log.
+    :type synthetic_log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :param top_k: The number of most frequent variants compared per log, None to compare all variants.
+    :type top_k: int
+    :param max_edits: The maximum number of edits computed exactly, None for exact distances.
+    :type max_edits: int
+    :param n_jobs: The number of threads computing the distance matrix. Default is the number of CPU cores.
+    :type n_jobs: int
+    :param real_language: The variant frequencies of the real event log, e.g. from a reference profile. Default is
+        None, which computes them from the real event log.
+    :type real_language: dict
+    :return: The approximate earth mover distance and its error bound.
+    :rtype: tuple
+    """
+    if real_language is None:
+        real_language = variants_module.get_language(to_event_log(real_log))
+    synthetic_full = variants_module.get_language(to_event_log(synthetic_log))
+
+    real_truncated, real_tail_mass = truncate_language(real_language, top_k)
+    synthetic_truncated, synthetic_tail_mass = truncate_language(synthetic_full, top_k)
+
+    real_variants = list(real_truncated)
+    synthetic_variants = list(synthetic_truncated)
+    distance_matrix, saturation_error = variant_distance_matrix(
+        real_variants, synthetic_variants, max_edits=max_edits, n_jobs=n_jobs
+    )
+    earth_mover_distance = solve_transport(
+        distance_matrix,
+        np.array([real_truncated[variant] for variant in real_variants]),
+        np.array([synthetic_truncated[variant] for variant in synthetic_variants])
+    )
+    if real_tail_mass == 0 and synthetic_tail_mass == 0 and saturation_error == 0:
+        return earth_mover_distance, 0.0
+
+    lower_bound, upper_bound = truncation_bounds(
+        real_language, synthetic_full, real_variants, synthetic_variants, distance_matrix, max_edits
+    )
+    # Both the exact and the approximate distance lie between 0 and 1
+    error_bound = max(earth_mover_distance - lower_bound, upper_bound - earth_mover_distance, 0.0)
+
+    return earth_mover_distance, min(error_bound, 1.0)
+
+
 def calculate_petri_nets(log, threshold):
     """Discover Petri nets using inductive and heuristic mining algorithms.
 
     :param threshold:
     :param log: A process event log.
-    :type log: pm4py.objects.log.log.EventLog
+    :type log: pm4py.objects.log.log.EventLog or pd.DataFrame
     :return: A dictionary containing the discovered Petri nets, initial markings, and final markings.
     :rtype: dict
     """
+    log = to_event_log(log)
     net_inductive, initial_marking_inductive, final_marking_inductive = pm4py.discover_petri_net_inductive(log)
     net_heuristics, initial_marking_heuristics, final_marking_heuristics = \
         pm4py.discover_petri_net_heuristics(log, dependency_threshold=threshold)
@@ -150,48 +570,134 @@ def calculate_petri_nets(log, threshold):
     return petri_net_dict
 
 
-def compare_logs(real_event_log, synthetic_event_log, threshold):
-    """Compare the fitness of a real event Log with a synthetic event log. In this case the Petri Nets discovered
-    from the real even log are used to calculate the alignments of the synthetic event log.
+def calculate_conformance(log, petri_net, fitness=True):
+    """Calculate fitness, precision and generalization of an event log on a Petri net.
 
-    :param real_event_log: The real event log.
-    :type real_event_log: pm4py.objects.log.log.EventLog
-    :param synthetic_event_log: The synthetic event log.
-    :type synthetic_event_log: pm4py.objects.log.log.EventLog
+    :param log: The event log.
+    :type log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :param petri_net: The Petri net with its initial and final marking.
+    :type petri_net: list
+    :param fitness: Whether to align the log for the fitness. Default is True, False returns None as fitness.
+    :type fitness: bool
+    :return: The fitness, precision and generalization of the event log.
+    :rtype: tuple
+    """
+    log = to_event_log(log)
+    if fitness:
+        alignments = pm4py.conformance_diagnostics_alignments(log, petri_net[0], petri_net[1], petri_net[2])
+        fitness = calculate_fitness(alignments)
+    else:
+        fitness = None
+    prec = pm4py.precision_alignments(log, petri_net[0], petri_net[1], petri_net[2])
+    gen = generalization_evaluator.apply(log, petri_net[0], petri_net[1], petri_net[2])
+
+    return fitness, prec, gen
+
+
+def calculate_simplicity(log, threshold, prefix):
+    """Calculate the simplicity of the Petri nets discovered from an event log.
+
+    :param log: The event log.
+    :type log: pm4py.objects.log.log.EventLog or pd.DataFrame
     :param threshold: The threshold for the heuristic mining algorithm.
     :type threshold: float
-    :return: Dictionary containing results for both real and synthetic data with prefixed keys
+    :param prefix: The prefix of the result keys.
+    :type prefix: str
+    :return: Dictionary containing the simplicity of every discovered Petri net with prefixed keys
+    :rtype: dict
     """
-    petri_net_dict = calculate_petri_nets(real_event_log, threshold)
-    petri_net_dict_synth = calculate_petri_nets(synthetic_event_log, threshold)
+    log = to_event_log(log)
+    petri_net_dict = calculate_petri_nets(log, threshold)
+
+    return {
+        f"{prefix}_{key}_Simplicity": simplicity_evaluator.apply(petri_net[0])
+        for key, petri_net in petri_net_dict.items()
+    }
+
+
+def evaluate_petri_nets(log, petri_net_dict, prefix, simplicity_net_dict=None, fitness=True):
+    """Calculate fitness, precision, generalization and simplicity of an event log on the given Petri nets.
+
+    :param log: The event log.
+    :type log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :param petri_net_dict: The Petri nets with initial and final markings, as returned by calculate_petri_nets.
+    :type petri_net_dict: dict
+    :param prefix: The prefix of the result keys.
+    :type prefix: str
+    :param simplicity_net_dict: The Petri nets to calculate the simplicity of. Default is None, which uses the
+        Petri nets in petri_net_dict.
+    :type simplicity_net_dict: dict
+    :param fitness: Whether to calculate the fitness. Default is True.
+    :type fitness: bool
+    :return: Dictionary containing the metrics with prefixed keys
+    :rtype: dict
+    """
+    log = to_event_log(log)
+    if simplicity_net_dict is None:
+        simplicity_net_dict = petri_net_dict
 
     results = {}
-
-    # Calculate metrics for real event log
     for key, petri_net in petri_net_dict.items():
-        alignments = pm4py.conformance_diagnostics_alignments(real_event_log, petri_net[0], petri_net[1], petri_net[2])
-        prec = pm4py.precision_alignments(real_event_log, petri_net[0], petri_net[1], petri_net[2])
-        gen = generalization_evaluator.apply(real_event_log, petri_net[0], petri_net[1], petri_net[2])
-        fitness = calculate_fitness(alignments)
-        simp = simplicity_evaluator.apply(petri_net[0])
+        net_fitness, prec, gen = calculate_conformance(log, petri_net, fitness=fitness)
+        simp = simplicity_evaluator.apply(simplicity_net_dict[key][0])
 
-        results[f"real_{key}_Fitness"] = fitness
-        results[f"real_{key}_Precision"] = prec
-        results[f"real_{key}_Generalization"] = gen
-        results[f"real_{key}_Simplicity"] = simp
+        if fitness:
+            results[f"{prefix}_{key}_Fitness"] = net_fitness
+        results[f"{prefix}_{key}_Precision"] = prec
+        results[f"{prefix}_{key}_Generalization"] = gen
+        results[f"{prefix}_{key}_Simplicity"] = simp
 
-    # Calculate metrics for synthetic event log
-    for key, petri_net in petri_net_dict.items():
-        alignments = pm4py.conformance_diagnostics_alignments(synthetic_event_log, petri_net[0], petri_net[1],
-                                                              petri_net[2])
-        prec = pm4py.precision_alignments(synthetic_event_log, petri_net[0], petri_net[1], petri_net[2])
-        gen = generalization_evaluator.apply(synthetic_event_log, petri_net[0], petri_net[1], petri_net[2])
-        fitness = calculate_fitness(alignments)
-        simp = simplicity_evaluator.apply(petri_net_dict_synth[key][0])
+    return results
+
+
+def compare_logs(real_event_log, synthetic_event_log, threshold, reference_profile=None, mode="exact", seed=None,
+                 **kwargs):
+    """Compare the fitness of a real event Log with a synthetic event log. In this case the Petri Nets discovered
+    from the real even log are used to calculate the alignments of the synthetic event log. In 'bootstrap' mode the
+    fitness of the synthetic log, the average fitness of its traces, is estimated on case subsamples with a
+    confidence interval (see bootstrap_evaluation.bootstrap_metric); precision, generalization and simplicity are
+    not averages over traces and are computed exactly.
 
-        results[f"synthetic_{key}_Fitness"] = fitness
-        results[f"synthetic_{key}_Precision"] = prec
-        results[f"synthetic_{key}_Generalization"] = gen
-        results[f"synthetic_{key}_Simplicity"] = simp
+    :param real_event_log: The real event log. May be None if a reference profile with Petri nets is given.
+    :type real_event_log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :param synthetic_event_log: The synthetic event log.
+    :type synthetic_event_log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :param threshold: The threshold for the heuristic mining algorithm.
+    :type threshold: float
+    :param reference_profile: The reference profile of the real event log. If it was built with the same threshold,
+        its Petri nets and real log metrics are reused instead of being recomputed. Default is None.
+    :type reference_profile: dict
+    :param mode: 'exact' or 'bootstrap'. Default is 'exact'.
+    :type mode: str
+    :param seed: The seed of the subsamples in 'bootstrap' mode. Default is None, which uses fresh entropy.
+    :type seed: int
+    :param kwargs: The keyword arguments of bootstrap_metric in 'bootstrap' mode.
+    :return: Dictionary containing results for both real and synthetic data with prefixed keys, in 'bootstrap' mode
+        with the confidence interval of every synthetic fitness as '<name>_ci_low' and '<name>_ci_high' and its
+        number of cases as '<name>_cases'.
+    """
+    if mode not in ("bootstrap", "exact"):
+        raise ValueError(f"Unknown evaluation mode '{mode}', expected 'bootstrap' or 'exact'")
+    synthetic_event_log = to_event_log(synthetic_event_log)
+    if reference_profile is not None and reference_profile["petri_nets"] is not None \
+            and reference_profile["threshold"] == threshold:
+        petri_net_dict = reference_profile["petri_nets"]
+        results = dict(reference_profile["conformance"])
+    else:
+        real_event_log = to_event_log(real_event_log)
+        petri_net_dict = calculate_petri_nets(real_event_log, threshold)
+        results = evaluate_petri_nets(real_event_log, petri_net_dict, "real")
+
+    petri_net_dict_synth = calculate_petri_nets(synthetic_event_log, threshold)
+    results.update(evaluate_petri_nets(
+        synthetic_event_log, petri_net_dict, "synthetic", petri_net_dict_synth, fitness=mode == "exact"
+    ))
+    if mode == "bootstrap":
+        # bootstrap_evaluation imports this module, so it is only imported when it is used
+        from bootstrap_evaluation import bootstrap_fidelity_metrics, fitness_metrics
+
+        results.update(bootstrap_fidelity_metrics(
+            None, synthetic_event_log, metrics=fitness_metrics(petri_net_dict), seed=seed, distance=False, **kwargs
+        ))
 
     return results
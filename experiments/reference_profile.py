@@ -0,0 +1,109 @@
+import hashlib
+import os
+import pickle
+
+import pm4py
+from pm4py.statistics.variants.log import get as variants_module
+
+from process_mining_eval_functions import (calculate_petri_nets, calculate_throughput_time,
+                                           calculate_trace_length_distribution, evaluate_petri_nets, to_dataframe,
+                                           to_event_log)
+
+# Bump when the contents of the profile change, so stale profiles on disk are rebuilt
+PROFILE_VERSION = 2
+# Columns that are not compared attribute by attribute
+NON_ATTRIBUTE_COLUMNS = ['time:timestamp', 'case:concept:name', 'concept:name']
+
+
+def file_hash(path):
+    """Return the SHA-256 hash of the contents of a file.
+
+    :param path: Path of the file.
+    :type path: str
+    :returns: Hex digest of the file contents.
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def build_reference_profile(log, threshold=None):
+    """Compute the statistics of a real event log that every synthetic candidate is compared against. The profile
+    holds the values of the categorical and of the numeric columns, the event distribution, the
+    trace length distribution, the throughput times and the variant frequencies. If a threshold is given, the Petri
+    nets discovered from the log and the conformance metrics of the log on its own nets are added as well.
+
+    :param log: The real event log.
+    :type log: pm4py.objects.log.log.EventLog or pd.DataFrame
+    :param threshold: The threshold for the heuristic mining algorithm, None to skip the Petri nets.
+    :type threshold: float
+    :returns: Dictionary with the statistics of the event log.
+    :rtype: dict
+    """
+    df = to_dataframe(log)
+    df_attributes = df.drop(columns=[column for column in NON_ATTRIBUTE_COLUMNS if column in df.columns])
+
+    profile = {
+        "profile_version": PROFILE_VERSION,
+        "threshold": threshold,
+        "numeric_columns": {
+            column: values.dropna()
+            for column, values in df_attributes.select_dtypes(include=['int64', 'float64']).items()
+        },
+        "categorical_columns": {
+            column: values.dropna().astype(str)
+            for column, values in df_attributes.select_dtypes(include=['object']).items()
+        },
+        "event_distribution": df['concept:name'].dropna().value_counts(),
+        "trace_length_distribution": calculate_trace_length_distribution(log),
+        "throughput_times": calculate_throughput_time(log),
+        "variants": variants_module.get_language(to_event_log(log)),
+        "petri_nets": None,
+        "conformance": None,
+    }
+
+    if threshold is not None:
+        profile["petri_nets"] = calculate_petri_nets(log, threshold)
+        profile["conformance"] = evaluate_petri_nets(log, profile["petri_nets"], "real")
+
+    return profile
+
+
+def load_reference_profile(log_filename, cache_dir=None, threshold=None):
+    """Return the reference profile of a real event log file. Profiles are stored on disk keyed by the hash of the
+    file contents and the heuristic mining threshold, so the log is only read and profiled when it has changed.
+
+    :param log_filename: Path of the real event log in XES format.
+    :type log_filename: str
+    :param cache_dir: Directory of the stored profiles. Default is a 'reference_profiles' directory next to the log.
+    :type cache_dir: str
+    :param threshold: The threshold for the heuristic mining algorithm, None to skip the Petri nets.
+    :type threshold: float
+    :returns: Dictionary with the statistics of the event log.
+    :rtype: dict
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(log_filename)), "reference_profiles")
+    os.makedirs(cache_dir, exist_ok=True)
+
+    log_name = os.path.splitext(os.path.basename(log_filename))[0]
+    profile_filename = os.path.join(
+        cache_dir, f"{log_name}_{file_hash(log_filename)[:16]}_t={threshold}_v{PROFILE_VERSION}.pkl"
+    )
+
+    if os.path.isfile(profile_filename):
+        with open(profile_filename, "rb") as handle:
+            return pickle.load(handle)
+
+    profile = build_reference_profile(pm4py.read_xes(log_filename), threshold)
+
+    temp_filename = f"{profile_filename}.tmp"
+    with open(temp_filename, "wb") as handle:
+        pickle.dump(profile, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_filename, profile_filename)
+
+    return profile
@@ -0,0 +1,289 @@
+import math
+import multiprocessing
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import wait
+
+import pandas as pd
+
+from PALSYN.preprocessing.log_preprocessing import compute_dp_sgd_epsilon
+from PALSYN.synthesizer import DPEventLogSynthesizer
+from sweep_runner import initialize_job_model, preprocess_job, train_and_evaluate
+
+
+def rung_epochs(min_epochs, max_epochs, reduction_factor):
+    """Return the number of epochs a configuration is trained for at every rung of successive halving, i.e.
+    min_epochs, min_epochs * reduction_factor and so on, with max_epochs as last rung.
+
+    :param min_epochs: The number of epochs of the first rung.
+    :type min_epochs: int
+    :param max_epochs: The number of epochs of the last rung.
+    :type max_epochs: int
+    :param reduction_factor: The factor by which the epochs grow from rung to rung.
+    :type reduction_factor: int
+    :return: The epochs of every rung.
+    :rtype: list
+    """
+    epochs = []
+    current_epochs = min_epochs
+    while current_epochs < max_epochs:
+        epochs.append(current_epochs)
+        current_epochs *= reduction_factor
+    epochs.append(max_epochs)
+
+    return epochs
+
+
+def _halving_worker(connection, sample_size, sample_batch_size, evaluate, model_dir, synthetic_log_dir):
+    """Train configurations in a worker process until the scheduler sends None. The worker keeps the models of its
+    configurations, so a promoted configuration continues training where it stopped, with its optimizer state.
+
+    :param connection: The pipe to the scheduler.
+    :type connection: multiprocessing.connection.Connection
+    :param sample_size: The number of traces to sample.
+    :type sample_size: int
+    :param sample_batch_size: The batch size of the sampling.
+    :type sample_batch_size: int
+    :param evaluate: The function computing the metrics of a sampled event log, or None.
+    :type evaluate: callable
+    :param model_dir: The directory of the saved models, or None.
+    :type model_dir: str
+    :param synthetic_log_dir: The directory of the synthetic XES logs, or None.
+    :type synthetic_log_dir: str
+    """
+    models = {}
+    with ThreadPoolExecutor(max_workers=1) as xes_executor:
+        while True:
+            message = connection.recv()
+            if message is None:
+                break
+
+            if message[0] == "drop":
+                models.pop(message[1], None)
+                continue
+
+            _, job, preprocessed_path, epochs = message
+            try:
+                if job["name"] not in models:
+                    models[job["name"]] = (initialize_job_model(job, preprocessed_path), 0)
+                model, trained_epochs = models[job["name"]]
+                results = train_and_evaluate(
+                    model, job, trained_epochs, epochs, sample_size, sample_batch_size, evaluate, model_dir,
+                    synthetic_log_dir, xes_executor
+                )
+                models[job["name"]] = (model, epochs)
+
+                # Epsilon spent by the DP-SGD training of this configuration so far
+                if results is not None and model.epsilon is not None:
+                    results["dp_sgd_epsilon"] = compute_dp_sgd_epsilon(
+                        model.noise_multiplier, model.num_examples, model.batch_size, epochs
+                    )
+                error = None if results is not None else "sampling failed"
+            except Exception as exception:
+                results, error = None, f"{type(exception).__name__}: {exception}"
+            if error is not None:
+                # The scheduler prunes failed configurations for good and never sends "drop" for them
+                models.pop(job["name"], None)
+            connection.send((results, error))
+
+    connection.close()
+
+
+def _start_halving_worker(context, worker_args):
+    """Start a worker process for run_successive_halving. The worker is not a daemon, as the evaluation starts its
+    metric jobs in child processes. run_successive_halving stops and joins its workers when it returns or fails.
+
+    :param context: The multiprocessing context.
+    :type context: multiprocessing.context.BaseContext
+    :param worker_args: The arguments of _halving_worker after the connection.
+    :type worker_args: tuple
+    :return: The worker process and the pipe to it.
+    :rtype: tuple
+    """
+    connection, worker_connection = context.Pipe()
+    process = context.Process(target=_halving_worker, args=(worker_connection,) + worker_args)
+    process.start()
+    worker_connection.close()
+
+    return process, connection
+
+
+def run_successive_halving(event_log, jobs, score, min_epochs=1, reduction_factor=3, max_epochs=None,
+                           sample_size=200, sample_batch_size=10, evaluate=None, max_workers=None, model_dir=None,
+                           synthetic_log_dir=None):
+    """Run a hyperparameter sweep of DPEventLogSynthesizer configurations with asynchronous successive halving
+    (ASHA). Every configuration is trained for min_epochs epochs, sampled and scored. A configuration is promoted to
+    the next rung, i.e. trained further up to reduction_factor times the epochs, once it ranks in the top
+    1 / reduction_factor of the configurations scored at its rung. All other configurations are pruned, so the
+    training budget goes to the promising ones. Promotions are decided whenever a worker is free, without waiting for
+    the rung to be complete.
+
+    Every worker keeps the models of the configurations it started, so promoted configurations continue training in
+    the same worker. The event log is preprocessed once per distinct preprocessing key, as in run_sweep.
+
+    Privacy is accounted per configuration: the noise multiplier of every configuration is calibrated for its own
+    number of epochs, and no configuration is trained beyond it, so pruning only leaves part of its budget unspent.
+    The DP-SGD epsilon spent up to every rung is reported as 'dp_sgd_epsilon'. The selection of configurations by
+    their scores on the real log is not part of this accounting, as in the full sweep.
+
+    :param event_log: The real event log.
+    :type event_log: pd.DataFrame
+    :param jobs: The sweep jobs, as created by sweep_runner.sweep_job.
+    :type jobs: list
+    :param score: The function computing the score of the results of an evaluation, higher is better.
+    :type score: callable
+    :param min_epochs: The number of epochs of the first rung. Default is 1.
+    :type min_epochs: int
+    :param reduction_factor: The factor by which the configurations are reduced and the epochs grow from rung to
+        rung. Default is 3.
+    :type reduction_factor: int
+    :param max_epochs: The number of epochs of the last rung. Default is None, which uses the smallest number of
+        epochs of the configurations.
+    :type max_epochs: int
+    :param sample_size: The number of traces to sample at every evaluation. Default is 200.
+    :type sample_size: int
+    :param sample_batch_size: The batch size of the sampling. Default is 10.
+    :type sample_batch_size: int
+    :param evaluate: The function computing the metrics of a sampled event log as dict. It must be picklable, i.e.
+        defined at module level, and runs in the worker processes. Default is None, which only records the training
+        and sampling times.
+    :type evaluate: callable
+    :param max_workers: The maximum number of configurations trained in parallel. Default is the number of CPU cores.
+    :type max_workers: int
+    :param model_dir: The directory of the saved models. Default is None, which does not save the models.
+    :type model_dir: str
+    :param synthetic_log_dir: The directory of the synthetic XES logs. Default is None, which does not write them.
+    :type synthetic_log_dir: str
+    :return: The results of every evaluation with its 'rung' and 'score', in the order they finished.
+    :rtype: pd.DataFrame
+    """
+    jobs_by_name = {job["name"]: job for job in jobs}
+    if len(jobs_by_name) != len(jobs):
+        raise ValueError("The names of the sweep jobs must be unique")
+    if min_epochs < 1 or reduction_factor < 2:
+        raise ValueError("min_epochs must be at least 1 and reduction_factor at least 2")
+
+    job_epochs = {job["name"]: DPEventLogSynthesizer(**job["parameters"]).epochs for job in jobs}
+    if max_epochs is None:
+        max_epochs = min(job_epochs.values())
+    for name, epochs in job_epochs.items():
+        if epochs < max_epochs:
+            raise ValueError(
+                f"{name} is calibrated for {epochs} epochs, training it for {max_epochs} epochs would exceed its "
+                f"privacy budget"
+            )
+    rungs = rung_epochs(min(min_epochs, max_epochs), max_epochs, reduction_factor)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    for directory in (model_dir, synthetic_log_dir):
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    pending = deque(jobs)
+    owners = {}
+    rung_scores = [{} for _ in rungs]
+    promoted = [set() for _ in rungs]
+    lost = set()
+    rows = []
+
+    def promotable(rung):
+        scores = rung_scores[rung]
+        top = sorted(scores, key=scores.get, reverse=True)[:len(scores) // reduction_factor]
+        return [name for name in top if name not in promoted[rung] and name not in lost]
+
+    def next_task(worker):
+        # Promote the best configuration of this worker from the highest possible rung, else start a new one
+        for rung in reversed(range(len(rungs) - 1)):
+            for name in promotable(rung):
+                if owners[name] == worker:
+                    promoted[rung].add(name)
+                    return name, rung + 1
+        if pending:
+            name = pending.popleft()["name"]
+            owners[name] = worker
+            return name, 0
+        return None
+
+    def closed_rungs(running_rungs):
+        # A rung is closed when no configuration can reach it anymore, its pruned configurations are final
+        if pending:
+            return 0
+        for rung in range(len(rungs)):
+            if any(running_rung <= rung for running_rung in running_rungs) or (rung > 0 and promotable(rung - 1)):
+                return rung
+        return len(rungs)
+
+    context = multiprocessing.get_context("spawn")
+    worker_args = (sample_size, sample_batch_size, evaluate, model_dir, synthetic_log_dir)
+    workers = []
+    running = {}
+    dropped = set()
+
+    with tempfile.TemporaryDirectory() as preprocessed_dir:
+        preprocessed_paths = {}
+        try:
+            for _ in range(min(max_workers, len(jobs))):
+                workers.append(_start_halving_worker(context, worker_args))
+
+            while True:
+                for worker, (process, connection) in enumerate(workers):
+                    if connection in running:
+                        continue
+                    task = next_task(worker)
+                    if task is None:
+                        continue
+                    name, rung = task
+                    job = jobs_by_name[name]
+                    preprocessed_path = preprocess_job(event_log, job, preprocessed_paths, preprocessed_dir)
+                    connection.send(("train", job, preprocessed_path, rungs[rung]))
+                    running[connection] = (worker, name, rung)
+
+                if not running:
+                    break
+
+                for connection in wait(list(running)):
+                    worker, name, rung = running.pop(connection)
+                    try:
+                        results, error = connection.recv()
+                    except EOFError:
+                        # The models of the worker are lost with it
+                        process = workers[worker][0]
+                        error = f"worker exited with code {process.exitcode}"
+                        lost.update(owned for owned, owner in owners.items() if owner == worker)
+                        connection.close()
+                        workers[worker] = _start_halving_worker(context, worker_args)
+                        results = None
+
+                    if error is not None:
+                        print(f"{name} failed at rung {rung}: {error}")
+                        rung_scores[rung][name] = -math.inf
+                        lost.add(name)
+                        continue
+
+                    value = score(results)
+                    rung_scores[rung][name] = -math.inf if value is None or math.isnan(value) else value
+                    rows.append(dict(results, rung=rung, score=value))
+                    print(f"{name} scored {value} at rung {rung} after {rungs[rung]} epochs")
+
+                # Release the models of configurations that finished the last rung or were pruned for good
+                num_closed = closed_rungs([rung for _, _, rung in running.values()])
+                for rung in range(len(rungs)):
+                    if rung < num_closed or rung == len(rungs) - 1:
+                        for name in rung_scores[rung]:
+                            if name not in dropped and name not in lost and name not in promoted[rung]:
+                                if rung == len(rungs) - 1 or name not in promotable(rung):
+                                    workers[owners[name]][1].send(("drop", name))
+                                    dropped.add(name)
+        finally:
+            for process, connection in workers:
+                if connection in running:
+                    process.kill()
+                else:
+                    connection.send(None)
+                connection.close()
+                process.join()
+
+    return pd.DataFrame(rows)
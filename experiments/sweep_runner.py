@@ -0,0 +1,234 @@
+import multiprocessing
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from PALSYN.synthesizer import DPEventLogSynthesizer
+from PALSYN.postprocessing.xes_writer import write_xes
+
+
+def sweep_job(name, labels, parameters):
+    """Describe a configuration of a hyperparameter sweep run by run_sweep.
+
+    :param name: The unique name of the configuration, used for the saved models and synthetic logs.
+    :type name: str
+    :param labels: The columns of the configuration in the results, e.g. {"method": "LSTM", "units": 64}.
+    :type labels: dict
+    :param parameters: The keyword arguments of DPEventLogSynthesizer.
+    :type parameters: dict
+    :return: The sweep job.
+    :rtype: dict
+    """
+    return {"name": name, "labels": labels, "parameters": parameters}
+
+
+def preprocess_job(event_log, job, preprocessed_paths, preprocessed_dir):
+    """Return the path of the preprocessed state of a sweep job. The event log is only preprocessed and stored if no
+    job with the same preprocessing key was preprocessed before.
+
+    :param event_log: The real event log.
+    :type event_log: pd.DataFrame
+    :param job: The sweep job, as created by sweep_job.
+    :type job: dict
+    :param preprocessed_paths: The paths of the preprocessed states by preprocessing key, updated in place.
+    :type preprocessed_paths: dict
+    :param preprocessed_dir: The directory of the preprocessed states.
+    :type preprocessed_dir: str
+    :return: The path of the pickled preprocessed state.
+    :rtype: str
+    """
+    model = DPEventLogSynthesizer(**job["parameters"])
+    key = model.preprocessing_key()
+    if key not in preprocessed_paths:
+        print(f"Preprocessing the event log for {job['name']}")
+        preprocessed_path = os.path.join(preprocessed_dir, f"preprocessed_{len(preprocessed_paths)}.pkl")
+        with open(preprocessed_path, "wb") as handle:
+            pickle.dump(model.preprocess(event_log), handle, protocol=pickle.HIGHEST_PROTOCOL)
+        preprocessed_paths[key] = preprocessed_path
+
+    return preprocessed_paths[key]
+
+
+def initialize_job_model(job, preprocessed_path):
+    """Create and initialize the model of a sweep job from its preprocessed state.
+
+    :param job: The sweep job, as created by sweep_job.
+    :type job: dict
+    :param preprocessed_path: Path of the pickled preprocessed state of the event log.
+    :type preprocessed_path: str
+    :return: The initialized model.
+    :rtype: DPEventLogSynthesizer
+    """
+    with open(preprocessed_path, "rb") as handle:
+        preprocessed = pickle.load(handle)
+
+    model = DPEventLogSynthesizer(**job["parameters"])
+    model.initialize_from_preprocessed(preprocessed)
+
+    return model
+
+
+def train_and_evaluate(model, job, trained_epochs, current_epoch, sample_size, sample_batch_size, evaluate, model_dir,
+                       synthetic_log_dir, xes_executor):
+    """Continue training the model of a sweep job up to current_epoch, then save, sample and evaluate it.
+
+    :param model: The model of the sweep job.
+    :type model: DPEventLogSynthesizer
+    :param job: The sweep job, as created by sweep_job.
+    :type job: dict
+    :param trained_epochs: The number of epochs the model has been trained for.
+    :type trained_epochs: int
+    :param current_epoch: The number of epochs to train the model for in total.
+    :type current_epoch: int
+    :param sample_size: The number of traces to sample.
+    :type sample_size: int
+    :param sample_batch_size: The batch size of the sampling.
+    :type sample_batch_size: int
+    :param evaluate: The function computing the metrics of a sampled event log, or None.
+    :type evaluate: callable
+    :param model_dir: The directory of the saved models, or None.
+    :type model_dir: str
+    :param synthetic_log_dir: The directory of the synthetic XES logs, or None.
+    :type synthetic_log_dir: str
+    :param xes_executor: The executor writing the synthetic XES logs in the background.
+    :type xes_executor: concurrent.futures.Executor
+    :return: The results of the evaluation, or None if sampling failed.
+    :rtype: dict
+    """
+    results = dict(job["labels"], epochs=current_epoch)
+
+    start_time = time.time()
+    print(f"{job['name']}: training epochs {trained_epochs} to {current_epoch}")
+    model.train(epochs=current_epoch - trained_epochs)
+
+    if model_dir is not None:
+        model.save_model(os.path.join(model_dir, f"{job['name']}_ep={current_epoch}"))
+    results["training_time"] = time.time() - start_time
+
+    try:
+        start_time = time.time()
+        event_log_sample = model.sample(sample_size=sample_size, batch_size=sample_batch_size)
+        results["sampling_time"] = time.time() - start_time
+    except Exception as exception:
+        print(f"{job['name']}: sampling failed at epoch {current_epoch}: {exception}")
+        return None
+
+    # The XES file is written in the background, the evaluation works on the sampled DataFrame
+    if synthetic_log_dir is not None:
+        xes_filename = os.path.join(synthetic_log_dir, f"{job['name']}_ep={current_epoch}.xes")
+        xes_executor.submit(write_xes, event_log_sample, xes_filename)
+
+    if evaluate is not None:
+        results.update(evaluate(event_log_sample))
+
+    return results
+
+
+def _run_sweep_job(job, preprocessed_path, breakpoint_interval, sample_size, sample_batch_size, evaluate, model_dir,
+                   synthetic_log_dir):
+    """Train one configuration of a sweep in a worker process. Every breakpoint_interval epochs the model is saved,
+    sampled and the sample is evaluated.
+
+    :param job: The sweep job, as created by sweep_job.
+    :type job: dict
+    :param preprocessed_path: Path of the pickled preprocessed state of the event log.
+    :type preprocessed_path: str
+    :param breakpoint_interval: The number of epochs between two evaluations.
+    :type breakpoint_interval: int
+    :param sample_size: The number of traces to sample.
+    :type sample_size: int
+    :param sample_batch_size: The batch size of the sampling.
+    :type sample_batch_size: int
+    :param evaluate: The function computing the metrics of a sampled event log, or None.
+    :type evaluate: callable
+    :param model_dir: The directory of the saved models, or None.
+    :type model_dir: str
+    :param synthetic_log_dir: The directory of the synthetic XES logs, or None.
+    :type synthetic_log_dir: str
+    :return: The results of every evaluation.
+    :rtype: list
+    """
+    model = initialize_job_model(job, preprocessed_path)
+
+    rows = []
+    with ThreadPoolExecutor(max_workers=1) as xes_executor:
+        for current_epoch in range(breakpoint_interval, model.epochs + breakpoint_interval, breakpoint_interval):
+            results = train_and_evaluate(
+                model, job, current_epoch - breakpoint_interval, current_epoch, sample_size, sample_batch_size,
+                evaluate, model_dir, synthetic_log_dir, xes_executor
+            )
+            if results is not None:
+                rows.append(results)
+
+    return rows
+
+
+def run_sweep(event_log, jobs, breakpoint_interval, sample_size, sample_batch_size, evaluate=None, max_workers=None,
+              model_dir=None, synthetic_log_dir=None):
+    """Run a hyperparameter sweep of DPEventLogSynthesizer configurations. The event log is preprocessed once per
+    distinct preprocessing key of the configurations, and the configurations are trained, sampled and evaluated
+    concurrently on a bounded pool of worker processes. The configurations of a key are submitted as soon as its
+    preprocessing is done, so preprocessing the next key overlaps with their training.
+
+    Every worker imports TensorFlow and holds its own model, so max_workers bounds the memory use of the sweep. The
+    evaluation function must be picklable, i.e. defined at module level, and runs in the worker processes.
+
+    :param event_log: The real event log.
+    :type event_log: pd.DataFrame
+    :param jobs: The sweep jobs, as created by sweep_job.
+    :type jobs: list
+    :param breakpoint_interval: The number of epochs between two evaluations of a configuration.
+    :type breakpoint_interval: int
+    :param sample_size: The number of traces to sample at every evaluation.
+    :type sample_size: int
+    :param sample_batch_size: The batch size of the sampling.
+    :type sample_batch_size: int
+    :param evaluate: The function computing the metrics of a sampled event log as dict. Default is None, which only
+        records the training and sampling times.
+    :type evaluate: callable
+    :param max_workers: The maximum number of configurations run in parallel. Default is the number of CPU cores.
+    :type max_workers: int
+    :param model_dir: The directory of the saved models. Default is None, which does not save the models.
+    :type model_dir: str
+    :param synthetic_log_dir: The directory of the synthetic XES logs. Default is None, which does not write them.
+    :type synthetic_log_dir: str
+    :return: The results of every evaluation of every configuration, in the order of the jobs.
+    :rtype: pd.DataFrame
+    """
+    names = [job["name"] for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("The names of the sweep jobs must be unique")
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    for directory in (model_dir, synthetic_log_dir):
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    rows_by_job = {}
+    # TensorFlow is not fork-safe, so the workers are spawned
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as preprocessed_dir, \
+            ProcessPoolExecutor(max_workers=min(max_workers, len(jobs)) or 1, mp_context=context) as executor:
+        preprocessed_paths = {}
+        futures = {}
+        for job in jobs:
+            preprocessed_path = preprocess_job(event_log, job, preprocessed_paths, preprocessed_dir)
+            future = executor.submit(
+                _run_sweep_job, job, preprocessed_path, breakpoint_interval, sample_size, sample_batch_size,
+                evaluate, model_dir, synthetic_log_dir
+            )
+            futures[future] = job["name"]
+
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                rows_by_job[name] = future.result()
+            except Exception as exception:
+                print(f"Sweep job {name} failed: {type(exception).__name__}: {exception}")
+                rows_by_job[name] = []
+
+    return pd.DataFrame([row for name in names for row in rows_by_job[name]])
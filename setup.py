@@ -30,5 +30,8 @@ setup(
         "tensorflow_privacy==0.9.0",
         "openpyxl==3.1.2",
     ],
+    extras_require={
+        "parquet": ["pyarrow>=12.0.0"],
+    },
     python_requires=">=3.9",
 )
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The experiments scripts import each other as top-level modules
+sys.path.insert(0, os.path.join(REPO_ROOT, "experiments"))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.synthetic_log import generate_event_log  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def event_log():
+    """Small generated event log with numeric, categorical and case attributes."""
+    return generate_event_log(200, num_activities=6, trace_length_mean=4.0, max_trace_length=8, seed=0)
+
+
+@pytest.fixture(scope="session")
+def trained_synthesizer(event_log):
+    """Synthesizer trained for one epoch on the small event log."""
+    from PALSYN.synthesizer import DPEventLogSynthesizer
+
+    synthesizer = DPEventLogSynthesizer(
+        embedding_output_dims=8, units_per_layer=[8], epochs=1, batch_size=64, max_clusters=3, trace_quantile=1.0
+    )
+    synthesizer.fit(event_log.copy())
+
+    return synthesizer
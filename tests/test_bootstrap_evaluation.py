@@ -0,0 +1,102 @@
+import functools
+
+import pytest
+
+from benchmarks.synthetic_log import generate_event_log
+from bootstrap_evaluation import (attribute_hellinger_complement, attribute_ks_complement, bootstrap_metric,
+                                  case_table, event_distribution_complement, fitness_metrics,
+                                  throughput_time_complement, trace_length_complement)
+from process_mining_eval_functions import calculate_petri_nets, compare_logs
+
+
+@pytest.fixture(scope="module")
+def other_log():
+    return generate_event_log(200, num_activities=6, trace_length_mean=4.0, max_trace_length=8, seed=1)
+
+
+@pytest.fixture(scope="module")
+def case_tables(event_log, other_log):
+    return case_table(event_log), case_table(other_log)
+
+
+def estimate(case_tables, num_cases, seed=0):
+    # A target width of 0 is never reached, so the subsample stays at num_cases
+    return bootstrap_metric(event_distribution_complement, *case_tables, initial_cases=num_cases, max_cases=num_cases,
+                            target_width=0.0, rng=seed)
+
+
+def test_interval_narrows_as_the_subsample_grows(case_tables):
+    small, large = estimate(case_tables, 10), estimate(case_tables, 80)
+
+    assert not small["exact"] and not large["exact"]
+    assert (small["cases"], large["cases"]) == (10, 80)
+    assert large["ci_high"] - large["ci_low"] < small["ci_high"] - small["ci_low"]
+
+
+def test_falls_back_to_the_exact_value_past_half_the_log(case_tables):
+    real_table, synthetic_table = case_tables
+    result = estimate(case_tables, 101)
+
+    assert result["exact"]
+    assert result["cases"] == 200
+    assert result["estimate"] == result["ci_low"] == result["ci_high"] == event_distribution_complement(
+        real_table["events"], synthetic_table["events"]
+    )
+
+
+def test_fixed_seed_is_deterministic(case_tables):
+    assert estimate(case_tables, 20, seed=7) == estimate(case_tables, 20, seed=7)
+
+
+@pytest.mark.parametrize("metric", [
+    event_distribution_complement,
+    trace_length_complement,
+    throughput_time_complement,
+    functools.partial(attribute_ks_complement, column="amount_0"),
+    functools.partial(attribute_hellinger_complement, column="category_0"),
+])
+def test_interval_covers_the_exact_value_across_seeds(case_tables, metric):
+    real_table, synthetic_table = case_tables
+    exact = metric(real_table["events"], synthetic_table["events"])
+
+    covered = 0
+    for seed in range(20):
+        result = bootstrap_metric(metric, real_table, synthetic_table, initial_cases=40, max_cases=40,
+                                  target_width=0.0, n_bootstrap=100, rng=seed)
+        covered += result["ci_low"] <= exact <= result["ci_high"]
+
+    assert covered >= 18
+
+
+def test_fitness_interval_covers_the_exact_value_across_seeds(event_log, other_log):
+    petri_nets = {"Heuristics": calculate_petri_nets(event_log, 0.5)["Heuristics"]}
+    synthetic_table = case_table(other_log)
+    metric = fitness_metrics(petri_nets)["synthetic_Heuristics_Fitness"]
+    exact = metric(None, synthetic_table["events"])
+
+    covered = 0
+    for seed in range(20):
+        result = bootstrap_metric(metric, None, synthetic_table, initial_cases=40, max_cases=40, target_width=0.0,
+                                  n_bootstrap=100, distance=False, rng=seed)
+        covered += result["ci_low"] <= exact <= result["ci_high"]
+
+    assert covered >= 18
+
+
+def test_compare_logs_estimates_the_fitness_on_subsamples():
+    real_log = generate_event_log(30, num_activities=6, trace_length_mean=4.0, max_trace_length=8, seed=0)
+    synthetic_log = generate_event_log(30, num_activities=6, trace_length_mean=4.0, max_trace_length=8, seed=1)
+
+    exact = compare_logs(real_log, synthetic_log, threshold=0.5)
+    estimated = compare_logs(real_log, synthetic_log, threshold=0.5, mode="bootstrap", seed=0, initial_cases=10,
+                             max_cases=10, target_width=0.0, n_bootstrap=50)
+
+    assert estimated.keys() - exact.keys() == {
+        f"synthetic_{net_name}_Fitness_{suffix}" for net_name in ("Inductive", "Heuristics")
+        for suffix in ("ci_low", "ci_high", "cases")
+    }
+    for net_name in ("Inductive", "Heuristics"):
+        name = f"synthetic_{net_name}_Fitness"
+        assert estimated[f"{name}_cases"] == 10
+        assert estimated[f"{name}_ci_low"] <= exact[name] <= estimated[f"{name}_ci_high"]
+        assert estimated[f"synthetic_{net_name}_Precision"] == exact[f"synthetic_{net_name}_Precision"]
@@ -0,0 +1,38 @@
+import pytest
+
+from process_mining_eval_functions import calculate_approximate_earth_mover_distance, calculate_earth_mover_distance
+from benchmarks.synthetic_log import generate_event_log
+
+
+@pytest.fixture(scope="module")
+def other_log():
+    return generate_event_log(200, num_activities=6, trace_length_mean=4.0, max_trace_length=8, seed=1)
+
+
+def test_approximate_earth_mover_distance_runs_without_pyemd(event_log, other_log):
+    # Imports no pyemd, so it also runs where pyemd is not installed
+    distance, error_bound = calculate_approximate_earth_mover_distance(event_log, event_log)
+    assert distance == 0.0 and error_bound == 0.0
+
+    distance, _ = calculate_approximate_earth_mover_distance(event_log, other_log)
+    assert 0.0 < distance <= 1.0
+
+
+@pytest.mark.parametrize("top_k, max_edits", [(50, None), (20, None), (5, None), (None, 1), (None, 3), (20, 2)])
+def test_approximation_error_is_within_its_bound(event_log, other_log, top_k, max_edits):
+    # Without truncation and saturation the approximation solves the exact transport problem
+    exact, exact_bound = calculate_approximate_earth_mover_distance(event_log, other_log, top_k=None)
+    assert exact_bound == 0.0
+
+    distance, error_bound = calculate_approximate_earth_mover_distance(
+        event_log, other_log, top_k=top_k, max_edits=max_edits
+    )
+    assert abs(distance - exact) <= error_bound + 1e-9
+    assert error_bound < 0.75
+
+
+def test_untruncated_approximation_matches_pm4py(event_log, other_log):
+    pytest.importorskip("pyemd")
+    exact = calculate_earth_mover_distance(event_log, other_log)
+    distance, _ = calculate_approximate_earth_mover_distance(event_log, other_log, top_k=None)
+    assert distance == pytest.approx(exact, abs=1e-6)
@@ -0,0 +1,34 @@
+import copy
+import pickle
+
+from PALSYN.instrumentation import NULL_INSTRUMENTATION, Instrumentation, MemorySink
+
+
+def test_instrumentation_pickles():
+    assert pickle.loads(pickle.dumps(NULL_INSTRUMENTATION)) is NULL_INSTRUMENTATION
+    assert copy.deepcopy(NULL_INSTRUMENTATION) is NULL_INSTRUMENTATION
+
+    instrumentation = pickle.loads(pickle.dumps(Instrumentation(MemorySink())))
+    with instrumentation.span("outer"):
+        with instrumentation.span("inner"):
+            pass
+    assert [record["parent"] for record in instrumentation.sinks[0].records] == ["outer", None]
+
+
+def test_sampling_reports_through_spans(trained_synthesizer, capsys):
+    sink = MemorySink()
+    trained_synthesizer.enable_instrumentation(sink)
+    try:
+        trained_synthesizer.sample(sample_size=10, batch_size=8, seed=0)
+    finally:
+        trained_synthesizer.disable_instrumentation()
+
+    output = capsys.readouterr().out
+    assert "Progress:" not in output and "Batch utilization" not in output
+
+    records = sink.to_dataframe()
+    steps = records[records["name"] == "sample_step"]
+    batches = records[records["name"] == "sample_batch"]
+    assert steps["traces_kept"].sum() >= 10
+    assert batches["sequences"].sum() == 10
+    assert (batches["model_calls"] > 0).all()
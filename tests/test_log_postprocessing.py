@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from PALSYN.postprocessing.log_postprocessing import (
+    create_dataframe_from_sentences,
+    generate_df,
+    transform_sentences,
+)
+
+CLUSTER_DICT = {
+    "amount_cluster": [0.0, 10.0, 5.0, 1.0],
+    "time_cluster": [0.0, 7200.0, 3600.0, 60.0],
+}
+DICT_DTYPES = {
+    "attribute_datatypes": {
+        "case:concept:name": "string",
+        "concept:name": "string",
+        "time:timestamp": "date",
+        "amount": "float64",
+        "case:type": "string",
+    }
+}
+START_EPOCH = [1.6e9, 1e5, 1.5e9, 1.7e9]
+SENTENCES = [
+    ["case:type==A", "concept:name==Register", "time:timestamp==time_cluster", "amount==amount_cluster",
+     "concept:name==Approve", "time:timestamp==time_cluster", "amount==2"],
+    ["case:type==B", "concept:name==Register", "time:timestamp==time_cluster", "amount==amount_cluster"],
+]
+
+
+def test_sentence_wrappers_match_column_wise_generation():
+    transformed = transform_sentences(SENTENCES, CLUSTER_DICT, DICT_DTYPES, START_EPOCH, np.random.default_rng(0))
+    assert transformed[0][0] == "case:concept:name==0"
+
+    from_sentences = create_dataframe_from_sentences(transformed, DICT_DTYPES)
+    from_columns = generate_df(SENTENCES, CLUSTER_DICT, DICT_DTYPES, START_EPOCH, np.random.default_rng(0))
+
+    assert sorted(from_sentences.columns) == sorted(from_columns.columns)
+    for column in ["case:concept:name", "concept:name", "case:type"]:
+        assert from_sentences[column].tolist() == from_columns[column].tolist()
+    assert from_sentences["amount"].dtype == from_columns["amount"].dtype
+    assert from_sentences.loc[from_sentences["concept:name"] == "Approve", "amount"].tolist() == [2.0]
+    assert pd.api.types.is_datetime64_any_dtype(from_sentences["time:timestamp"])
+    assert from_sentences.groupby("case:concept:name")["time:timestamp"].is_monotonic_increasing.all()
@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from PALSYN import model_bundle
+from PALSYN.model_bundle import BUNDLE_VERSION, read_bundle, write_bundle
+from PALSYN.synthesizer import DPEventLogSynthesizer
+
+
+def test_bundle_round_trip_samples_like_the_trained_model(trained_synthesizer, tmp_path):
+    path = os.path.join(tmp_path, "model.pbles")
+    trained_synthesizer.save_bundle(path)
+
+    expected = trained_synthesizer.sample(sample_size=20, batch_size=8, seed=0)
+    for load in ("load", "load_bundle"):
+        synthesizer = DPEventLogSynthesizer()
+        getattr(synthesizer, load)(path)
+        pd.testing.assert_frame_equal(synthesizer.sample(sample_size=20, batch_size=8, seed=0), expected)
+
+
+def test_bundle_of_a_newer_format_version_is_rejected(tmp_path, monkeypatch):
+    path = os.path.join(tmp_path, "model.pbles")
+    monkeypatch.setattr(model_bundle, "BUNDLE_VERSION", BUNDLE_VERSION + 1)
+    write_bundle(path, {"config": {}}, {"weights": np.zeros(4, dtype=np.float32)})
+    monkeypatch.undo()
+
+    with pytest.raises(ValueError, match="version"):
+        read_bundle(path)
+    with pytest.raises(ValueError):
+        DPEventLogSynthesizer().load(path)
+
+
+def test_saved_directory_stores_the_weights_once(trained_synthesizer, tmp_path):
+    path = os.path.join(tmp_path, "model")
+    os.makedirs(os.path.join(path, "inference"))
+    trained_synthesizer.save_model(path)
+    assert not os.path.exists(os.path.join(path, "inference"))
+
+    expected = trained_synthesizer.sample(sample_size=20, batch_size=8, seed=0)
+    synthesizer = DPEventLogSynthesizer()
+    synthesizer.load(path)
+    pd.testing.assert_frame_equal(synthesizer.sample(sample_size=20, batch_size=8, seed=0), expected)
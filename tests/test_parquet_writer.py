@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from PALSYN.postprocessing.parquet_writer import write_parquet  # noqa: E402
+
+DICT_DTYPES = {
+    "attribute_datatypes": {
+        "case:concept:name": "object",
+        "concept:name": "object",
+        "time:timestamp": "datetime64[ns, UTC]",
+        "amount": "float64",
+        "count": "int64",
+        "org:resource": "object",
+    }
+}
+
+
+def make_chunk(case_id: str, **columns) -> pd.DataFrame:
+    chunk = pd.DataFrame({
+        "case:concept:name": [case_id, case_id],
+        "concept:name": ["Register", "Approve"],
+        "time:timestamp": pd.to_datetime(["2020-01-01", "2020-01-02"], utc=True),
+    })
+    for name, values in columns.items():
+        chunk[name] = values
+
+    return chunk
+
+
+def test_chunks_share_the_schema_of_the_dtypes(tmp_path):
+    # The first chunk has no resources and only missing amounts, the second one has both
+    chunks = [
+        make_chunk("0", amount=[np.nan, np.nan], count=pd.array([1, None], dtype="Int64")),
+        make_chunk("1", amount=[1.5, 2.5], count=pd.array([3, 4], dtype="Int64"), **{"org:resource": ["R1", ""]}),
+    ]
+
+    assert write_parquet(chunks, str(tmp_path), dict_dtypes=DICT_DTYPES) == 4
+
+    schemas = [pq.read_schema(path) for path in sorted(tmp_path.glob("*.parquet"))]
+    assert all(schema.equals(schemas[0]) for schema in schemas)
+    assert schemas[0].field("amount").type == pa.float64()
+    assert schemas[0].field("count").type == pa.int64()
+    assert pa.types.is_dictionary(schemas[0].field("org:resource").type)
+
+    table = pq.read_table(str(tmp_path)).to_pandas()
+    assert table["org:resource"].isna().tolist() == [True, True, False, True]
+    assert table["amount"].tolist()[2:] == [1.5, 2.5]
+
+
+def test_sample_to_parquet_writes_one_schema(trained_synthesizer, tmp_path):
+    num_rows = trained_synthesizer.sample_to_parquet(str(tmp_path), sample_size=20, batch_size=8, chunk_size=5, seed=0)
+
+    schemas = [pq.read_schema(path) for path in sorted(tmp_path.glob("*.parquet"))]
+    assert len(schemas) > 1
+    assert all(schema.equals(schemas[0]) for schema in schemas)
+    assert pq.read_table(str(tmp_path)).num_rows == num_rows
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from PALSYN.sampling.prefix_cache import DEFAULT_MAX_BYTES, DEFAULT_PREFIX_EVENTS, PrefixCache
+from PALSYN.synthesizer import DPEventLogSynthesizer
+
+
+def test_default_prefix_cache_is_bounded(trained_synthesizer):
+    trained_synthesizer.enable_prefix_cache()
+    try:
+        cache = trained_synthesizer.prefix_cache
+        assert cache.max_depth == (DEFAULT_PREFIX_EVENTS + 1) * trained_synthesizer.num_cols
+        assert cache.max_bytes == DEFAULT_MAX_BYTES
+
+        trained_synthesizer.sample(sample_size=20, batch_size=8, seed=0)
+        stats = cache.stats()
+        assert stats["entries"] > 0
+        assert stats["bytes"] <= DEFAULT_MAX_BYTES
+    finally:
+        trained_synthesizer.disable_prefix_cache()
+
+
+def test_default_prefix_cache_requires_model():
+    with pytest.raises(ValueError):
+        DPEventLogSynthesizer().enable_prefix_cache()
+
+
+def test_prefix_cache_evicts_beyond_max_bytes():
+    value = np.zeros((2, 8), dtype=np.float32)
+    cache = PrefixCache(max_entries=100, max_depth=4, max_bytes=3 * value.nbytes)
+    for token in range(10):
+        cache.insert([1, token], value)
+    cache.insert([1, 2, 3, 4, 5], value)
+
+    stats = cache.stats()
+    assert stats["entries"] == 3
+    assert stats["bytes"] == 3 * value.nbytes
+    assert cache.lookup([1, 2, 3, 4, 5]) is None
+
+
+def test_deep_prefixes_are_not_counted_as_misses():
+    value = np.zeros((2, 8), dtype=np.float32)
+    cache = PrefixCache(max_depth=2)
+    cache.insert([1, 2], value)
+
+    assert [output is not None for output in cache.lookup_many([[1, 2], [1, 3], [1, 2, 3], [1, 2, 3, 4]])] == [
+        True, False, False, False
+    ]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["uncacheable"]) == (1, 1, 2)
+    assert stats["hit_rate"] == 0.5
@@ -0,0 +1,31 @@
+import os
+import shutil
+
+from PALSYN.registry import ModelRegistry, model_fingerprint
+
+
+def test_fingerprint_covers_nested_files(tmp_path):
+    nested_dir = tmp_path / "model" / "inference" / "variables"
+    nested_dir.mkdir(parents=True)
+    (tmp_path / "model" / "num_cols.pkl").write_bytes(b"top-level")
+    (nested_dir / "variables.data").write_bytes(b"weights")
+
+    for use_content_hash in [False, True]:
+        fingerprint = model_fingerprint(str(tmp_path / "model"), use_content_hash)
+        (nested_dir / "variables.data").write_bytes(f"weights changed {use_content_hash}".encode())
+        assert model_fingerprint(str(tmp_path / "model"), use_content_hash) != fingerprint
+
+
+def test_registry_drops_load_locks_of_evicted_models(trained_synthesizer, tmp_path):
+    first_path = os.path.join(tmp_path, "first")
+    second_path = os.path.join(tmp_path, "second")
+    trained_synthesizer.save_model(first_path)
+    shutil.copytree(first_path, second_path)
+
+    registry = ModelRegistry(max_models=1)
+    first = registry.get(first_path)
+    registry.get(second_path)
+
+    assert registry.stats()["evictions"] == 1
+    assert registry._load_locks == {}
+    assert first._token_vocabulary is not None and first._valid_token_table is not None
@@ -0,0 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+SEEDS = [0, 1, 2, 3]
+
+
+def test_concurrent_sampling_matches_serial(trained_synthesizer):
+    serial = {seed: trained_synthesizer.sample(sample_size=20, batch_size=8, seed=seed) for seed in SEEDS}
+
+    # Every seed is sampled several times, from threads sharing the instance
+    seeds = SEEDS * 3
+    with ThreadPoolExecutor(max_workers=len(SEEDS)) as executor:
+        concurrent = list(executor.map(
+            lambda seed: trained_synthesizer.sample(sample_size=20, batch_size=8, seed=seed), seeds
+        ))
+
+    for seed, df in zip(seeds, concurrent):
+        pd.testing.assert_frame_equal(df, serial[seed])
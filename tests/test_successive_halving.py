@@ -0,0 +1,27 @@
+import functools
+
+from experiments import evaluate_sample, score_results
+from reference_profile import build_reference_profile
+from successive_halving import run_successive_halving
+from sweep_runner import sweep_job
+
+
+def test_successive_halving_with_real_evaluate(event_log):
+    # evaluate_sample runs its metrics in child processes of the halving workers
+    jobs = [
+        sweep_job(f"LSTM_u={units}", {"units": units}, {
+            "embedding_output_dims": 8, "epochs": 1, "batch_size": 64, "max_clusters": 3, "trace_quantile": 1.0,
+            "units_per_layer": [units],
+        })
+        for units in (4, 8)
+    ]
+    evaluate = functools.partial(evaluate_sample, reference_profile=build_reference_profile(event_log))
+
+    results = run_successive_halving(
+        event_log, jobs, score_results, min_epochs=1, max_epochs=1, sample_size=20, sample_batch_size=10,
+        evaluate=evaluate, max_workers=1
+    )
+
+    assert len(results) == 2
+    assert results["tv_statistic_event_distribution"].notna().all()
+    assert results["score"].notna().all()
@@ -0,0 +1,24 @@
+import copy
+import pickle
+
+import pandas as pd
+
+
+def test_fitted_synthesizer_pickles(trained_synthesizer):
+    expected = trained_synthesizer.sample(sample_size=10, batch_size=8, seed=0)
+
+    restored = pickle.loads(pickle.dumps(trained_synthesizer))
+    pd.testing.assert_frame_equal(restored.sample(sample_size=10, batch_size=8, seed=0), expected)
+
+
+def test_synthesizer_with_prefix_cache_deepcopies(trained_synthesizer):
+    expected = trained_synthesizer.sample(sample_size=10, batch_size=8, seed=1)
+
+    synthesizer = copy.deepcopy(trained_synthesizer)
+    synthesizer.enable_prefix_cache()
+    synthesizer.sample(sample_size=10, batch_size=8, seed=1)
+
+    copied = copy.deepcopy(synthesizer)
+    assert copied.prefix_cache.stats()["entries"] == synthesizer.prefix_cache.stats()["entries"] > 0
+    pd.testing.assert_frame_equal(copied.sample(sample_size=10, batch_size=8, seed=1), expected)
+    assert trained_synthesizer.prefix_cache is None
@@ -0,0 +1,55 @@
+import os
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pandas as pd
+import pm4py
+
+from PALSYN.postprocessing.log_postprocessing import NA_VALUES_UPPER
+from PALSYN.postprocessing.xes_writer import XESWriter
+
+
+def attribute_values(path: str) -> list[str]:
+    return [element.get("value") for element in ET.parse(path).iter() if element.get("value") is not None]
+
+
+def test_sample_to_xes_streams_chunks(trained_synthesizer, tmp_path):
+    path = os.path.join(tmp_path, "synthetic.xes")
+    expected = pd.concat(list(trained_synthesizer.sample_chunks(50, batch_size=8, chunk_size=15, seed=0)))
+
+    assert trained_synthesizer.sample_to_xes(path, sample_size=50, batch_size=8, chunk_size=15, seed=0) == 50
+
+    event_log = pm4py.read_xes(path)
+    assert event_log["case:concept:name"].nunique() == 50
+    assert len(event_log) == len(expected)
+    assert not any(value.strip().upper() in NA_VALUES_UPPER for value in attribute_values(path))
+
+
+def test_xes_writer_skips_na_attributes(tmp_path):
+    path = os.path.join(tmp_path, "log.xes")
+    chunks = [
+        pd.DataFrame({
+            "case:concept:name": ["0", "0"],
+            "concept:name": ["Register", "Approve"],
+            "time:timestamp": pd.to_datetime(["2020-01-01", "2020-01-02"], utc=True),
+            "org:resource": ["R1", "nan"],
+            "amount": [1.5, np.nan],
+        }),
+        pd.DataFrame({
+            "case:concept:name": ["1"],
+            "concept:name": ["Register"],
+            "time:timestamp": pd.to_datetime(["2020-01-03"], utc=True),
+            "org:resource": [""],
+            "amount": [2.0],
+        }),
+    ]
+    with XESWriter(path) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+
+    event_log = pm4py.read_xes(path)
+    assert event_log["case:concept:name"].nunique() == 2
+    assert len(event_log) == 3
+    assert event_log["org:resource"].notna().sum() == 1
+    assert event_log["amount"].notna().sum() == 2
+    assert not any(value.strip().upper() in NA_VALUES_UPPER for value in attribute_values(path))